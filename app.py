@@ -4,28 +4,47 @@ TMS Dashboard - Python Flask Web Server
 Simple, lightweight dashboard that can be accessed from any browser
 """
 
-from flask import Flask, render_template, jsonify, request, session, redirect
+from flask import Flask, render_template, jsonify, request, session, redirect, Response, stream_with_context
 from flask_cors import CORS
 from flask_session import Session
+import csv
 import json
 import os
 import requests
 import time
 from datetime import datetime, timedelta
+from io import StringIO
 from src.auth import authenticate_user, is_valid_username, get_all_users
 from src.session import create_session
 from src.audit import audit_action, log_user_action, get_client_ip
-from src.audit_db import initialize_database, log_action, get_audit_trail, get_user_actions, get_customer_actions, get_audit_stats
-from src.jobs import (initialize_jobs_database, create_job, update_job, get_user_jobs, 
-                      get_job_customers, get_job_details, get_cached_appstatus,
-                      cache_appstatus, cleanup_expired_cache, get_cached_appstatus_batch,
-                      invalidate_appstatus_cache, get_cache_stats)
+from src.audit_db import (initialize_database, log_action, get_audit_trail, get_user_actions, get_customer_actions,
+                          get_audit_stats, get_audit_rollups, iter_audit_trail, normalize_timestamp,
+                          AUDIT_TRAIL_COLUMNS)
+from src.jobs import (initialize_jobs_database, create_job, update_job, get_user_jobs_page, 
+                      get_job_customers, get_job_details, get_cached_appstatus, get_jobs_for_customer,
+                      cleanup_expired_cache, get_cached_appstatus_batch,
+                      invalidate_appstatus_cache, get_cache_stats, cache_appstatus_bulk,
+                      fail_interrupted_jobs, single_cid_cache_app, APPSTATUS_STALE_GRACE_SECONDS)
 from src.prod_customer_data import (initialize_prod_customer_data_db, save_prod_customer_data,
                                      get_prod_customer_data, get_all_prod_customer_data,
                                      delete_prod_customer_data, generate_and_save_batches,
                                      get_batches_for_cluster_device, delete_batch,
                                      delete_all_batches_for_cluster_device, assign_batch_to_user,
                                      assign_batches_bulk)
+from src.upstream_client import upstream_post, get_pool_stats
+from src.single_flight import single_flight_get, get_single_flight_stats
+from src.action_snapshot import (get_action_snapshot, select_actions, prune_action_snapshots,
+                                 get_snapshot_stats, snapshots_enabled, fetch_actions_streaming)
+from src.appstatus_fetcher import (fetch_appstatus_fanout, fetch_appstatus_concurrent,
+                                   fetch_appstatus_batch_chunked, get_chunk_stats,
+                                   summarize_status, enqueue_refresh, get_refresh_stats,
+                                   APPSTATUS_FALLBACK_DEADLINE)
+from src.db_pool import get_pool_stats as get_db_pool_stats
+from src.maintenance import register_task, start_scheduler, get_maintenance_stats
+from src.job_queue import submit_job, get_job_queue_state, get_job_queue_stats, get_active_job_ids
+from src.events import subscribe, unsubscribe, get_event_stats
+from src.audit_writer import get_audit_writer_stats
+from src.audit_partitions import run_partition_maintenance, get_partition_info
 
 app = Flask(__name__)
 CORS(app)
@@ -48,6 +67,22 @@ initialize_database()
 initialize_jobs_database()
 initialize_prod_customer_data_db()
 
+# Queued jobs do not survive a restart; don't leave their rows IN_PROGRESS forever
+fail_interrupted_jobs(get_active_job_ids())
+
+# Background maintenance (keeps housekeeping off the request path)
+APPSTATUS_CACHE_PURGE_INTERVAL = int(os.environ.get('APPSTATUS_CACHE_PURGE_INTERVAL', 300))
+
+# Default cache TTL for the aggregated state view, which shows live status
+APPSTATUS_AGGREGATE_TTL = int(os.environ.get('APPSTATUS_AGGREGATE_TTL', 60))
+register_task('appstatus_cache_purge', cleanup_expired_cache, APPSTATUS_CACHE_PURGE_INTERVAL,
+              run_immediately=True)
+register_task('action_snapshot_prune', prune_action_snapshots, 300)
+AUDIT_PARTITION_INTERVAL = int(os.environ.get('AUDIT_PARTITION_INTERVAL', 3600))
+register_task('audit_partitions', run_partition_maintenance, AUDIT_PARTITION_INTERVAL,
+              run_immediately=True)
+start_scheduler()
+
 # ============================================================================
 # SESSION TIMEOUT MIDDLEWARE
 # ============================================================================
@@ -90,9 +125,11 @@ def check_session_timeout():
                 # If timestamp parsing fails, log it but don't block the request
                 print(f'[SESSION] Error parsing timestamp: {e}')
         
-        # Update last activity timestamp on every request
-        session['last_activity'] = datetime.now().isoformat()
-        session.modified = True
+        # Update last activity timestamp on every request (an open event
+        # stream reconnecting is not user activity)
+        if request.endpoint != 'job_events_stream':
+            session['last_activity'] = datetime.now().isoformat()
+            session.modified = True
 
 # ============================================================================
 
@@ -314,10 +351,162 @@ def get_action_code(action_name):
     return None
 
 
+# Upstream timeout for a set action POST, in seconds
+SET_ACTION_TIMEOUT = 35
+
+# Attempts at recording a set action outcome on its job before giving up
+SET_ACTION_RECORD_ATTEMPTS = 3
+
+
+def _record_set_action_result(job_id, status, http_status=None, error_message=None, response_summary=None):
+    """
+    Record a set action outcome on its job, retrying briefly on failure.
+
+    The upstream call has already happened at this point, so a failed write
+    would leave a remote change with no matching job result.
+
+    Returns:
+        bool: True if the job was updated
+    """
+    for attempt in range(1, SET_ACTION_RECORD_ATTEMPTS + 1):
+        if update_job(job_id=job_id, status=status, http_status=http_status,
+                      error_message=error_message, response_summary=response_summary):
+            return True
+        print(f"[SET_ACTION] WARNING: Failed to record result for job {job_id} (attempt {attempt})")
+        time.sleep(0.2 * attempt)
+    print(f"[SET_ACTION] ERROR: Job {job_id} result not recorded: status={status}, http_status={http_status}")
+    return False
+
+
+def execute_set_action(job_id, url, headers, post_data, content_type, user_id, action_type,
+                       customer_ids, ip_address):
+    """
+    POST a set action upstream and record the outcome on the job and in the audit log.
+    
+    Runs on a job queue worker; proxy_fetch also calls it inline if the job
+    could not be queued.
+    
+    Args:
+        job_id (str): Job created for this action (None if job creation failed)
+        url (str): Upstream /tms/v1/set/action URL
+        headers (dict): Request headers, including Authorization
+        post_data (dict): Request body ({'action': ..., 'cids': [...]})
+        content_type (str): Request content type
+        user_id (str): User who submitted the action
+        action_type (str): Action name
+        customer_ids (list): Customer IDs the action applies to
+        ip_address (str): Client IP captured when the action was submitted
+    
+    Returns:
+        tuple: (response body dict, HTTP status code) in the proxy_fetch response format
+    """
+    def finish(status, http_status, error_message=None, response_summary=None):
+        # Replace the "In progress..." placeholder even when there is no upstream body
+        if response_summary is None:
+            response_summary = error_message
+        if job_id:
+            if _record_set_action_result(job_id, status, http_status, error_message, response_summary):
+                print(f"[SET_ACTION] Job {job_id} updated: status={status}, http_status={http_status}")
+        else:
+            print(f"[SET_ACTION] WARNING: Job creation failed earlier, cannot update with result")
+        log_user_action(
+            user_id=user_id,
+            action_type=action_type,
+            customer_ids=customer_ids,
+            ip_address=ip_address,
+            status='success' if status == 'SUCCESS' else 'failure',
+            error_message=error_message
+        )
+    
+    start_time = time.time()
+    try:
+        if content_type == 'application/x-www-form-urlencoded':
+            response = upstream_post(url, headers=headers, data=post_data, timeout=SET_ACTION_TIMEOUT)
+        else:
+            response = upstream_post(url, headers=headers, json=post_data, timeout=SET_ACTION_TIMEOUT)
+        elapsed_ms = int((time.time() - start_time) * 1000)
+        
+        if response.status_code in [200, 201]:
+            try:
+                json_data = response.json()
+            except ValueError as e:
+                print(f"[PROXY] JSON parse error: {str(e)}")
+                error_msg = f'JSON parse error: {str(e)}'
+                if job_id:
+                    _record_set_action_result(job_id, 'FAILED', 500, error_msg, error_msg)
+                return {
+                    'status': 'error',
+                    'message': f'Invalid JSON response: {str(e)}',
+                    'httpStatus': response.status_code,
+                    'job_id': job_id
+                }, 500
+            
+            api_success = json_data.get('success', True) if isinstance(json_data, dict) else True
+            status = 'SUCCESS' if api_success else 'FAILED'
+            error_msg = json_data.get('message') if isinstance(json_data, dict) and not api_success else None
+            response_summary = json.dumps(json_data) if isinstance(json_data, dict) else str(json_data)
+            
+            print(f"[SET_ACTION] Done: action={action_type}, status={status}, elapsed_ms={elapsed_ms}")
+            finish(status, response.status_code, error_msg, response_summary)
+            
+            return {
+                'status': 'success',
+                'data': json_data,
+                'httpStatus': response.status_code,
+                'job_id': job_id
+            }, 200
+        
+        error_msg = f'API returned status {response.status_code}: {response.text[:200]}'
+        print(f"[SET_ACTION] FAILED: HTTP {response.status_code}, {error_msg}")
+        finish('FAILED', response.status_code, error_msg)
+        
+        return {
+            'status': 'error',
+            'message': error_msg,
+            'httpStatus': response.status_code,
+            'job_id': job_id
+        }, response.status_code
+    
+    except requests.exceptions.Timeout:
+        print(f"[SET_ACTION] TIMEOUT: user={user_id}, action={action_type}")
+        finish('FAILED', None, f'Request timeout after {SET_ACTION_TIMEOUT}s')
+        return {
+            'status': 'error',
+            'message': 'Request timeout',
+            'httpStatus': 408,
+            'job_id': job_id
+        }, 408
+    except requests.exceptions.RequestException as e:
+        print(f"[SET_ACTION] REQUEST_ERROR: user={user_id}, action={action_type}, error={str(e)}")
+        finish('FAILED', None, str(e))
+        return {
+            'status': 'error',
+            'message': str(e),
+            'httpStatus': 500,
+            'job_id': job_id
+        }, 500
+    except Exception as e:
+        print(f"[SET_ACTION] EXCEPTION: user={user_id}, action={action_type}, error={str(e)}")
+        finish('FAILED', None, str(e))
+        return {
+            'status': 'error',
+            'message': f'Server error: {str(e)}',
+            'httpStatus': 500,
+            'job_id': job_id
+        }, 500
+
+
 @app.route('/proxy_fetch', methods=['POST'])
 @require_auth
 def proxy_fetch():
-    """Proxy endpoint to fetch or post data to external API with job tracking"""
+    """
+    Proxy endpoint to fetch or post data to external API with job tracking.
+    
+    Set actions (a POST whose body has 'action' and 'cids') are recorded as
+    an IN_PROGRESS job and handed to the job queue; the response is 202 with
+    the job_id, and clients follow /api/jobs/<job_id>/status for the result.
+    Pass 'async': false to wait for the upstream result instead.
+    """
     # Initialize job_id as None for tracking
     job_id = None
     action_type = None
@@ -331,9 +520,11 @@ def proxy_fetch():
         is_post = data.get('isPost', False)
         post_data = data.get('postData', None)
         content_type = data.get('contentType', 'application/json')
+        run_async = data.get('async', True)
         
-        # Extract action and customer IDs for Set Action requests
-        if post_data and isinstance(post_data, dict):
+        # Extract action and customer IDs for Set Action requests; only a POST
+        # reaches execute_set_action, which is what settles the job and audit row
+        if is_post and post_data and isinstance(post_data, dict):
             action_type = post_data.get('action')
             customer_ids = post_data.get('cids')
         
@@ -366,122 +557,56 @@ def proxy_fetch():
         if token:
             headers['Authorization'] = f'Bearer {token}'
         
+        if action_type and customer_ids:
+            set_action_args = (job_id, url, headers, post_data, content_type, user_id, action_type,
+                               customer_ids, get_client_ip(request))
+            
+            # Hand off to the worker pool; only a recorded job can be followed by the client
+            if job_id and run_async and submit_job(job_id, execute_set_action, *set_action_args):
+                print(f"[SET_ACTION] Job {job_id} queued")
+                return jsonify({
+                    'status': 'queued',
+                    'message': 'Set action queued',
+                    'httpStatus': 202,
+                    'job_id': job_id
+                }), 202
+            
+            body, status_code = execute_set_action(*set_action_args)
+            return jsonify(body), status_code
+        
         if is_post and post_data:
             # Handle different content types
             if content_type == 'application/x-www-form-urlencoded':
-                response = requests.post(url, headers=headers, data=post_data, timeout=35)
+                response = upstream_post(url, headers=headers, data=post_data, timeout=35)
             else:
-                response = requests.post(url, headers=headers, json=post_data, timeout=35)
+                response = upstream_post(url, headers=headers, json=post_data, timeout=35)
         else:
-            response = requests.get(url, headers=headers, timeout=35)
+            # Identical concurrent GETs (same URL and token) share one upstream call
+            response = single_flight_get(url, headers=headers, timeout=35)
         
-        # Prepare response and log action
-        response_data = None
         if response.status_code in [200, 201]:
             try:
-                json_data = response.json()
-                response_data = jsonify({
+                return jsonify({
                     'status': 'success',
-                    'data': json_data,
+                    'data': response.json(),
                     'httpStatus': response.status_code
                 })
-                
-                # Log the action and UPDATE JOB if we have action_type and customer_ids
-                if action_type and customer_ids:
-                    api_success = json_data.get('success', True) if isinstance(json_data, dict) else True
-                    status = 'SUCCESS' if api_success else 'FAILED'
-                    error_msg = json_data.get('message') if isinstance(json_data, dict) and not api_success else None
-                    response_summary = json.dumps(json_data) if isinstance(json_data, dict) else str(json_data)
-                    
-                    # Log to audit log
-                    print(f"[SET_ACTION] Logging audit: action={action_type}, customer_ids={customer_ids}")
-                    log_user_action(
-                        user_id=user_id,
-                        action_type=action_type,
-                        customer_ids=customer_ids,
-                        ip_address=get_client_ip(request),
-                        status='success' if api_success else 'failure',
-                        error_message=error_msg
-                    )
-                    
-                    # UPDATE JOB with result status
-                    if job_id:
-                        update_job(
-                            job_id=job_id,
-                            status=status,
-                            http_status=response.status_code,
-                            error_message=error_msg if not api_success else None,
-                            response_summary=response_summary
-                        )
-                        print(f"[SET_ACTION] Job {job_id} updated: status={status}, http_status={response.status_code}")
-                        # Add job_id to response so frontend can display it
-                        response_json = response_data.get_json()
-                        response_json['job_id'] = job_id
-                        response_data = jsonify(response_json)
-                    else:
-                        print(f"[SET_ACTION] WARNING: Job creation failed earlier, cannot update with result")
-                
-                return response_data
             except ValueError as e:
                 print(f"[PROXY] JSON parse error: {str(e)}")
-                # Update job to FAILED if it was created
-                if job_id:
-                    update_job(job_id=job_id, status='FAILED', http_status=500, 
-                              error_message=f'JSON parse error: {str(e)}')
-                print("="*60 + "\n")
                 return jsonify({
                     'status': 'error',
                     'message': f'Invalid JSON response: {str(e)}',
                     'httpStatus': response.status_code
                 }), 500
-        else:
-            error_msg = f'API returned status {response.status_code}: {response.text[:200]}'
-            
-            # Log failed action
-            if action_type and customer_ids:
-                print(f"[SET_ACTION] FAILED: HTTP {response.status_code}, {error_msg}")
-                log_user_action(
-                    user_id=user_id,
-                    action_type=action_type,
-                    customer_ids=customer_ids,
-                    ip_address=get_client_ip(request),
-                    status='failure',
-                    error_message=error_msg
-                )
-                
-                # UPDATE job to FAILED
-                if job_id:
-                    update_job(job_id=job_id, status='FAILED', http_status=response.status_code,
-                              error_message=error_msg)
-                    print(f"[SET_ACTION] Job {job_id} marked as FAILED")
-            
-            return jsonify({
-                'status': 'error',
-                'message': error_msg,
-                'httpStatus': response.status_code,
-                'job_id': job_id
-            }), response.status_code
+        
+        return jsonify({
+            'status': 'error',
+            'message': f'API returned status {response.status_code}: {response.text[:200]}',
+            'httpStatus': response.status_code,
+            'job_id': job_id
+        }), response.status_code
             
     except requests.exceptions.Timeout:
-        # Log failed action on timeout
-        if action_type and customer_ids:
-            error_msg = 'Request timeout after 30s'
-            print(f"[SET_ACTION] TIMEOUT: user={user_id}, action={action_type}")
-            log_user_action(
-                user_id=user_id,
-                action_type=action_type,
-                customer_ids=customer_ids,
-                ip_address=get_client_ip(request),
-                status='failure',
-                error_message=error_msg
-            )
-            
-            # UPDATE job to FAILED
-            if job_id:
-                update_job(job_id=job_id, status='FAILED', http_status=None,
-                          error_message=error_msg)
-                print(f"[SET_ACTION] Job {job_id} marked as FAILED (timeout)")
-        
         return jsonify({
             'status': 'error',
             'message': 'Request timeout',
@@ -489,25 +614,6 @@ def proxy_fetch():
             'job_id': job_id
         }), 408
     except requests.exceptions.RequestException as e:
-        # Log failed action on request exception
-        if action_type and customer_ids:
-            error_msg = str(e)
-            print(f"[SET_ACTION] REQUEST_ERROR: user={user_id}, action={action_type}, error={error_msg}")
-            log_user_action(
-                user_id=user_id,
-                action_type=action_type,
-                customer_ids=customer_ids,
-                ip_address=get_client_ip(request),
-                status='failure',
-                error_message=error_msg
-            )
-            
-            # UPDATE job to FAILED
-            if job_id:
-                update_job(job_id=job_id, status='FAILED', http_status=None,
-                          error_message=error_msg)
-                print(f"[SET_ACTION] Job {job_id} marked as FAILED (request error)")
-        
         return jsonify({
             'status': 'error',
             'message': str(e),
@@ -528,10 +634,9 @@ def proxy_fetch():
                 error_message=error_msg
             )
             
-            # UPDATE job to FAILED
+            # A job created before the failure must not stay IN_PROGRESS
             if job_id:
-                update_job(job_id=job_id, status='FAILED', http_status=None,
-                          error_message=error_msg)
+                _record_set_action_result(job_id, 'FAILED', None, error_msg, error_msg)
                 print(f"[SET_ACTION] Job {job_id} marked as FAILED (exception)")
         
         return jsonify({
@@ -568,18 +673,34 @@ def get_app_status(customer_id):
 @app.route('/api/audit/trail', methods=['GET'])
 @require_auth
 def get_audit_trail_api():
-    """Get audit trail with optional filters"""
+    """
+    Get audit trail with optional filters
+    
+    start/end (ISO 8601 timestamps in UTC, e.g. '2025-03-01' or
+    '2025-03-01T12:00') limit the window; only the monthly partitions it
+    overlaps are read.
+    """
     try:
         limit = min(int(request.args.get('limit', 50)), 500)  # Max 500 records
         user_id = request.args.get('user_id')
         action_type = request.args.get('action_type')
         customer_id = request.args.get('customer_id')
+        try:
+            start = normalize_timestamp(request.args.get('start'))
+            end = normalize_timestamp(request.args.get('end'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
         
         records = get_audit_trail(
             limit=limit,
             user_id=user_id,
             action_type=action_type,
-            customer_id=customer_id
+            customer_id=customer_id,
+            start=start,
+            end=end
         )
         
         return jsonify({
@@ -595,6 +716,110 @@ def get_audit_trail_api():
         }), 500
 
 
+@app.route('/api/audit/export', methods=['GET'])
+@require_auth
+def export_audit_trail_api():
+    """
+    Stream the audit trail as a CSV or NDJSON download
+    
+    Rows are read and written in batches, so memory use does not grow with
+    the size of the export. customer_ids is written as stored (a JSON list
+    or a single CID), without re-parsing.
+    
+    If reading fails part way, the download ends with an error trailer: an
+    {"error": ..., "partial": true} line for NDJSON, or a '# ERROR: ...' line
+    for CSV.
+    
+    Query parameters:
+        format (str, optional): 'csv' (default) or 'ndjson'
+        user_id, action_type, customer_id (str, optional): Filters, as for /api/audit/trail
+        start, end (str, optional): Time window, as for /api/audit/trail
+        limit (int, optional): Maximum rows (default: all)
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({
+            'success': False,
+            'message': "format must be 'csv' or 'ndjson'"
+        }), 400
+    try:
+        limit = request.args.get('limit')
+        limit = max(1, int(limit)) if limit else None
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'limit must be an integer'
+        }), 400
+    try:
+        start = normalize_timestamp(request.args.get('start'))
+        end = normalize_timestamp(request.args.get('end'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    try:
+        batches = iter_audit_trail(
+            user_id=request.args.get('user_id') or None,
+            action_type=request.args.get('action_type') or None,
+            customer_id=request.args.get('customer_id') or None,
+            start=start,
+            end=end,
+            limit=limit
+        )
+        # Run the query now, so a failure is still reported as an error response
+        first = next(batches, None)
+    except Exception as e:
+        print(f"[AUDIT] ERROR starting export: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+    
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    
+    def format_batch(rows):
+        if export_format == 'ndjson':
+            return ''.join(json.dumps(dict(zip(AUDIT_TRAIL_COLUMNS, row))) + '\n' for row in rows)
+        writer.writerows(rows)
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+    
+    def generate():
+        exported = 0
+        try:
+            if export_format == 'csv':
+                yield format_batch([AUDIT_TRAIL_COLUMNS])
+            if first is not None:
+                exported += len(first)
+                yield format_batch(first)
+                for rows in batches:
+                    exported += len(rows)
+                    yield format_batch(rows)
+            print(f"[AUDIT] Exported {exported} audit rows as {export_format}")
+        except Exception as e:
+            # Headers are already sent; end with a trailer so the partial file is detectable
+            print(f"[AUDIT] ERROR during export after {exported} rows: {str(e)}")
+            message = f'export incomplete after {exported} rows: {str(e)}'
+            if export_format == 'ndjson':
+                yield json.dumps({'error': message, 'partial': True, 'exported': exported}) + '\n'
+            else:
+                yield f'# ERROR: {message}\n'
+        finally:
+            batches.close()
+    
+    filename = f"audit_trail_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no'
+    })
+
+
 @app.route('/api/audit/customer/<customer_id>', methods=['GET'])
 @require_auth
 def get_customer_audit(customer_id):
@@ -657,6 +882,63 @@ def get_audit_stats_api():
             'message': str(e)
         }), 500
 
+@app.route('/api/audit/rollups', methods=['GET'])
+@require_auth
+def get_audit_rollups_api():
+    """
+    Get hourly or daily audit counts
+    
+    Query parameters:
+        period (str, optional): 'hour' (default) or 'day'
+        start (str, optional): ISO date/datetime, UTC unless it has an offset
+                               (e.g. '2025-01-01' or '2025-01-01T10:00'); its bucket is the first one
+        end (str, optional): ISO date/datetime; only buckets starting before it
+        user_id (str, optional): Only this user
+        action_type (str, optional): Only this action type
+        group_by (str, optional): 'user', 'action' or 'user_action'
+        limit (int, optional): Maximum rows (default: 1000, max: 10000)
+    
+    Returns:
+        {
+            'success': bool,
+            'period': str,
+            'count': int,
+            'rollups': [{'bucket': str, 'entries': int, 'successes': int,
+                         'failures': int, 'avg_duration_ms': float, ...}]
+        }
+    """
+    try:
+        period = request.args.get('period', 'hour')
+        try:
+            limit = max(1, min(int(request.args.get('limit', 1000)), 10000))
+            rollups = get_audit_rollups(
+                period=period,
+                start=request.args.get('start') or None,
+                end=request.args.get('end') or None,
+                user_id=request.args.get('user_id') or None,
+                action_type=request.args.get('action_type') or None,
+                group_by=request.args.get('group_by') or None,
+                limit=limit
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query parameter: {str(e)}'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'period': period,
+            'count': len(rollups),
+            'rollups': rollups
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
 # ============================================================================
 # JOB MANAGEMENT ROUTES (Phase 1: Job Creation & Retrieval)
 # ============================================================================
@@ -743,22 +1025,60 @@ def create_job_endpoint():
 @require_auth
 def get_user_jobs_endpoint():
     """
-    Get all jobs for the logged-in user, ordered by newest first
+    Get the logged-in user's jobs, newest first, one page at a time
     
     Query parameters:
-        limit (int, optional): Max jobs to return (default: 50, max: 500)
+        limit (int, optional): Page size (default: 50, max: 500)
+        cursor (str, optional): next_cursor from the previous page
+        status (str, optional): IN_PROGRESS, SUCCESS or FAILED
+        action_code (int, optional): Only this action code
+        cluster_url (str, optional): Only this cluster (jobs are stored by base URL,
+            e.g. https://cnx-apigw-...; a URL under /tms/ is reduced to it)
+        created_from (str, optional): ISO timestamp in server local time, inclusive
+        created_to (str, optional): ISO timestamp in server local time, exclusive
+    
+    Returns:
+        {
+            'success': bool,
+            'user_id': str,
+            'job_count': int (jobs in this page),
+            'jobs': [...],
+            'next_cursor': str or None,
+            'has_more': bool
+        }
     """
     try:
         user_id = session.get('user_id')
-        limit = min(int(request.args.get('limit', 50)), 500)
         
-        jobs = get_user_jobs(user_id, limit=limit)
+        try:
+            limit = max(1, min(int(request.args.get('limit', 50)), 500))
+            action_code = request.args.get('action_code')
+            action_code = int(action_code) if action_code else None
+            page = get_user_jobs_page(
+                user_id,
+                limit=limit,
+                cursor=request.args.get('cursor') or None,
+                status=request.args.get('status') or None,
+                action_code=action_code,
+                cluster_url=request.args.get('cluster_url') or None,
+                created_from=request.args.get('created_from') or None,
+                created_to=request.args.get('created_to') or None
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query parameter: {str(e)}'
+            }), 400
+        
+        jobs = page['jobs']
         
         return jsonify({
             'success': True,
             'user_id': user_id,
             'job_count': len(jobs),
-            'jobs': jobs
+            'jobs': jobs,
+            'next_cursor': page['next_cursor'],
+            'has_more': page['next_cursor'] is not None
         }), 200
         
     except Exception as e:
@@ -769,6 +1089,136 @@ def get_user_jobs_endpoint():
         }), 500
 
 
+@app.route('/api/customers/<customer_id>/jobs', methods=['GET'])
+@require_auth
+def get_customer_jobs_endpoint(customer_id):
+    """
+    Get the jobs that included a customer, newest first, one page at a time
+    
+    Regular users only see their own jobs. Admins see every user's jobs,
+    or one user's with the user_id parameter.
+    
+    Query parameters:
+        limit (int, optional): Page size (default: 50, max: 500)
+        cursor (str, optional): next_cursor from the previous page
+        user_id (str, optional): Admins only - restrict to this user's jobs
+    
+    Returns:
+        {
+            'success': bool,
+            'customer_id': str,
+            'job_count': int (jobs in this page),
+            'jobs': [...],
+            'next_cursor': str or None,
+            'has_more': bool
+        }
+    """
+    try:
+        if is_admin_user():
+            owner = request.args.get('user_id') or None
+        else:
+            owner = session.get('user_id')
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit', 50)), 500))
+            page = get_jobs_for_customer(
+                customer_id,
+                user_id=owner,
+                limit=limit,
+                cursor=request.args.get('cursor') or None
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': f'Invalid query parameter: {str(e)}'
+            }), 400
+        
+        jobs = page['jobs']
+        
+        return jsonify({
+            'success': True,
+            'customer_id': customer_id,
+            'job_count': len(jobs),
+            'jobs': jobs,
+            'next_cursor': page['next_cursor'],
+            'has_more': page['next_cursor'] is not None
+        }), 200
+        
+    except Exception as e:
+        print(f"[JOBS] ERROR in get_customer_jobs_endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+
+# Seconds between keep-alive comments on an idle job event stream
+JOB_EVENTS_HEARTBEAT_SECONDS = 15
+
+# Streams are closed after this long so the browser reconnects and the
+# session timeout is checked again
+JOB_EVENTS_MAX_STREAM_SECONDS = SESSION_TIMEOUT_MINUTES * 60
+
+
+@app.route('/api/jobs/events', methods=['GET'])
+@require_auth
+def job_events_stream():
+    """
+    Server-Sent Events stream of the current user's job lifecycle events.
+    
+    Each event is sent as 'event: job' with JSON data:
+        {
+            'event': 'created' | 'in_progress' | 'success' | 'failed',
+            'job_id': str,
+            'action_name': str,
+            'status': str,
+            'http_status': int or None,
+            'error_message': str or None,
+            'updated_at': str,
+            ...
+        }
+    
+    Idle streams get a comment line every JOB_EVENTS_HEARTBEAT_SECONDS.
+    
+    Under app.run(threaded=True) each open stream holds one server thread until
+    it closes; JOB_EVENTS_MAX_SUBSCRIBERS caps them, and requests past the cap
+    get a 503.
+    """
+    user_id = session.get('user_id')
+    subscription = subscribe(user_id)
+    if subscription is None:
+        return jsonify({
+            'success': False,
+            'message': 'Too many open event streams, try again later'
+        }), 503
+    
+    print(f"[JOBS] Event stream opened for user {user_id}")
+    
+    def generate():
+        deadline = time.time() + JOB_EVENTS_MAX_STREAM_SECONDS
+        yield 'retry: 5000\n: connected\n\n'
+        while time.time() < deadline:
+            event = subscription.get(timeout=JOB_EVENTS_HEARTBEAT_SECONDS)
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            payload = dict(event['data'], event=event['type'])
+            yield f"id: {event['id']}\nevent: job\ndata: {json.dumps(payload)}\n\n"
+    
+    def close_stream():
+        unsubscribe(subscription)
+        print(f"[JOBS] Event stream closed for user {user_id}")
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the server closes the response, even if the client went away
+    # before the generator was first advanced (its finally would never run)
+    response.call_on_close(close_stream)
+    return response
+
+
 @app.route('/api/jobs/<job_id>/customers', methods=['GET'])
 @require_auth
 def get_job_customers_endpoint(job_id):
@@ -822,22 +1272,106 @@ def get_job_customers_endpoint(job_id):
         }), 500
 
 
+@app.route('/api/jobs/<job_id>/status', methods=['GET'])
+@require_auth
+def get_job_status_endpoint(job_id):
+    """
+    Get the execution status of a job (used to follow queued set actions)
+    
+    Returns:
+        {
+            'success': bool,
+            'job_id': str,
+            'status': 'IN_PROGRESS' | 'SUCCESS' | 'FAILED',
+            'queue_state': 'queued' | 'running' | None,
+            'http_status': int or None,
+            'error_message': str or None,
+            'created_at': str,
+            'updated_at': str or None,
+            'customer_count': int,
+            'result': upstream response (parsed JSON when possible) or None
+        }
+    """
+    try:
+        user_id = session.get('user_id')
+        
+        job = get_job_details(job_id)
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': f'Job not found: {job_id}'
+            }), 404
+        
+        # Verify user owns this job
+        if job['user_id'] != user_id:
+            print(f"[JOBS] Access denied: user {user_id} tried to access job owned by {job['user_id']}")
+            return jsonify({
+                'success': False,
+                'message': 'Access denied: job belongs to another user'
+            }), 403
+        
+        result = None
+        if job['status'] != 'IN_PROGRESS' and job['response_summary']:
+            try:
+                result = json.loads(job['response_summary'])
+            except ValueError:
+                result = job['response_summary']
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': job['status'],
+            'queue_state': get_job_queue_state(job_id),
+            'http_status': job['http_status'],
+            'error_message': job['error_message'],
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at'],
+            'customer_count': job['customer_count'],
+            'result': result
+        }), 200
+        
+    except Exception as e:
+        print(f"[JOBS] ERROR in get_job_status_endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+
 @app.route('/api/jobs/<job_id>/actions', methods=['GET'])
 @require_auth
 def get_job_actions_endpoint(job_id):
     """
-    Fetch upstream GET /tms/v1/get/action?cid=ALL and filter to only job's CIDs
+    Look up the job's CIDs in the cluster's action map (GET /tms/v1/get/action?cid=ALL)
+    
+    The map is served from a short-TTL snapshot per cluster and token
+    (see src/action_snapshot.py); it is only downloaded again once the
+    snapshot is older than ACTION_SNAPSHOT_TTL or refresh=true is passed.
+    With snapshots disabled, or stream=true, the map is streamed and parsed
+    incrementally, keeping only the job's CIDs.
     
     Query parameters:
         token (str, required): Bearer token for upstream API
         cluster_url (str, required): Base URL of the cluster (e.g., https://cnx-apigw-...)
+        refresh (bool, optional): Set to 'true' to force a fresh download
+        stream (bool, optional): Set to 'true' to bypass the snapshot and stream
     
     Returns:
         {
             'success': bool,
             'job_id': str,
             'customer_count': int,
-            'actions': { "cid": {"action_code": int, "action_desc": str}, ... }
+            'actions': { "cid": {"action_code": int, "action_desc": str}, ... },
+            'snapshot': {                       # snapshot path
+                'from_snapshot': bool,
+                'age_seconds': float,
+                'cid_count': int,
+                'size_bytes': int
+            },
+            'stream': {                         # streaming path
+                'cid_count': int,
+                'size_bytes': int
+            }
         }
     """
     try:
@@ -862,6 +1396,8 @@ def get_job_actions_endpoint(job_id):
         # Get token and cluster URL from query params
         token = request.args.get('token')
         cluster_url = request.args.get('cluster_url')
+        refresh = request.args.get('refresh', 'false').lower() == 'true'
+        stream = request.args.get('stream', 'false').lower() == 'true' or not snapshots_enabled()
         
         if not token:
             return jsonify({
@@ -888,51 +1424,60 @@ def get_job_actions_endpoint(job_id):
         # Normalize cluster URL
         cluster_url = cluster_url.rstrip('/')
         
-        # Fetch upstream: GET /tms/v1/get/action?cid=ALL
-        upstream_url = f'{cluster_url}/tms/v1/get/action?cid=ALL'
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-        
-        print(f"[JOBS] Fetching upstream actions from {upstream_url}")
+        if stream:
+            # Parse the map incrementally, keeping only this job's CIDs
+            streamed = fetch_actions_streaming(cluster_url, token, job_cids)
+            
+            if streamed['error']:
+                print(f"[JOBS] ERROR: {streamed['error']}")
+                return jsonify({
+                    'success': False,
+                    'message': streamed['error']
+                }), streamed['http_status']
+            
+            print(f"[JOBS] Streamed {streamed['cid_count']} upstream CIDs ({streamed['size_bytes']} bytes), "
+                  f"kept {len(streamed['actions'])} job customers")
+            
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'customer_count': len(streamed['actions']),
+                'actions': streamed['actions'],
+                'stream': {
+                    'cid_count': streamed['cid_count'],
+                    'size_bytes': streamed['size_bytes']
+                }
+            }), 200
         
-        response = requests.get(upstream_url, headers=headers, timeout=30)
+        # Cluster-wide action map, from this token's snapshot unless it is stale
+        result = get_action_snapshot(cluster_url, token, refresh=refresh)
         
-        if response.status_code != 200:
-            error_msg = f'Upstream API returned {response.status_code}: {response.text[:200]}'
-            print(f"[JOBS] ERROR: {error_msg}")
+        if result['error']:
+            print(f"[JOBS] ERROR: {result['error']}")
             return jsonify({
                 'success': False,
-                'message': error_msg
-            }), response.status_code
+                'message': result['error']
+            }), result['http_status']
         
-        # Parse upstream response
-        try:
-            all_actions = response.json()
-        except ValueError as e:
-            error_msg = f'Invalid JSON from upstream: {str(e)}'
-            print(f"[JOBS] ERROR: {error_msg}")
-            return jsonify({
-                'success': False,
-                'message': error_msg
-            }), 500
+        snapshot = result['snapshot']
         
-        # Filter to only job's CIDs
-        job_cid_set = set(job_cids)
-        filtered_actions = {
-            cid: action_data 
-            for cid, action_data in all_actions.items() 
-            if cid in job_cid_set
-        }
+        # Look up only the job's CIDs in the indexed snapshot
+        filtered_actions = select_actions(snapshot, job_cids)
         
-        print(f"[JOBS] Filtered {len(all_actions)} upstream results to {len(filtered_actions)} job customers")
+        print(f"[JOBS] Matched {len(filtered_actions)} of {len(job_cids)} job customers against "
+              f"{snapshot['cid_count']} CIDs in action snapshot (from_snapshot={result['from_snapshot']})")
         
         return jsonify({
             'success': True,
             'job_id': job_id,
             'customer_count': len(filtered_actions),
-            'actions': filtered_actions
+            'actions': filtered_actions,
+            'snapshot': {
+                'from_snapshot': result['from_snapshot'],
+                'age_seconds': round(time.time() - snapshot['fetched_at'], 1),
+                'cid_count': snapshot['cid_count'],
+                'size_bytes': snapshot['size_bytes']
+            }
         }), 200
         
     except requests.exceptions.Timeout:
@@ -975,6 +1520,13 @@ def get_job_appstatus_endpoint(job_id):
         app (str, optional): App name to query (default 'ALL')
         ttl_seconds (int, optional): Cache TTL in seconds (default 1800 = 30 min)
         skip_cache (bool, optional): Set to 'true' to bypass cache
+        deadline_seconds (float, optional): Overall budget for the single-CID
+            fallback (default APPSTATUS_FALLBACK_DEADLINE)
+        stale_while_revalidate (bool, optional): Set to 'true' to serve entries
+            past their TTL immediately (flagged stale) and refresh them in the
+            background instead of fetching them inline
+        max_stale_seconds (int, optional): How far past the TTL an entry may be
+            served stale (default and maximum APPSTATUS_STALE_GRACE_SECONDS)
     
     Returns:
         {
@@ -983,11 +1535,16 @@ def get_job_appstatus_endpoint(job_id):
             'customer_count': int,
             'cache_hits': int,
             'cache_misses': int,
+            'stale_count': int,
+            'refresh_queued': int,
+            'partial': bool (True if the fallback deadline hit),
+            'pending_count': int,
             'appstatus': {
                 'cid': {
                     'app': str,
                     'status': str,
-                    'from_cache': bool
+                    'from_cache': bool,
+                    'stale': bool
                 },
                 ...
             }
@@ -1018,6 +1575,10 @@ def get_job_appstatus_endpoint(job_id):
         app_name = request.args.get('app', 'ALL')
         ttl_seconds = int(request.args.get('ttl_seconds', 1800))
         skip_cache = request.args.get('skip_cache', 'false').lower() == 'true'
+        deadline_seconds = float(request.args.get('deadline_seconds', APPSTATUS_FALLBACK_DEADLINE))
+        stale_while_revalidate = request.args.get('stale_while_revalidate', 'false').lower() == 'true'
+        max_stale_seconds = min(int(request.args.get('max_stale_seconds', APPSTATUS_STALE_GRACE_SECONDS)),
+                                single_cid_cache_app, APPSTATUS_STALE_GRACE_SECONDS)
         
         if not token:
             return jsonify({
@@ -1040,6 +1601,10 @@ def get_job_appstatus_endpoint(job_id):
                 'customer_count': 0,
                 'cache_hits': 0,
                 'cache_misses': 0,
+                'stale_count': 0,
+                'refresh_queued': 0,
+                'partial': False,
+                'pending_count': 0,
                 'appstatus': {}
             }), 200
         
@@ -1049,21 +1614,44 @@ def get_job_appstatus_endpoint(job_id):
         appstatus_result = {}
         cache_hits = 0
         cache_misses = 0
+        stale_count = 0
+        refresh_queued = 0
+        pending_count = 0
         
         if not skip_cache:
             # Try to get from cache
-            cache_result = get_cached_appstatus_batch(job_cids, app_name, ttl_seconds)
+            stale_seconds = max_stale_seconds if stale_while_revalidate else 0
+            cache_result = get_cached_appstatus_batch(job_cids, app_name, ttl_seconds, stale_seconds)
             cache_hits = cache_result['hit_count']
             cache_misses = cache_result['miss_count']
+            stale_count = cache_result['stale_count']
             
             # Add cache hits to result
             for cid, status_data in cache_result['hits'].items():
                 appstatus_result[cid] = {
                     'app': app_name,
-                    'status': status_data.get('status', 'unknown'),
-                    'from_cache': True
+                    'status': summarize_status(status_data),
+                    'from_cache': True,
+                    'stale': False
+                }
+            
+            # Serve stale entries now; refresh them off the request path
+            for cid, status_data in cache_result['stale'].items():
+                appstatus_result[cid] = {
+                    'app': app_name,
+                    'status': summarize_status(status_data),
+                    'from_cache': True,
+                    'stale': True
                 }
             
+            if cache_result['stale']:
+                def cache_refreshed(results):
+                    cache_appstatus_bulk(results, app_name, ttl_seconds)
+                
+                refresh_queued = enqueue_refresh(list(cache_result['stale']), cluster_url, token,
+                                                 cache_refreshed, app_name)
+                print(f"[APPSTATUS] Serving {stale_count} stale CIDs, {refresh_queued} queued for refresh")
+            
             job_cids_to_fetch = cache_result['misses']
         else:
             job_cids_to_fetch = job_cids
@@ -1074,98 +1662,65 @@ def get_job_appstatus_endpoint(job_id):
             print(f"[APPSTATUS] Fetching {len(job_cids_to_fetch)} CIDs from upstream")
             
             cluster_url = cluster_url.rstrip('/')
-            headers = {
-                'Authorization': f'Bearer {token}',
-                'Content-Type': 'application/json'
-            }
             
-            # Try batch fetch first (if upstream supports app?ALL&cid=ALL)
-            batch_success = False
-            try:
-                # Try batch format: /tms/v1/get/appstatus?app=<app>&cid=<cid1>,<cid2>,...
-                cid_list = ','.join(job_cids_to_fetch)
-                upstream_url = f'{cluster_url}/tms/v1/get/appstatus?app={app_name}&cid={cid_list}'
-                
-                print(f"[APPSTATUS] Trying batch fetch: {upstream_url[:100]}...")
-                response = requests.get(upstream_url, headers=headers, timeout=30)
-                
-                if response.status_code == 200:
-                    try:
-                        batch_data = response.json()
-                        
-                        if isinstance(batch_data, dict):
-                            # Cache and add results
-                            for cid, status_data in batch_data.items():
-                                if cid in job_cids_to_fetch:
-                                    cache_appstatus(cid, status_data, app_name, ttl_seconds)
-                                    appstatus_result[cid] = {
-                                        'app': app_name,
-                                        'status': status_data.get('status', 'unknown'),
-                                        'from_cache': False
-                                    }
-                            
-                            batch_success = True
-                            print(f"[APPSTATUS] Batch fetch succeeded: {len(batch_data)} results")
-                        
-                    except Exception as e:
-                        print(f"[APPSTATUS] Batch parse error: {str(e)}")
-                        batch_success = False
+            # Try batch fetch first, in URL-length-bounded chunks issued concurrently
+            # Batch format: /tms/v1/get/appstatus?app=<app>&cid=<cid1>,<cid2>,...
+            batch = fetch_appstatus_batch_chunked(job_cids_to_fetch, cluster_url, token, app_name)
             
-            except Exception as e:
-                print(f"[APPSTATUS] Batch fetch failed: {str(e)}")
-                batch_success = False
+            cache_appstatus_bulk(batch['results'], app_name, ttl_seconds)
+            for cid, status_data in batch['results'].items():
+                appstatus_result[cid] = {
+                    'app': app_name,
+                    'status': summarize_status(status_data),
+                    'from_cache': False,
+                    'stale': False
+                }
+            
+            print(f"[APPSTATUS] Batch fetch: {len(batch['results'])} results from {batch['chunk_count']} chunk(s), "
+                  f"{len(batch['failed'])} CIDs failed")
             
-            # If batch failed, try single CID fetching
+            # Only CIDs from failed chunks go to the slow path
+            batch_success = not batch['failed']
+            job_cids_to_fetch = batch['failed']
+            
+            # If any chunk failed, fetch its CIDs singly and concurrently under an overall deadline
             if not batch_success:
-                print(f"[APPSTATUS] Falling back to single CID fetch for {len(job_cids_to_fetch)} CIDs")
+                print(f"[APPSTATUS] Falling back to single CID fetch for {len(job_cids_to_fetch)} CIDs (deadline {deadline_seconds}s)")
                 
-                for cid in job_cids_to_fetch:
-                    try:
-                        single_url = f'{cluster_url}/tms/v1/get/appstatus?app={app_name}&cid={cid}'
-                        response = requests.get(single_url, headers=headers, timeout=10)
-                        
-                        if response.status_code == 200:
-                            try:
-                                status_data = response.json()
-                                cache_appstatus(cid, status_data, app_name, ttl_seconds)
-                                appstatus_result[cid] = {
-                                    'app': app_name,
-                                    'status': status_data.get('status', 'unknown'),
-                                    'from_cache': False
-                                }
-                            except:
-                                appstatus_result[cid] = {
-                                    'app': app_name,
-                                    'status': 'fetch_error',
-                                    'from_cache': False
-                                }
-                        else:
-                            appstatus_result[cid] = {
-                                'app': app_name,
-                                'status': f'http_{response.status_code}',
-                                'from_cache': False
-                            }
-                    
-                    except requests.exceptions.Timeout:
-                        appstatus_result[cid] = {
-                            'app': app_name,
-                            'status': 'timeout',
-                            'from_cache': False
-                        }
-                    
-                    except Exception as e:
-                        appstatus_result[cid] = {
-                            'app': app_name,
-                            'status': 'error',
-                            'from_cache': False
-                        }
+                def cache_single_result(cid, result):
+                    # Runs in the worker thread: each result is queued to the background
+                    # cache writer as it completes and committed in batches
+                    if result['error'] is None:
+                        cache_appstatus_bulk({cid: result['data']}, app_name, ttl_seconds, defer=True)
                 
-                print(f"[APPSTATUS] Single fetch completed: {len(appstatus_result)} CIDs processed")
-        
-        # Cleanup expired cache periodically
-        cleanup_expired_cache(ttl_seconds)
+                fallback = fetch_appstatus_concurrent(
+                    job_cids_to_fetch, cluster_url, token, app_name,
+                    deadline_seconds=deadline_seconds,
+                    on_result=cache_single_result
+                )
+                
+                for cid, result in fallback['results'].items():
+                    appstatus_result[cid] = {
+                        'app': app_name,
+                        'status': summarize_status(result['data']) if result['error'] is None else result['error'],
+                        'from_cache': False,
+                        'stale': False
+                    }
+                
+                for cid in fallback['pending']:
+                    appstatus_result[cid] = {
+                        'app': app_name,
+                        'status': 'pending',
+                        'from_cache': False,
+                        'stale': False
+                    }
+                pending_count = len(fallback['pending'])
+                
+                print(f"[APPSTATUS] Single fetch completed in {fallback['elapsed_ms']}ms: "
+                      f"{len(fallback['results'])} CIDs processed, {pending_count} pending")
         
-        print(f"[APPSTATUS] Returning {len(appstatus_result)} CIDs (hits: {cache_hits}, misses: {cache_misses})")
+        print(f"[APPSTATUS] Returning {len(appstatus_result)} CIDs "
+              f"(hits: {cache_hits}, stale: {stale_count}, misses: {cache_misses})")
         
         return jsonify({
             'success': True,
@@ -1173,6 +1728,10 @@ def get_job_appstatus_endpoint(job_id):
             'customer_count': len(job_cids),
             'cache_hits': cache_hits,
             'cache_misses': cache_misses,
+            'stale_count': stale_count,
+            'refresh_queued': refresh_queued,
+            'partial': pending_count > 0,
+            'pending_count': pending_count,
             'appstatus': appstatus_result
         }), 200
         
@@ -1184,6 +1743,130 @@ def get_job_appstatus_endpoint(job_id):
         }), 500
 
 
+@app.route('/api/appstatus/aggregate', methods=['POST'])
+@require_auth
+def get_aggregated_appstatus_endpoint():
+    """
+    Fetch app status for a list of customers in one request, with caching
+    
+    Cache misses are fanned out to upstream /tms/v1/get/appstatus on a
+    bounded worker pool, so the browser makes one call instead of one per CID.
+    
+    Expected request body:
+    {
+        'cids': list of customer IDs,
+        'token': str (required),
+        'cluster_url': str (required),
+        'app': str (optional, default 'ALL'),
+        'ttl_seconds': int (optional, default APPSTATUS_AGGREGATE_TTL),
+        'skip_cache': bool (optional)
+    }
+    
+    Single-CID payloads are cached under their own key (single_cid_cache_app),
+    separate from the per-CID dicts the batch path stores.
+    
+    Returns:
+        {
+            'success': bool,
+            'customer_count': int,
+            'cache_hits': int,
+            'cache_misses': int,
+            'auth_error': bool,
+            'results': [
+                {'customerId': str, 'data': ..., 'error': str or None, 'from_cache': bool},
+                ...
+            ]
+        }
+    """
+    try:
+        data = request.get_json() or {}
+        cids = data.get('cids', [])
+        token = data.get('token')
+        cluster_url = data.get('cluster_url')
+        app_name = data.get('app', 'ALL')
+        ttl_seconds = int(data.get('ttl_seconds', APPSTATUS_AGGREGATE_TTL))
+        skip_cache = bool(data.get('skip_cache', False))
+        cache_app = single_cid_cache_app(app_name)
+        
+        if not isinstance(cids, list) or len(cids) == 0:
+            return jsonify({
+                'success': False,
+                'message': 'cids must be a non-empty list'
+            }), 400
+        
+        if not token:
+            return jsonify({
+                'success': False,
+                'message': 'token is required'
+            }), 400
+        
+        if not cluster_url:
+            return jsonify({
+                'success': False,
+                'message': 'cluster_url is required'
+            }), 400
+        
+        # De-duplicate while keeping the caller's order
+        cids = list(dict.fromkeys(cids))
+        
+        print(f"[APPSTATUS] Aggregate request: {len(cids)} customers, app={app_name}")
+        
+        cached = {}
+        if not skip_cache:
+            cache_result = get_cached_appstatus_batch(cids, cache_app, ttl_seconds)
+            cached = cache_result['hits']
+            cids_to_fetch = cache_result['misses']
+        else:
+            cids_to_fetch = cids
+        
+        fetched = {}
+        if cids_to_fetch:
+            fetched = fetch_appstatus_fanout(cids_to_fetch, cluster_url, token, app_name)
+            cache_appstatus_bulk(
+                {cid: result['data'] for cid, result in fetched.items() if result['error'] is None},
+                cache_app, ttl_seconds
+            )
+        
+        auth_error = False
+        results = []
+        for cid in cids:
+            if cid in cached:
+                results.append({
+                    'customerId': cid,
+                    'data': cached[cid],
+                    'error': None,
+                    'from_cache': True
+                })
+            else:
+                result = fetched.get(cid, {'data': None, 'error': 'error', 'http_status': None})
+                if result['http_status'] in (401, 403):
+                    auth_error = True
+                results.append({
+                    'customerId': cid,
+                    'data': result['data'],
+                    'error': result['error'],
+                    'from_cache': False
+                })
+        
+        print(f"[APPSTATUS] Aggregate returning {len(results)} CIDs (hits: {len(cached)}, fetched: {len(fetched)})")
+        
+        return jsonify({
+            'success': True,
+            'customer_count': len(cids),
+            'cache_hits': len(cached),
+            'cache_misses': len(cids_to_fetch),
+            'auth_error': auth_error,
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        print(f"[APPSTATUS] ERROR in get_aggregated_appstatus_endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+
 @app.route('/api/cache/stats', methods=['GET'])
 @require_auth
 def get_cache_stats_endpoint():
@@ -1196,13 +1879,38 @@ def get_cache_stats_endpoint():
             'stats': {
                 'total_entries': int,
                 'unique_cids': int,
+                'expired_entries': int,
                 'size_bytes': int,
-                'size_kb': float
+                'size_kb': float,
+                'memory': {
+                    'entries': int,
+                    'max_entries': int,
+                    'hits': int,
+                    'misses': int,
+                    'evictions': int,
+                    'expirations': int,
+                    'hit_rate': float
+                },
+                'purge': {
+                    'last_run_at': str,
+                    'last_duration_ms': float,
+                    'last_rows': int,
+                    ...
+                },
+                'refresh': {
+                    'pending': int,
+                    'queued': int,
+                    'deduplicated': int,
+                    'dropped': int,
+                    ...
+                }
             }
         }
     """
     try:
         stats = get_cache_stats()
+        stats['purge'] = get_maintenance_stats()['tasks'].get('appstatus_cache_purge')
+        stats['refresh'] = get_refresh_stats()
         return jsonify({
             'success': True,
             'stats': stats
@@ -1258,6 +1966,253 @@ def invalidate_cache_endpoint():
             'message': str(e)
         }), 500
 
+@app.route('/api/admin/upstream/stats', methods=['GET'])
+@require_admin
+def get_upstream_stats_endpoint():
+    """
+    Get upstream connection pool statistics (admin only)
+
+    Returns:
+        {
+            'success': bool,
+            'stats': {
+                'config': {...},
+                'hosts': {
+                    'https://host': {
+                        'requests': int,
+                        'errors': int,
+                        'active_connections': int,
+                        'idle_connections': int,
+                        'opened_connections': int,
+                        'reused_connections': int,
+                        'avg_elapsed_ms': float
+                    }
+                },
+                'appstatus_chunk_limits': {
+                    'https://cluster': {'limit': int, 'largest_accepted': int, ...}
+                },
+                'single_flight': {
+                    'upstream_calls': int,
+                    'coalesced': int,
+                    'errors': int,
+                    'in_flight': int
+                },
+                'action_snapshots': {
+                    'ttl_seconds': float,
+                    'hits': int,
+                    'refreshes': int,
+                    'clusters': {'https://cluster': {'age_seconds': float, 'cid_count': int, 'size_bytes': int}}
+                }
+            }
+        }
+    """
+    try:
+        stats = get_pool_stats()
+        stats['appstatus_chunk_limits'] = get_chunk_stats()
+        stats['single_flight'] = get_single_flight_stats()
+        stats['action_snapshots'] = get_snapshot_stats()
+        return jsonify({
+            'success': True,
+            'stats': stats
+        }), 200
+    except Exception as e:
+        print(f"[UPSTREAM] ERROR getting pool stats: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/api/admin/db/stats', methods=['GET'])
+@require_admin
+def get_db_pool_stats_endpoint():
+    """
+    Get SQLite connection pool statistics (admin only)
+
+    Returns:
+        {
+            'success': bool,
+            'stats': {
+                'config': {'pool_size': int, 'timeout_seconds': float},
+                'pools': {
+                    '/path/to/jobs.db': {
+                        'open_connections': int,
+                        'idle_connections': int,
+                        'in_use_connections': int,
+                        'connections_opened': int,
+                        'acquires': int,
+                        'reused': int,
+                        'waits': int,
+                        'overflow': int,
+                        ...
+                    }
+                }
+            }
+        }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_db_pool_stats()
+        }), 200
+    except Exception as e:
+        print(f"[DB] ERROR getting pool stats: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@app.route('/api/admin/maintenance/stats', methods=['GET'])
+@require_admin
+def get_maintenance_stats_endpoint():
+    """
+    Get background maintenance task statistics (admin only)
+
+    Returns:
+        {
+            'success': bool,
+            'stats': {
+                'running': bool,
+                'tasks': {
+                    'appstatus_cache_purge': {
+                        'interval_seconds': int,
+                        'runs': int,
+                        'last_run_at': str,
+                        'last_duration_ms': float,
+                        'last_rows': int,
+                        'rows_total': int,
+                        ...
+                    }
+                }
+            }
+        }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_maintenance_stats()
+        }), 200
+    except Exception as e:
+        print(f"[MAINTENANCE] ERROR getting stats: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/admin/audit/writer/stats', methods=['GET'])
+@require_admin
+def get_audit_writer_stats_endpoint():
+    """
+    Get background audit writer statistics (admin only)
+
+    Returns:
+        {
+            'success': bool,
+            'stats': {
+                'enabled': bool,
+                'overflow_policy': 'sync' | 'drop',
+                'queue_depth': int,
+                'oldest_queued_ms': float,
+                'written': int,
+                'batches': int,
+                'failed': int,
+                'dropped': int,
+                'last_lag_ms': float,
+                'max_lag_ms': float,
+                ...
+            }
+        }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_audit_writer_stats()
+        }), 200
+    except Exception as e:
+        print(f"[AUDIT_WRITER] ERROR getting stats: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/admin/audit/partitions', methods=['GET'])
+@require_admin
+def get_audit_partitions_endpoint():
+    """
+    Get the audit log partition layout (admin only)
+
+    Returns:
+        {
+            'success': bool,
+            'partitions': {
+                'current_month': str,
+                'current_rows': int,
+                'retention_months': int,
+                'archive_enabled': bool,
+                'archive_dir': str,
+                'partitions': [{'month': str, 'table_name': str, 'row_count': int, 'updated_at': str}],
+                'archives': [{'month': str, 'row_count': int, 'archive_path': str, 'dropped_at': str}]
+            }
+        }
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'partitions': get_partition_info()
+        }), 200
+    except Exception as e:
+        print(f"[AUDIT_PARTITIONS] ERROR getting partition info: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+
+@app.route('/api/admin/jobs/queue/stats', methods=['GET'])
+@require_admin
+def get_job_queue_stats_endpoint():
+    """
+    Get set action worker pool and job event stream statistics (admin only)
+
+    Returns:
+        {
+            'success': bool,
+            'stats': {
+                'workers': int,
+                'queue_size': int,
+                'queued': int,
+                'running': int,
+                'oldest_queued_seconds': float,
+                'submitted': int,
+                'completed': int,
+                'failed': int,
+                'rejected': int,
+                'events': {
+                    'subscribers': int,
+                    'users': int,
+                    'published': int,
+                    'delivered': int,
+                    'dropped': int,
+                    ...
+                }
+            }
+        }
+    """
+    try:
+        stats = get_job_queue_stats()
+        stats['events'] = get_event_stats()
+        return jsonify({
+            'success': True,
+            'stats': stats
+        }), 200
+    except Exception as e:
+        print(f"[JOB_QUEUE] ERROR getting stats: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
 @app.route('/health')
 
 
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: filtering the cid=ALL action map for one job
+Compares decoding the whole body with json.loads() and then picking the job's
+CIDs against filter_object_stream() over 64 KB chunks, for a synthetic
+30k-CID map and a 150-CID job. Reports best-of-3 wall time and peak Python
+memory (tracemalloc, measured on a separate run) for each path.
+
+Usage:
+    python bench_action_stream.py
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.json_stream import filter_object_stream
+
+CID_COUNT = 30000
+JOB_SIZE = 150
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_body():
+    """Build a realistic-looking {"cid": {action fields}} map as UTF-8 bytes"""
+    actions = {
+        f'{i:032x}': {
+            'action_code': i % 7,
+            'action_desc': 'Transition Begin' if i % 2 else 'Transition End',
+            'updated_at': '2024-01-01T00:00:00Z',
+            'cluster': 'cnx-apigw-internal'
+        }
+        for i in range(CID_COUNT)
+    }
+    return json.dumps(actions).encode()
+
+
+def chunks(body):
+    """Yield the body in CHUNK_SIZE pieces, like response.iter_content()"""
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield body[i:i + CHUNK_SIZE]
+
+
+def full_parse(body, wanted):
+    """Old path: buffer the whole body, decode everything, then filter"""
+    buffered = b''.join(chunks(body))
+    actions = json.loads(buffered)
+    return {cid: actions[cid] for cid in wanted if cid in actions}
+
+
+def streamed_parse(body, wanted):
+    """New path: incremental parse, keeping only the job's CIDs"""
+    return filter_object_stream(chunks(body), wanted)['items']
+
+
+def measure(fn, body, wanted, repeat=3):
+    """Return (best elapsed ms, peak KB, result); memory is traced on a separate run"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(body, wanted)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    fn(body, wanted)
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    body = synthetic_body()
+    wanted = {f'{i:032x}' for i in range(0, CID_COUNT, CID_COUNT // JOB_SIZE)}
+    print(f"Action map: {CID_COUNT} CIDs, {len(body) / 1024 / 1024:.1f} MB; job: {len(wanted)} CIDs\n")
+
+    print(f"{'path':<22} {'time (ms)':>10} {'peak mem (KB)':>15}")
+    results = []
+    for label, fn in (('json.loads + filter', full_parse), ('filter_object_stream', streamed_parse)):
+        elapsed, peak, result = measure(fn, body, wanted)
+        results.append(result)
+        print(f"{label:<22} {elapsed:>10.1f} {peak:>15.0f}")
+
+    assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: app status cache lookups and writes
+Compares the old per-CID lookup loop (one connection + PRAGMAs + SELECT per CID)
+with the bulk get_cached_appstatus_batch() at 100 / 1k / 10k CIDs (served from
+SQLite with a cold in-process tier, then again from the warm in-process tier),
+and per-row cache_appstatus() writes with cache_appstatus_bulk() at 1k / 10k rows.
+
+Runs against a throwaway database in a temp directory; jobs.db is not touched.
+
+Usage:
+    python bench_appstatus_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+
+SIZES = [100, 1000, 10000]
+WRITE_SIZES = [1000, 10000]
+
+
+def per_cid_lookup(cids, app_name='ALL', ttl_seconds=1800):
+    """The pre-bulk implementation: one get_cached_appstatus call per CID"""
+    hits = {}
+    misses = []
+    for cid in cids:
+        cached = jobs.get_cached_appstatus(cid, app_name, ttl_seconds)
+        if cached:
+            hits[cid] = cached
+        else:
+            misses.append(cid)
+    return {'hits': hits, 'misses': misses}
+
+
+def populate(cids):
+    """Cache a status entry for every CID"""
+    conn = jobs.sqlite3_connect(jobs.DB_PATH)
+    now = jobs.datetime.now()
+    expires_at = (now + jobs.timedelta(seconds=1800)).isoformat()
+    conn.executemany('''
+        INSERT OR REPLACE INTO appstatus_cache (cid, app_name, status_data, cached_at, ttl_seconds, expires_at)
+        VALUES (?, 'ALL', ?, ?, 1800, ?)
+    ''', [(cid, '{"status": "Ready"}', now.isoformat(), expires_at) for cid in cids])
+    conn.commit()
+    conn.close()
+
+
+def time_call(fn, cids):
+    """Return (elapsed seconds, result) for one call"""
+    start = time.perf_counter()
+    result = fn(cids)
+    return time.perf_counter() - start, result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'bench_jobs.db')
+        jobs.initialize_jobs_database()
+
+        all_cids = [f'{i:032x}' for i in range(max(SIZES))]
+        populate(all_cids)
+
+        print("\n" + "=" * 90)
+        print(f"{'CIDs':>8} | {'per-CID loop':>14} | {'bulk (SQLite)':>14} | {'bulk (memory)':>14} | "
+              f"{'per-CID cost (loop / bulk)':>26}")
+        print("=" * 90)
+
+        for size in SIZES:
+            # Half cached, half missing, to exercise both paths
+            cids = all_cids[:size // 2] + [f'missing-{i}' for i in range(size - size // 2)]
+
+            # Cold in-process tier, so both lookups read SQLite
+            jobs._memory_cache.invalidate()
+            loop_s, loop_result = time_call(per_cid_lookup, cids)
+            jobs._memory_cache.invalidate()
+            bulk_s, bulk_result = time_call(jobs.get_cached_appstatus_batch, cids)
+            # The bulk lookup promoted its hits; repeat it from memory
+            memory_s, memory_result = time_call(jobs.get_cached_appstatus_batch, cids)
+            assert set(loop_result['hits']) == set(bulk_result['hits']) == set(memory_result['hits'])
+            assert loop_result['misses'] == bulk_result['misses'] == memory_result['misses']
+
+            print(f"{size:>8} | {loop_s * 1000:>11.1f} ms | {bulk_s * 1000:>11.1f} ms | "
+                  f"{memory_s * 1000:>11.1f} ms | "
+                  f"{loop_s / size * 1e6:>10.1f} us / {bulk_s / size * 1e6:>7.1f} us")
+
+        print("=" * 90)
+
+        print("\n" + "=" * 72)
+        print(f"{'Rows':>8} | {'per-row writes':>14} | {'bulk write':>14} | {'deferred bulk':>14} | {'bulk rows/s':>11}")
+        print("=" * 72)
+
+        status = {'status': 'Ready'}
+        for size in WRITE_SIZES:
+            cids = [f'write-{size}-{i}' for i in range(size)]
+            entries = {cid: status for cid in cids}
+
+            start = time.perf_counter()
+            for cid in cids:
+                jobs.cache_appstatus(cid, status)
+            per_row_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            jobs.cache_appstatus_bulk(entries)
+            bulk_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for cid in cids:
+                jobs.cache_appstatus_bulk({cid: status}, defer=True)
+            jobs.flush_cache_writes()
+            deferred_s = time.perf_counter() - start
+
+            print(f"{size:>8} | {per_row_s * 1000:>11.1f} ms | {bulk_s * 1000:>11.1f} ms | "
+                  f"{deferred_s * 1000:>11.1f} ms | {size / bulk_s:>11,.0f}")
+
+        print("=" * 72)
+
+
+if __name__ == '__main__':
+    main()
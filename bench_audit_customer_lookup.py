@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: audit trail lookups by customer (LIKE '%cid%' vs audit_log_customers)
+Fills a throwaway audit database with 1,000,000 audit entries, each naming
+1-3 customers from a pool of 50,000, then compares the old substring scan
+with the indexed junction-table lookup used by get_audit_trail(customer_id=...).
+Also reports the junction table's size and what the insert trigger costs
+log_action().
+
+Runs against a temp directory; audit.db is not touched.
+
+Usage:
+    python bench_audit_customer_lookup.py
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db
+
+ROW_COUNT = 1000000
+CUSTOMER_POOL = 50000
+LOOKUPS = 20
+
+LIKE_QUERY = '''
+    SELECT * FROM audit_log WHERE customer_ids LIKE ?
+    ORDER BY timestamp DESC LIMIT 50
+'''
+
+
+def fill(rng, pool):
+    """Insert ROW_COUNT audit entries in one transaction; return seconds"""
+    actions = ['Trans-Begin', 'PE-Enable', 'T-Enable', 'PE-Finalize', 'PE-Direct']
+    users = [f'user{i}' for i in range(20)]
+    rows = (
+        (rng.choice(users), rng.choice(actions), json.dumps(rng.sample(pool, rng.randint(1, 3))),
+         f'2025-{1 + i * 12 // ROW_COUNT:02d}-01T00:00:00.{i:07d}', '10.0.0.1', 'success', None, 100)
+        for i in range(ROW_COUNT)
+    )
+    conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+    start = time.perf_counter()
+    conn.executemany('''
+        INSERT INTO audit_log
+        (user_id, action_type, customer_ids, timestamp, ip_address, status, error_message, duration_ms)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.close()
+    return elapsed
+
+
+def median_ms(func, args_list):
+    """Median time in ms of func(*args) over args_list"""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def log_action_latency(count=500):
+    """Median log_action() time in ms"""
+    return median_ms(lambda cid: audit_db.log_action('bench', 'PE-Enable', [cid]),
+                     [(f'latency-{i}',) for i in range(count)])
+
+
+def main():
+    rng = random.Random(7)
+    pool = [f'{rng.getrandbits(128):032x}' for _ in range(CUSTOMER_POOL)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        audit_db.initialize_database()
+
+        print(f"Inserting {ROW_COUNT:,} audit entries...")
+        seconds = fill(rng, pool)
+        print(f"  {seconds:.1f} s (junction rows written by the insert trigger)")
+
+        conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+        pairs = conn.execute('SELECT COUNT(*) FROM audit_log_customers').fetchone()[0]
+        sizes = dict(conn.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name').fetchall())
+        conn.close()
+        print(f"  audit_log: {sizes['audit_log'] / 1e6:.1f} MB, "
+              f"audit_log_customers: {pairs:,} rows, {sizes['audit_log_customers'] / 1e6:.1f} MB")
+
+        targets = [(cid,) for cid in rng.sample(pool, LOOKUPS)]
+
+        conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+        like_ms = median_ms(lambda cid: conn.execute(LIKE_QUERY, (f'%{cid}%',)).fetchall(), targets)
+        # A short ID matches every entry that merely contains it
+        false_hits = len(conn.execute(LIKE_QUERY, ('%abc%',)).fetchall())
+        conn.close()
+
+        index_ms = median_ms(lambda cid: audit_db.get_audit_trail(limit=50, customer_id=cid), targets)
+        exact_hits = len(audit_db.get_audit_trail(limit=50, customer_id='abc'))
+
+        print(f"\nCustomer lookup (median of {LOOKUPS}, LIMIT 50):")
+        print(f"  LIKE '%cid%' scan:        {like_ms:8.2f} ms")
+        print(f"  audit_log_customers join: {index_ms:8.2f} ms  ({like_ms / index_ms:,.0f}x faster)")
+        print(f"  Lookup of 'abc': LIKE returned {false_hits} entries, index returned {exact_hits}")
+
+        with_trigger = log_action_latency()
+        conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+        conn.execute('DROP TRIGGER trg_audit_log_customers')
+        conn.close()
+        without_trigger = log_action_latency()
+        print(f"\nlog_action() median: {with_trigger:.3f} ms with trigger, "
+              f"{without_trigger:.3f} ms without")
+
+
+if __name__ == '__main__':
+    main()
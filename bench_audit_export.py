@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: exporting the audit trail (materialized list vs streamed batches)
+Fills a throwaway audit database with 200,000 entries, then exports all of
+them two ways and reports wall time and peak Python memory (tracemalloc):
+get_audit_trail() + json.dumps, as /api/audit/trail does, and the NDJSON and
+CSV formatting /api/audit/export does over iter_audit_trail() batches.
+
+Runs against a temp directory; audit.db is not touched.
+
+Usage:
+    python bench_audit_export.py
+"""
+
+import csv
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db
+
+ROW_COUNT = 200000
+
+
+def fill():
+    """Insert ROW_COUNT entries with a few customer IDs each"""
+    rng = random.Random(5)
+    users = [f'user{i}' for i in range(20)]
+    actions = ['Trans-Begin', 'PE-Enable', 'T-Enable', 'PE-Finalize', 'PE-Direct']
+    start_time = datetime(2025, 1, 1)
+    rows = (
+        (rng.choice(users), rng.choice(actions),
+         json.dumps([f'CID{rng.randint(0, 99999):05d}' for _ in range(rng.randint(1, 5))]),
+         (start_time + timedelta(seconds=i * 30)).strftime('%Y-%m-%d %H:%M:%S'),
+         'success' if rng.random() < 0.9 else 'failure', rng.randint(50, 2000))
+        for i in range(ROW_COUNT)
+    )
+    conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+    conn.executemany('''
+        INSERT INTO audit_log (user_id, action_type, customer_ids, timestamp, status, duration_ms)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def measure(func):
+    """Run func() once; return (seconds, peak MB, bytes produced)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, size
+
+
+def materialized():
+    records = audit_db.get_audit_trail(limit=ROW_COUNT)
+    return len(json.dumps({'success': True, 'count': len(records), 'records': records}))
+
+
+def streamed_ndjson():
+    size = 0
+    for rows in audit_db.iter_audit_trail():
+        size += len(''.join(json.dumps(dict(zip(audit_db.AUDIT_TRAIL_COLUMNS, row))) + '\n' for row in rows))
+    return size
+
+
+def streamed_csv():
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    size = 0
+    for rows in audit_db.iter_audit_trail():
+        writer.writerows(rows)
+        size += len(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+    return size
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        audit_db.initialize_database()
+        print(f"Inserting {ROW_COUNT:,} audit entries...")
+        fill()
+
+        print(f"\nExporting all {ROW_COUNT:,} entries:")
+        for label, func in (('get_audit_trail + jsonify', materialized),
+                            ('streamed NDJSON', streamed_ndjson),
+                            ('streamed CSV', streamed_csv)):
+            seconds, peak_mb, size = measure(func)
+            print(f"  {label:26s} {seconds:6.2f} s  peak {peak_mb:8.1f} MB  ({size / 1024 / 1024:.1f} MB output)")
+
+
+if __name__ == '__main__':
+    main()
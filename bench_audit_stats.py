@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/audit/stats aggregates (full scans vs rollup tables)
+Fills a throwaway audit database with 1,000,000 entries (20 users, 5 action
+types, spread over 90 days), builds the rollups the way a first startup
+does, then compares the four full-table aggregates get_audit_stats() used
+to run with the rollup-backed version, plus a 90-day daily rollup query and
+the cost the rollup trigger adds to log_action().
+
+Runs against a temp directory; audit.db is not touched.
+
+Usage:
+    python bench_audit_stats.py
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db
+
+ROW_COUNT = 1000000
+REPEAT = 20
+
+FULL_SCAN_QUERIES = [
+    'SELECT COUNT(*) FROM audit_log',
+    'SELECT COUNT(DISTINCT user_id) FROM audit_log',
+    'SELECT COUNT(DISTINCT action_type) FROM audit_log',
+    "SELECT COUNT(*) FROM audit_log WHERE status = 'success'",
+]
+
+
+def fill():
+    """Insert ROW_COUNT entries with the insert triggers off; return seconds to build rollups"""
+    rng = random.Random(11)
+    users = [f'user{i}' for i in range(20)]
+    actions = ['Trans-Begin', 'PE-Enable', 'T-Enable', 'PE-Finalize', 'PE-Direct']
+    start_time = datetime(2025, 1, 1)
+    rows = (
+        (rng.choice(users), rng.choice(actions),
+         (start_time + timedelta(seconds=i * 90 * 86400 // ROW_COUNT)).strftime('%Y-%m-%d %H:%M:%S'),
+         'success' if rng.random() < 0.9 else 'failure', rng.randint(50, 2000))
+        for i in range(ROW_COUNT)
+    )
+    conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+    conn.execute('DROP TRIGGER trg_audit_log_customers')
+    conn.execute('DROP TRIGGER trg_audit_rollups')
+    conn.execute('DROP TABLE audit_rollups')
+    conn.executemany('''
+        INSERT INTO audit_log (user_id, action_type, timestamp, status, duration_ms)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+    start = time.perf_counter()
+    audit_db.initialize_database()
+    return time.perf_counter() - start
+
+
+def median_ms(func, repeat=REPEAT):
+    """Median time in ms of func() over repeat calls"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def full_scan_stats():
+    conn = audit_db.get_db_connection()
+    for query in FULL_SCAN_QUERIES:
+        conn.execute(query).fetchone()
+    conn.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        audit_db.initialize_database()
+
+        print(f"Inserting {ROW_COUNT:,} audit entries...")
+        build_seconds = fill()
+        conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+        rollup_rows = conn.execute('SELECT COUNT(*) FROM audit_rollups').fetchone()[0]
+        conn.close()
+        print(f"  Rollup backfill on startup: {build_seconds:.1f} s ({rollup_rows:,} rollup rows)")
+
+        scan_ms = median_ms(full_scan_stats, repeat=5)
+        rollup_ms = median_ms(audit_db.get_audit_stats)
+        daily_ms = median_ms(lambda: audit_db.get_audit_rollups('day', group_by='user_action', limit=10000))
+        hourly_ms = median_ms(lambda: audit_db.get_audit_rollups('hour', start='2025-03-01', end='2025-03-08'))
+
+        print(f"\nget_audit_stats():")
+        print(f"  4 full-table aggregates: {scan_ms:8.2f} ms")
+        print(f"  rollup tables:           {rollup_ms:8.2f} ms  ({scan_ms / rollup_ms:,.0f}x faster)")
+        print(f"90 days x user x action, daily: {daily_ms:.2f} ms")
+        print(f"7 days, hourly totals:          {hourly_ms:.2f} ms")
+
+        def log_one():
+            audit_db.log_action('bench', 'PE-Enable', ['cid'], status='success', duration_ms=10)
+
+        with_trigger = median_ms(log_one, repeat=500)
+        conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+        conn.execute('DROP TRIGGER trg_audit_rollups')
+        conn.close()
+        without_trigger = median_ms(log_one, repeat=500)
+        print(f"\nlog_action() median: {with_trigger:.3f} ms with rollup trigger, "
+              f"{without_trigger:.3f} ms without")
+
+
+if __name__ == '__main__':
+    main()
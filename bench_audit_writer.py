@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: inline audit inserts vs the background audit writer
+Simulates request threads recording audit entries (8 threads x 1,000 entries)
+and reports the time each caller spends per entry (p50/p99) and the time
+until every entry is committed, first with log_action() on the caller's
+thread and then with submit_audit_entry().
+
+Runs against a throwaway database in a temp directory; audit.db is not touched.
+
+Usage:
+    python bench_audit_writer.py
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db, audit_writer
+
+THREADS = 8
+ENTRIES_PER_THREAD = 1000
+
+
+def run(record):
+    """Record entries from THREADS threads; return (caller latencies in ms, seconds)"""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = []
+        for i in range(ENTRIES_PER_THREAD):
+            start = time.perf_counter()
+            record(f'user{n}', 'PE-Enable', [f'cid-{n}-{i}'], '10.0.0.1', 'success', None, 120)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    audit_writer.flush_audit_writes()
+    return sorted(latencies), time.perf_counter() - start
+
+
+def main():
+    print(f"{THREADS} threads x {ENTRIES_PER_THREAD} audit entries\n")
+    print(f"{'mode':>12} | {'caller p50':>10} | {'caller p99':>10} | {'all committed':>13} | {'transactions':>12}")
+    for mode, record in (('inline', audit_db.log_action), ('background', audit_writer.submit_audit_entry)):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+            audit_db.initialize_database()
+            batches_before = audit_writer.get_audit_writer_stats()['batches']
+
+            latencies, seconds = run(record)
+
+            conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+            count = conn.execute('SELECT COUNT(*) FROM audit_log').fetchone()[0]
+            conn.close()
+            assert count == THREADS * ENTRIES_PER_THREAD
+            transactions = count if mode == 'inline' else \
+                audit_writer.get_audit_writer_stats()['batches'] - batches_before
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[int(len(latencies) * 0.99)]
+            print(f"{mode:>12} | {p50:8.3f}ms | {p99:8.3f}ms | {seconds:11.2f} s | {transactions:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: job creation
+Compares the old create_job insert loop (one INSERT statement per CID inside
+the write transaction), a single executemany, and the current create_job()
+(de-duplicated CIDs, chunked multi-row INSERTs) at 150 / 5k / 30k CIDs. The time reported is how long the jobs.db
+write transaction is held, i.e. how long other writers are blocked.
+
+Runs against a throwaway database in a temp directory; jobs.db is not touched.
+
+Usage:
+    python bench_job_creation.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+
+SIZES = [150, 5000, 30000]
+
+
+def per_cid_create_job(user_id, action_code, action_name, cids, request_payload=None):
+    """The pre-executemany implementation: one INSERT per CID"""
+    job_id = str(uuid.uuid4())
+    created_at = jobs.datetime.now().isoformat()
+    conn = jobs.sqlite3_connect(jobs.DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO jobs
+        (job_id, user_id, batch_id, action_code, action_name, cluster_url,
+         created_at, request_payload, response_summary, status, updated_at)
+        VALUES (?, ?, NULL, ?, ?, NULL, ?, ?, NULL, 'IN_PROGRESS', ?)
+    ''', (job_id, user_id, action_code, action_name, created_at,
+          json.dumps(request_payload) if request_payload else None, created_at))
+    for cid in cids:
+        cursor.execute('''
+            INSERT INTO job_customers (job_id, cid)
+            VALUES (?, ?)
+        ''', (job_id, cid))
+    conn.commit()
+    conn.close()
+    return job_id
+
+
+def executemany_create_job(user_id, action_code, action_name, cids, request_payload=None):
+    """Alternative considered: the same job insert with one executemany for the CIDs"""
+    job_id = str(uuid.uuid4())
+    created_at = jobs.datetime.now().isoformat()
+    conn = jobs.sqlite3_connect(jobs.DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO jobs
+        (job_id, user_id, batch_id, action_code, action_name, cluster_url,
+         created_at, request_payload, response_summary, status, updated_at)
+        VALUES (?, ?, NULL, ?, ?, NULL, ?, ?, NULL, 'IN_PROGRESS', ?)
+    ''', (job_id, user_id, action_code, action_name, created_at,
+          json.dumps(request_payload) if request_payload else None, created_at))
+    cursor.executemany('''
+        INSERT INTO job_customers (job_id, cid)
+        VALUES (?, ?)
+    ''', [(job_id, cid) for cid in cids])
+    conn.commit()
+    conn.close()
+    return job_id
+
+
+def best_of(fn, repeat=3):
+    """Return the best elapsed seconds over a few runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'bench_jobs.db')
+        jobs.initialize_jobs_database()
+
+        print("\n" + "=" * 80)
+        print(f"{'CIDs':>8} | {'per-CID INSERTs':>15} | {'executemany':>12} | {'create_job':>12} | "
+              f"{'speedup':>8} | {'rows/s':>10}")
+        print("=" * 80)
+
+        for size in SIZES:
+            cids = [f'{i:032x}' for i in range(size)]
+            payload = {'action': 'tran-begin', 'cids': cids}
+
+            loop_s = best_of(lambda: per_cid_create_job('bench', 1, 'tran-begin', cids, payload))
+            many_s = best_of(lambda: executemany_create_job('bench', 1, 'tran-begin', cids, payload))
+            bulk_s = best_of(lambda: jobs.create_job('bench', 1, 'tran-begin', cids, request_payload=payload))
+
+            print(f"{size:>8} | {loop_s * 1000:>12.1f} ms | {many_s * 1000:>9.1f} ms | {bulk_s * 1000:>9.1f} ms | "
+                  f"{loop_s / bulk_s:>7.1f}x | {size / bulk_s:>10,.0f}")
+
+        print("=" * 80)
+
+        # Duplicates are dropped before the insert instead of failing the job
+        job = jobs.create_job('bench', 1, 'tran-begin', ['a', 'b', 'a', 'c', 'b'])
+        assert job['customer_count'] == 3
+        assert jobs.get_job_customers(job['job_id']) == ['a', 'b', 'c']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: job customer list storage ('rows' vs 'compact')
+Builds the same synthetic history twice - 200 jobs x 5,000 CIDs (1M job/CID
+pairs) drawn from a pool of 60,000 customers - once with
+JOB_CUSTOMER_STORAGE='rows' and once with 'compact', then compares on-disk
+size of the customer tables (dbstat), total create_job time and
+get_job_customers() latency.
+
+Runs against throwaway databases in a temp directory; jobs.db is not touched.
+
+Usage:
+    python bench_job_customer_storage.py
+"""
+
+import builtins
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+
+JOB_COUNT = 200
+CIDS_PER_JOB = 5000
+CUSTOMER_POOL = 60000
+
+CUSTOMER_TABLES = {
+    'rows': ['job_customers', 'idx_job_customers_cid_job', 'sqlite_autoindex_job_customers_1'],
+    'compact': ['job_customer_keys', 'idx_job_customer_keys_cid', 'cid_dictionary',
+                'sqlite_autoindex_cid_dictionary_1']
+}
+
+
+def build_history(storage, db_path, job_cids):
+    """Create every job with the given storage mode; return (seconds, job_ids)"""
+    jobs.DB_PATH = db_path
+    jobs.JOB_CUSTOMER_STORAGE = storage
+    jobs.initialize_jobs_database()
+
+    # create_job logs every job; keep the table readable
+    real_print = builtins.print
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        start = time.perf_counter()
+        job_ids = [jobs.create_job('bench', 1, 'tran-begin', cids)['job_id'] for cids in job_cids]
+        elapsed = time.perf_counter() - start
+    finally:
+        builtins.print = real_print
+    return elapsed, job_ids
+
+
+def table_bytes(db_path, names):
+    """Bytes used by the given tables/indexes according to dbstat"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    sizes = dict(conn.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name').fetchall())
+    conn.close()
+    return sum(sizes.get(name, 0) for name in names)
+
+
+def read_latency(job_ids, repeat=50):
+    """Median get_job_customers() time in ms over random jobs"""
+    samples = []
+    for job_id in random.Random(1).choices(job_ids, k=repeat):
+        start = time.perf_counter()
+        cids = jobs.get_job_customers(job_id)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert len(cids) == CIDS_PER_JOB
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    rng = random.Random(42)
+    pool = [f'{rng.getrandbits(128):032x}' for _ in range(CUSTOMER_POOL)]
+    job_cids = [rng.sample(pool, CIDS_PER_JOB) for _ in range(JOB_COUNT)]
+    print(f"History: {JOB_COUNT} jobs x {CIDS_PER_JOB} CIDs = {JOB_COUNT * CIDS_PER_JOB:,} pairs, "
+          f"{CUSTOMER_POOL:,} distinct customers")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for storage in ('rows', 'compact'):
+            db_path = os.path.join(tmp_dir, f'{storage}.db')
+            write_s, job_ids = build_history(storage, db_path, job_cids)
+            results[storage] = {
+                'bytes': table_bytes(db_path, CUSTOMER_TABLES[storage]),
+                'file': os.path.getsize(db_path),
+                'write_s': write_s,
+                'read_ms': read_latency(job_ids)
+            }
+            # Same answer from both layouts
+            assert jobs.get_job_customers(job_ids[0]) == sorted(job_cids[0])
+
+    print("\n" + "=" * 86)
+    print(f"{'storage':>8} | {'customer tables':>15} | {'bytes/pair':>10} | {'db file':>10} | "
+          f"{'create 200 jobs':>15} | {'read 5k CIDs':>12}")
+    print("=" * 86)
+    for storage, r in results.items():
+        print(f"{storage:>8} | {r['bytes'] / 1024 / 1024:>12.1f} MB | {r['bytes'] / (JOB_COUNT * CIDS_PER_JOB):>10.1f} | "
+              f"{r['file'] / 1024 / 1024:>7.1f} MB | {r['write_s']:>13.2f} s | {r['read_ms']:>9.2f} ms")
+    print("=" * 86)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Action Map Snapshot Module
+Keeps a short-lived, decoded snapshot of each cluster's /tms/v1/get/action?cid=ALL
+map so job action views are a lookup against memory instead of a fresh download.
+
+Snapshots are keyed by cluster and by a hash of the upstream token, so a
+snapshot is only served to callers presenting the token that downloaded it;
+any other token (including an expired one) goes upstream and sees its own
+401. Refreshes go through single_flight_get, so concurrent refreshes of one
+cluster with one token share a single upstream download.
+
+When snapshots are disabled (ACTION_SNAPSHOT_TTL <= 0) or bypassed,
+fetch_actions_streaming() reads the map incrementally and keeps only the
+requested CIDs, so memory scales with the job rather than the cluster.
+"""
+
+import os
+import threading
+import time
+
+from src.json_stream import filter_object_stream
+from src.single_flight import auth_identity, single_flight_get
+from src.upstream_client import upstream_get
+
+# Seconds a snapshot is served before the next request refreshes it (<= 0 disables snapshots)
+ACTION_SNAPSHOT_TTL = float(os.environ.get('ACTION_SNAPSHOT_TTL', 30))
+
+# Bytes per read when streaming the action map
+ACTION_STREAM_CHUNK_SIZE = 64 * 1024
+
+_snapshots = {}
+_lock = threading.Lock()
+_stats = {
+    'hits': 0,
+    'refreshes': 0,
+    'errors': 0
+}
+
+
+def _build_headers(token):
+    """Upstream request headers for a bearer token"""
+    return {
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/json'
+    }
+
+
+def _fetch_snapshot(cluster_url, headers):
+    """
+    Download and index one cluster's action map.
+
+    Returns:
+        dict: {'snapshot': dict or None, 'error': str or None, 'http_status': int}
+    """
+    response = single_flight_get(f'{cluster_url}/tms/v1/get/action?cid=ALL', headers=headers, timeout=30)
+
+    if response.status_code != 200:
+        return {
+            'snapshot': None,
+            'error': f'Upstream API returned {response.status_code}: {response.text[:200]}',
+            'http_status': response.status_code
+        }
+
+    try:
+        actions = response.json()
+    except ValueError as e:
+        return {'snapshot': None, 'error': f'Invalid JSON from upstream: {str(e)}', 'http_status': 500}
+
+    if not isinstance(actions, dict):
+        return {'snapshot': None, 'error': 'Unexpected action map format from upstream', 'http_status': 502}
+
+    snapshot = {
+        'actions': actions,
+        'fetched_at': time.time(),
+        'cid_count': len(actions),
+        'size_bytes': len(response.content)
+    }
+    return {'snapshot': snapshot, 'error': None, 'http_status': 200}
+
+
+def get_action_snapshot(cluster_url, token, refresh=False):
+    """
+    Get the action map snapshot for a cluster, refreshing it when stale.
+
+    Args:
+        cluster_url (str): Base URL of the cluster
+        token (str): Bearer token used if a refresh is needed
+        refresh (bool): Force a fresh download
+
+    Returns:
+        dict: {
+            'snapshot': {'actions': {cid: action_data}, 'fetched_at': float,
+                         'cid_count': int, 'size_bytes': int} or None,
+            'from_snapshot': bool (True if served without downloading),
+            'error': str or None,
+            'http_status': int
+        }
+
+    Raises:
+        requests.exceptions.RequestException: On network errors/timeouts
+    """
+    cluster_url = cluster_url.rstrip('/')
+    headers = _build_headers(token)
+    key = (cluster_url, auth_identity(headers))
+
+    if not refresh:
+        with _lock:
+            snapshot = _snapshots.get(key)
+            if snapshot and time.time() - snapshot['fetched_at'] < ACTION_SNAPSHOT_TTL:
+                _stats['hits'] += 1
+                return {'snapshot': snapshot, 'from_snapshot': True, 'error': None, 'http_status': 200}
+
+    result = _fetch_snapshot(cluster_url, headers)
+
+    with _lock:
+        if result['snapshot'] is None:
+            _stats['errors'] += 1
+        else:
+            _stats['refreshes'] += 1
+            current = _snapshots.get(key)
+            # A coalesced refresh may finish after a newer one; keep the newest
+            if current is None or current['fetched_at'] <= result['snapshot']['fetched_at']:
+                _snapshots[key] = result['snapshot']
+
+    result['from_snapshot'] = False
+    return result
+
+
+def snapshots_enabled():
+    """Return True if action map snapshots are turned on"""
+    return ACTION_SNAPSHOT_TTL > 0
+
+
+def fetch_actions_streaming(cluster_url, token, cids):
+    """
+    Download a cluster's action map, keeping only the given CIDs.
+
+    The body is read in ACTION_STREAM_CHUNK_SIZE pieces and parsed member by
+    member; entries for other CIDs are dropped as soon as they are decoded.
+
+    Args:
+        cluster_url (str): Base URL of the cluster
+        token (str): Bearer token for upstream API
+        cids (iterable): Customer IDs to keep
+
+    Returns:
+        dict: {
+            'actions': {cid: action_data} or None,
+            'cid_count': int (CIDs in the whole map),
+            'size_bytes': int,
+            'error': str or None,
+            'http_status': int
+        }
+
+    Raises:
+        requests.exceptions.RequestException: On network errors/timeouts
+    """
+    cluster_url = cluster_url.rstrip('/')
+    headers = _build_headers(token)
+    response = upstream_get(f'{cluster_url}/tms/v1/get/action?cid=ALL', headers=headers,
+                            timeout=30, stream=True)
+    try:
+        if response.status_code != 200:
+            return {
+                'actions': None,
+                'cid_count': 0,
+                'size_bytes': 0,
+                'error': f'Upstream API returned {response.status_code}: {response.text[:200]}',
+                'http_status': response.status_code
+            }
+
+        try:
+            parsed = filter_object_stream(response.iter_content(chunk_size=ACTION_STREAM_CHUNK_SIZE), set(cids))
+        except ValueError as e:
+            return {
+                'actions': None,
+                'cid_count': 0,
+                'size_bytes': 0,
+                'error': f'Invalid JSON from upstream: {str(e)}',
+                'http_status': 500
+            }
+
+        return {
+            'actions': parsed['items'],
+            'cid_count': parsed['member_count'],
+            'size_bytes': parsed['bytes_read'],
+            'error': None,
+            'http_status': 200
+        }
+    finally:
+        response.close()
+
+
+def select_actions(snapshot, cids):
+    """
+    Pick the action entries for a set of CIDs out of a snapshot.
+
+    Args:
+        snapshot (dict): Snapshot from get_action_snapshot
+        cids (iterable): Customer IDs
+
+    Returns:
+        dict: {cid: action_data} for the CIDs present in the snapshot
+    """
+    actions = snapshot['actions']
+    return {cid: actions[cid] for cid in cids if cid in actions}
+
+
+def prune_action_snapshots(max_age_seconds=None):
+    """
+    Drop snapshots nobody has refreshed for a while.
+
+    Args:
+        max_age_seconds (float): Age limit (default 10 x ACTION_SNAPSHOT_TTL)
+
+    Returns:
+        int: Number of snapshots dropped
+    """
+    if max_age_seconds is None:
+        max_age_seconds = ACTION_SNAPSHOT_TTL * 10
+    cutoff = time.time() - max_age_seconds
+    with _lock:
+        expired = [key for key, snapshot in _snapshots.items() if snapshot['fetched_at'] < cutoff]
+        for key in expired:
+            del _snapshots[key]
+    return len(expired)
+
+
+def get_snapshot_stats():
+    """
+    Get snapshot ages and sizes per cluster.
+
+    A cluster with snapshots for several tokens reports its newest one and
+    the total size of all of them.
+
+    Returns:
+        dict: {
+            'ttl_seconds': float,
+            'hits': int, 'refreshes': int, 'errors': int,
+            'clusters': {'https://cluster': {'age_seconds': float, 'cid_count': int,
+                                             'size_bytes': int, 'snapshots': int}}
+        }
+    """
+    now = time.time()
+    with _lock:
+        stats = dict(_stats)
+        stats['ttl_seconds'] = ACTION_SNAPSHOT_TTL
+        clusters = {}
+        for (cluster_url, _), snapshot in _snapshots.items():
+            age = round(now - snapshot['fetched_at'], 1)
+            entry = clusters.setdefault(cluster_url, {
+                'age_seconds': age, 'cid_count': snapshot['cid_count'], 'size_bytes': 0, 'snapshots': 0
+            })
+            if age < entry['age_seconds']:
+                entry['age_seconds'] = age
+                entry['cid_count'] = snapshot['cid_count']
+            entry['size_bytes'] += snapshot['size_bytes']
+            entry['snapshots'] += 1
+        stats['clusters'] = clusters
+    return stats
@@ -0,0 +1,534 @@
+"""
+App Status Fetcher Module
+Fans out /tms/v1/get/appstatus calls to the upstream API with bounded concurrency.
+
+All fan-out work runs on one shared worker pool, so the number of concurrent
+upstream appstatus calls stays bounded no matter how many browsers are asking.
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+import requests
+
+from src.upstream_client import upstream_get
+
+# Maximum concurrent upstream appstatus calls across all requests
+APPSTATUS_MAX_WORKERS = int(os.environ.get('APPSTATUS_MAX_WORKERS', 16))
+
+# Per-CID upstream timeout in seconds
+APPSTATUS_SINGLE_TIMEOUT = 10
+
+# Overall deadline for a single-CID fallback run, in seconds
+APPSTATUS_FALLBACK_DEADLINE = float(os.environ.get('APPSTATUS_FALLBACK_DEADLINE', 25))
+
+# Batch chunking: upper bounds on CIDs per batch call and on the request URL length
+APPSTATUS_MAX_CHUNK_SIZE = int(os.environ.get('APPSTATUS_MAX_CHUNK_SIZE', 200))
+APPSTATUS_MAX_URL_LENGTH = int(os.environ.get('APPSTATUS_MAX_URL_LENGTH', 4000))
+
+# A 414, or a 400 whose body says the URL/headers were too long, means the
+# batch call was too large; any other 400 (e.g. a bad CID) is a plain failure
+CHUNK_REJECT_STATUS = 414
+_SIZE_REJECTION_TEXT = re.compile(r'\b(ur[il]|header|request[- ]line)\w*\W.*too (long|large)', re.IGNORECASE)
+
+# Most times a rejected chunk is halved before its CIDs are given up on
+# (200 CIDs reach single CIDs in 8 halvings)
+APPSTATUS_MAX_SPLIT_DEPTH = 8
+
+_chunk_limits = {}
+_chunk_lock = threading.Lock()
+
+_executor = ThreadPoolExecutor(max_workers=APPSTATUS_MAX_WORKERS, thread_name_prefix='appstatus')
+
+# Background refresh (stale-while-revalidate): bound on queued CIDs and on
+# CIDs refreshed together in one batch call
+APPSTATUS_REFRESH_QUEUE_SIZE = int(os.environ.get('APPSTATUS_REFRESH_QUEUE_SIZE', 5000))
+APPSTATUS_REFRESH_BATCH_SIZE = 500
+
+_refresh_queue = queue.Queue(maxsize=APPSTATUS_REFRESH_QUEUE_SIZE)
+_refresh_pending = set()
+_refresh_lock = threading.Lock()
+_refresh_thread = None
+_refresh_stats = {
+    'queued': 0,
+    'deduplicated': 0,
+    'dropped': 0,
+    'refreshed': 0,
+    'failed': 0
+}
+
+
+def build_headers(token):
+    """Build upstream request headers for a bearer token"""
+    return {
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/json'
+    }
+
+
+def summarize_status(status_data):
+    """
+    Extract the summary status string from a cached/upstream status payload.
+
+    Args:
+        status_data: Parsed upstream payload (dict for batch entries,
+                     list of per-app dicts for single-CID responses)
+
+    Returns:
+        str: Status string, or 'unknown' if the payload has no summary status
+    """
+    if isinstance(status_data, dict):
+        return status_data.get('status', 'unknown')
+    return 'unknown'
+
+
+def fetch_single_appstatus(cluster_url, cid, app_name, headers, timeout=APPSTATUS_SINGLE_TIMEOUT):
+    """
+    Fetch app status for one CID from upstream.
+
+    Args:
+        cluster_url (str): Base URL of the cluster (no trailing slash)
+        cid (str): Customer ID
+        app_name (str): App name to query
+        headers (dict): Upstream request headers
+        timeout (float): Upstream timeout in seconds
+
+    Returns:
+        dict: {
+            'data': parsed payload or None,
+            'error': error code/message or None,
+            'http_status': int or None
+        }
+    """
+    single_url = f'{cluster_url}/tms/v1/get/appstatus?app={app_name}&cid={cid}'
+    try:
+        response = upstream_get(single_url, headers=headers, timeout=timeout)
+
+        if response.status_code != 200:
+            return {'data': None, 'error': f'http_{response.status_code}', 'http_status': response.status_code}
+
+        try:
+            return {'data': response.json(), 'error': None, 'http_status': 200}
+        except ValueError:
+            return {'data': None, 'error': 'fetch_error', 'http_status': 200}
+
+    except requests.exceptions.Timeout:
+        return {'data': None, 'error': 'timeout', 'http_status': None}
+
+    except Exception as e:
+        return {'data': None, 'error': 'error', 'http_status': None}
+
+
+def _fetch_and_report(cluster_url, cid, app_name, headers, on_result):
+    """Fetch one CID and hand the result to on_result as soon as it arrives"""
+    result = fetch_single_appstatus(cluster_url, cid, app_name, headers)
+    if on_result is not None:
+        try:
+            on_result(cid, result)
+        except Exception as e:
+            print(f"[APPSTATUS] on_result callback failed for {cid}: {str(e)}")
+    return result
+
+
+def fetch_appstatus_concurrent(cids, cluster_url, token, app_name='ALL',
+                               deadline_seconds=None, on_result=None):
+    """
+    Fetch app status for many CIDs concurrently, optionally under a deadline.
+
+    on_result is called from the worker thread for every CID as soon as its
+    upstream call completes (including calls that finish after the deadline),
+    so callers can stream results into the cache.
+
+    Args:
+        cids (list): Customer IDs to fetch
+        cluster_url (str): Base URL of the cluster
+        token (str): Bearer token for upstream API
+        app_name (str): App name to query (default 'ALL')
+        deadline_seconds (float): Overall time budget; None waits for all CIDs
+        on_result (callable): Optional callback(cid, result)
+
+    Returns:
+        dict: {
+            'results': {'cid': {'data': ..., 'error': ..., 'http_status': ...}, ...},
+            'pending': [cids not finished when the deadline hit],
+            'elapsed_ms': int
+        }
+    """
+    start_time = time.time()
+    cluster_url = cluster_url.rstrip('/')
+    headers = build_headers(token)
+
+    futures = {
+        _executor.submit(_fetch_and_report, cluster_url, cid, app_name, headers, on_result): cid
+        for cid in cids
+    }
+
+    results = {}
+    try:
+        for future in as_completed(futures, timeout=deadline_seconds):
+            cid = futures[future]
+            try:
+                results[cid] = future.result()
+            except Exception as e:
+                results[cid] = {'data': None, 'error': 'error', 'http_status': None}
+    except FuturesTimeoutError:
+        print(f"[APPSTATUS] Deadline of {deadline_seconds}s hit with {len(futures) - len(results)} CIDs pending")
+
+    # Deadline hit: drop queued work, leave in-flight calls to finish on their own
+    pending = []
+    for future, cid in futures.items():
+        if cid not in results:
+            future.cancel()
+            pending.append(cid)
+
+    return {
+        'results': results,
+        'pending': pending,
+        'elapsed_ms': int((time.time() - start_time) * 1000)
+    }
+
+
+def fetch_appstatus_fanout(cids, cluster_url, token, app_name='ALL'):
+    """
+    Fetch app status for many CIDs concurrently on the shared worker pool.
+
+    Args:
+        cids (list): Customer IDs to fetch
+        cluster_url (str): Base URL of the cluster
+        token (str): Bearer token for upstream API
+        app_name (str): App name to query (default 'ALL')
+
+    Returns:
+        dict: {'cid': {'data': ..., 'error': ..., 'http_status': ...}, ...}
+    """
+    return fetch_appstatus_concurrent(cids, cluster_url, token, app_name)['results']
+
+
+# ============================================================================
+# ADAPTIVE BATCH CHUNKING
+# ============================================================================
+
+def get_chunk_limit(cluster_url):
+    """
+    Get the current learned CID-per-chunk limit for a cluster.
+
+    Args:
+        cluster_url (str): Base URL of the cluster
+
+    Returns:
+        int: Number of CIDs to put in one batch call
+    """
+    with _chunk_lock:
+        state = _chunk_limits.get(cluster_url.rstrip('/'))
+        return state['limit'] if state else APPSTATUS_MAX_CHUNK_SIZE
+
+
+def _record_chunk_result(cluster_url, size, accepted):
+    """
+    Learn from one batch call: grow after accepted chunks, shrink on rejection.
+
+    The limit never grows back to a size the cluster has already rejected.
+    """
+    key = cluster_url.rstrip('/')
+    with _chunk_lock:
+        state = _chunk_limits.setdefault(key, {
+            'limit': APPSTATUS_MAX_CHUNK_SIZE,
+            'largest_accepted': 0,
+            'smallest_rejected': None,
+            'accepted': 0,
+            'rejected': 0
+        })
+        if accepted:
+            state['accepted'] += 1
+            state['largest_accepted'] = max(state['largest_accepted'], size)
+            if size >= state['limit']:
+                ceiling = APPSTATUS_MAX_CHUNK_SIZE
+                if state['smallest_rejected'] is not None:
+                    ceiling = min(ceiling, state['smallest_rejected'] - 1)
+                state['limit'] = max(state['limit'], min(ceiling, size + max(1, size // 2)))
+        else:
+            state['rejected'] += 1
+            if state['smallest_rejected'] is None or size < state['smallest_rejected']:
+                state['smallest_rejected'] = size
+            if size <= state['largest_accepted']:
+                # The cluster's limit has dropped (or depends on CID lengths);
+                # earlier acceptances no longer say anything
+                state['largest_accepted'] = 0
+            # Halve, but never below a size the cluster still accepts
+            state['limit'] = max(1, state['largest_accepted'], min(state['limit'], size // 2))
+            print(f"[APPSTATUS] Chunk of {size} CIDs rejected by {key}, limit now {state['limit']}")
+
+
+def split_into_chunks(cids, base_url, chunk_size, max_url_length=None):
+    """
+    Split CIDs into chunks bounded by count and by resulting URL length.
+
+    Args:
+        cids (list): Customer IDs
+        base_url (str): URL prefix the comma-joined CIDs are appended to
+        chunk_size (int): Maximum CIDs per chunk
+        max_url_length (int): Maximum URL length (default APPSTATUS_MAX_URL_LENGTH)
+
+    Returns:
+        list: List of CID lists
+    """
+    if max_url_length is None:
+        max_url_length = APPSTATUS_MAX_URL_LENGTH
+
+    chunks = []
+    current = []
+    url_length = len(base_url)
+    for cid in cids:
+        added = len(cid) + (1 if current else 0)
+        if current and (len(current) >= chunk_size or url_length + added > max_url_length):
+            chunks.append(current)
+            current = []
+            url_length = len(base_url)
+            added = len(cid)
+        current.append(cid)
+        url_length += added
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _is_size_rejection(response):
+    """True if an upstream response says the request URL/headers were too large"""
+    if response.status_code == CHUNK_REJECT_STATUS:
+        return True
+    if response.status_code != 400:
+        return False
+    try:
+        body = response.text[:2000]
+    except Exception:
+        return False
+    return bool(_SIZE_REJECTION_TEXT.search(body))
+
+
+def _fetch_chunk(cluster_url, cids, app_name, headers, depth=0):
+    """
+    Fetch one batch chunk, halving it when the cluster rejects its size.
+
+    Returns:
+        tuple: (results dict {cid: status_data}, list of CIDs that failed)
+    """
+    base_url = f'{cluster_url}/tms/v1/get/appstatus?app={app_name}&cid='
+    try:
+        response = upstream_get(base_url + ','.join(cids), headers=headers, timeout=30)
+    except Exception as e:
+        print(f"[APPSTATUS] Batch chunk of {len(cids)} CIDs failed: {str(e)}")
+        return {}, list(cids)
+
+    if _is_size_rejection(response):
+        _record_chunk_result(cluster_url, len(cids), accepted=False)
+        if len(cids) == 1 or depth >= APPSTATUS_MAX_SPLIT_DEPTH:
+            print(f"[APPSTATUS] Giving up on chunk of {len(cids)} CIDs after {depth} splits")
+            return {}, list(cids)
+        # Always halve: the learned limit may still equal this chunk's size
+        middle = len(cids) // 2
+        results = {}
+        failed = []
+        for sub_chunk in (cids[:middle], cids[middle:]):
+            sub_results, sub_failed = _fetch_chunk(cluster_url, sub_chunk, app_name, headers, depth + 1)
+            results.update(sub_results)
+            failed.extend(sub_failed)
+        return results, failed
+
+    if response.status_code != 200:
+        print(f"[APPSTATUS] Batch chunk of {len(cids)} CIDs returned HTTP {response.status_code}")
+        return {}, list(cids)
+
+    try:
+        batch_data = response.json()
+    except ValueError as e:
+        print(f"[APPSTATUS] Batch chunk parse error: {str(e)}")
+        return {}, list(cids)
+
+    if not isinstance(batch_data, dict):
+        return {}, list(cids)
+
+    _record_chunk_result(cluster_url, len(cids), accepted=True)
+    wanted = set(cids)
+    return {cid: data for cid, data in batch_data.items() if cid in wanted}, []
+
+
+def fetch_appstatus_batch_chunked(cids, cluster_url, token, app_name='ALL'):
+    """
+    Fetch app status through the batch endpoint in concurrent, size-bounded chunks.
+
+    Chunk size starts at the cluster's learned limit; a chunk is halved (and
+    the limit lowered) whenever the gateway answers 414, or 400 with a
+    URL/header-too-long message.
+
+    Args:
+        cids (list): Customer IDs to fetch
+        cluster_url (str): Base URL of the cluster
+        token (str): Bearer token for upstream API
+        app_name (str): App name to query (default 'ALL')
+
+    Returns:
+        dict: {
+            'results': {'cid': status_data, ...},
+            'failed': [CIDs whose chunk failed for other reasons],
+            'chunk_count': int
+        }
+    """
+    cluster_url = cluster_url.rstrip('/')
+    headers = build_headers(token)
+    base_url = f'{cluster_url}/tms/v1/get/appstatus?app={app_name}&cid='
+    chunks = split_into_chunks(cids, base_url, get_chunk_limit(cluster_url))
+
+    futures = [_executor.submit(_fetch_chunk, cluster_url, chunk, app_name, headers) for chunk in chunks]
+
+    results = {}
+    failed = []
+    for future, chunk in zip(futures, chunks):
+        try:
+            chunk_results, chunk_failed = future.result()
+        except Exception as e:
+            chunk_results, chunk_failed = {}, list(chunk)
+        results.update(chunk_results)
+        failed.extend(chunk_failed)
+
+    return {
+        'results': results,
+        'failed': failed,
+        'chunk_count': len(chunks)
+    }
+
+
+def get_chunk_stats():
+    """
+    Get the learned batch chunk limits for every cluster.
+
+    Returns:
+        dict: {'cluster_url': {'limit': int, 'largest_accepted': int, ...}, ...}
+    """
+    with _chunk_lock:
+        return {key: dict(state) for key, state in _chunk_limits.items()}
+
+
+# ============================================================================
+# BACKGROUND REFRESH (STALE-WHILE-REVALIDATE)
+# ============================================================================
+
+def _refresh_group(cluster_url, app_name, token, on_results, cids):
+    """Refresh one group of CIDs: chunked batch first, single-CID fetches for failures"""
+    batch = fetch_appstatus_batch_chunked(cids, cluster_url, token, app_name)
+    results = dict(batch['results'])
+
+    if batch['failed']:
+        fallback = fetch_appstatus_concurrent(batch['failed'], cluster_url, token, app_name,
+                                              deadline_seconds=APPSTATUS_FALLBACK_DEADLINE)
+        for cid, result in fallback['results'].items():
+            if result['error'] is None:
+                results[cid] = result['data']
+
+    if results:
+        on_results(results)
+    return len(results)
+
+
+def _refresh_loop():
+    """Drain the refresh queue, grouping CIDs that share cluster, app and token"""
+    while True:
+        items = [_refresh_queue.get()]
+        while len(items) < APPSTATUS_REFRESH_BATCH_SIZE:
+            try:
+                items.append(_refresh_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        groups = {}
+        for group_key, cid in items:
+            groups.setdefault(group_key, []).append(cid)
+
+        for (cluster_url, app_name, token, on_results), cids in groups.items():
+            refreshed = 0
+            try:
+                refreshed = _refresh_group(cluster_url, app_name, token, on_results, cids)
+            except Exception as e:
+                print(f"[APPSTATUS] Background refresh failed for {len(cids)} CIDs: {str(e)}")
+            with _refresh_lock:
+                _refresh_stats['refreshed'] += refreshed
+                _refresh_stats['failed'] += len(cids) - refreshed
+                for cid in cids:
+                    _refresh_pending.discard((cluster_url, app_name, cid))
+
+        for _ in items:
+            _refresh_queue.task_done()
+
+
+def _ensure_refresh_worker():
+    """Start the background refresh thread on first use"""
+    global _refresh_thread
+    with _refresh_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh_loop, name='appstatus-refresh', daemon=True)
+            _refresh_thread.start()
+
+
+def enqueue_refresh(cids, cluster_url, token, on_results, app_name='ALL'):
+    """
+    Queue CIDs for a background app status refresh.
+
+    CIDs already queued (or being refreshed) for the same cluster and app are
+    skipped, and CIDs beyond the queue bound are dropped - they will simply be
+    picked up again by a later request.
+
+    Args:
+        cids (list): Customer IDs to refresh
+        cluster_url (str): Base URL of the cluster
+        token (str): Bearer token for upstream API
+        on_results (callable): Called from the refresh thread with
+                               {cid: status_data} for every refreshed group
+        app_name (str): App name to query (default 'ALL')
+
+    Returns:
+        int: Number of CIDs newly queued
+    """
+    cluster_url = cluster_url.rstrip('/')
+    group_key = (cluster_url, app_name, token, on_results)
+    _ensure_refresh_worker()
+
+    queued = 0
+    with _refresh_lock:
+        for cid in cids:
+            key = (cluster_url, app_name, cid)
+            if key in _refresh_pending:
+                _refresh_stats['deduplicated'] += 1
+                continue
+            try:
+                _refresh_queue.put_nowait((group_key, cid))
+            except queue.Full:
+                _refresh_stats['dropped'] += 1
+                continue
+            _refresh_pending.add(key)
+            queued += 1
+        _refresh_stats['queued'] += queued
+    return queued
+
+
+def wait_for_refreshes():
+    """Block until every queued refresh has been processed"""
+    _refresh_queue.join()
+
+
+def get_refresh_stats():
+    """
+    Get background refresh queue statistics.
+
+    Returns:
+        dict: {'pending': int, 'queue_size': int, 'queued': int, 'deduplicated': int,
+               'dropped': int, 'refreshed': int, 'failed': int}
+    """
+    with _refresh_lock:
+        stats = dict(_refresh_stats)
+        stats['pending'] = len(_refresh_pending)
+    stats['queue_size'] = APPSTATUS_REFRESH_QUEUE_SIZE
+    return stats
@@ -5,7 +5,7 @@ Provides high-level audit logging functionality for user actions.
 
 import time
 from functools import wraps
-from src.audit_db import log_action
+from src.audit_writer import submit_audit_entry
 
 
 # Tracked action types
@@ -89,7 +89,7 @@ def audit_action(action_type):
                 duration_ms = int((time.time() - start_time) * 1000)
                 ip_address = get_client_ip(request)
                 
-                log_action(
+                submit_audit_entry(
                     user_id=user_id,
                     action_type=action_type,
                     customer_ids=customer_ids,
@@ -108,6 +108,8 @@ def log_user_action(user_id, action_type, customer_ids=None, ip_address=None,
     """
     Manually log a user action.
     
+    The entry is written by the background audit writer (see src/audit_writer.py).
+    
     Args:
         user_id (str): Username who performed the action
         action_type (str): Type of action
@@ -118,12 +120,13 @@ def log_user_action(user_id, action_type, customer_ids=None, ip_address=None,
         duration_ms (int): Duration of action in milliseconds
     
     Returns:
-        int: ID of the logged action or None if failed
+        int: ID of the logged action if it was written inline,
+             None if it was queued for the background writer or failed
     """
     if action_type not in TRACKED_ACTIONS:
         print(f"Warning: Untracked action type: {action_type}")
     
-    return log_action(
+    return submit_audit_entry(
         user_id=user_id,
         action_type=action_type,
         customer_ids=customer_ids,
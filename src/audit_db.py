@@ -5,9 +5,10 @@ Manages SQLite database operations for audit logging.
 
 import sqlite3
 import os
-from datetime import datetime
+import re
+from datetime import datetime, timedelta, timezone
 import json
-from src.db_optimizer import optimize_db_connection
+from src.db_pool import get_pool, pooled_connect
 
 # Database configuration
 AUDIT_DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'audit.db')
@@ -18,14 +19,334 @@ def get_db_connection():
     Get a connection to the audit database.
     
     Returns:
-        sqlite3.Connection: Database connection object
+        PooledConnection: Pooled database connection (close() returns it to the pool)
     """
-    conn = sqlite3.connect(AUDIT_DB_PATH)
+    conn = pooled_connect(AUDIT_DB_PATH)  # Already optimized; close() returns it to the pool
     conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-    conn = optimize_db_connection(conn, 'audit.db')
     return conn
 
 
+def customer_ids_each(column):
+    """
+    SQL table-valued expression yielding one row per customer ID in a
+    customer_ids column: the elements of a JSON list, or the plain value
+    itself when it is not JSON (a single CID).
+    """
+    return f"json_each(CASE WHEN json_valid({column}) THEN {column} ELSE json_array({column}) END)"
+
+
+# Columns shared by audit_log and its monthly partitions (same order, so
+# rows can be moved with INSERT ... SELECT * and unioned with SELECT *)
+_AUDIT_LOG_COLUMNS = '''
+            user_id TEXT NOT NULL,
+            action_type TEXT NOT NULL,
+            customer_ids TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            ip_address TEXT,
+            status TEXT,
+            error_message TEXT,
+            duration_ms INTEGER'''
+
+_MONTH = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+def month_range(month):
+    """
+    Timestamp range covered by a month.
+    
+    Args:
+        month (str): 'YYYY-MM'
+    
+    Returns:
+        tuple: ('YYYY-MM-01', first day of the next month) - compares correctly
+               against both timestamp formats found in audit_log
+    
+    Raises:
+        ValueError: If month is not 'YYYY-MM'
+    """
+    if not isinstance(month, str) or not _MONTH.match(month):
+        raise ValueError(f'Invalid month: {month!r}')
+    year, mon = int(month[:4]), int(month[5:])
+    year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return f'{month}-01', f'{year:04d}-{mon:02d}-01'
+
+
+def partition_table_name(month):
+    """Return the partition table holding a month, e.g. '2025-03' -> 'audit_log_202503'"""
+    month_range(month)
+    return f'audit_log_{month[:4]}{month[5:]}'
+
+
+def create_partition_table(cursor, month):
+    """Create a month's partition table and its indexes (no-op if it exists)"""
+    table = partition_table_name(month)
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {_AUDIT_LOG_COLUMNS})')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_user_timestamp ON {table}(user_id, timestamp DESC)')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_action_type ON {table}(action_type)')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp DESC)')
+    return table
+
+
+def refresh_audit_view(cursor):
+    """Recreate the audit_log_all view over audit_log and every partition"""
+    cursor.execute('SELECT table_name FROM audit_partitions ORDER BY month DESC')
+    selects = ['SELECT * FROM audit_log'] + [f'SELECT * FROM {row[0]}' for row in cursor.fetchall()]
+    cursor.execute('DROP VIEW IF EXISTS audit_log_all')
+    cursor.execute(f"CREATE VIEW audit_log_all AS {' UNION ALL '.join(selects)}")
+
+
+def normalize_timestamp(value):
+    """
+    Convert a start/end filter to the stored 'YYYY-MM-DD HH:MM:SS' (UTC) format.
+    
+    Timestamps are compared as strings, so an ISO value such as
+    '2025-03-01T10:00' must be rewritten first (' ' sorts before 'T').
+    
+    Args:
+        value (str): ISO 8601 date or datetime; one with an offset is converted to UTC
+    
+    Returns:
+        str: Normalized timestamp, or None if value is empty
+    
+    Raises:
+        ValueError: If value is not an ISO 8601 date/datetime
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError(f'Invalid timestamp: {value!r} (expected ISO 8601, e.g. 2025-03-01 or 2025-03-01T10:00)')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _audit_sources(cursor, start=None, end=None):
+    """
+    Tables that can hold rows with start <= timestamp < end
+    (start/end already normalized by normalize_timestamp).
+    
+    audit_log is always included: it holds the current month plus any late
+    rows for older months until the next rollover. Partitions only ever hold
+    completed months, so a window starting in the current month reads
+    audit_log alone.
+    """
+    cursor.execute('SELECT month, table_name FROM audit_partitions ORDER BY month DESC')
+    tables = ['audit_log']
+    for month, table in cursor.fetchall():
+        # Bounds in the normalized 'YYYY-MM-DD HH:MM:SS' form of start/end
+        low, high = (bound + ' 00:00:00' for bound in month_range(month))
+        if (end is None or low < end) and (start is None or high > start):
+            tables.append(table)
+    return tables
+
+
+def _build_trail_query(cursor, user_id=None, action_type=None, customer_id=None, start=None, end=None):
+    """
+    Build the newest-first audit trail query across the tables the filters can touch.
+    
+    Each table gets its own SELECT, unioned with UNION ALL under one
+    ORDER BY timestamp DESC, which SQLite runs as an ordered merge of
+    per-table index scans.
+    
+    Returns:
+        tuple: (sql, params) - without a LIMIT clause
+    
+    Raises:
+        ValueError: If start or end is not a valid timestamp
+    """
+    start = normalize_timestamp(start)
+    end = normalize_timestamp(end)
+    selects = []
+    params = []
+    for table in _audit_sources(cursor, start, end):
+        if customer_id:
+            # Drive each lookup from the customer's index entries (CROSS JOIN
+            # fixes the join order), so it never scans the whole log
+            select = f'''
+                SELECT {table}.* FROM audit_log_customers
+                CROSS JOIN {table} ON {table}.id = audit_log_customers.log_id
+                WHERE audit_log_customers.customer_id = ?'''
+            params.append(customer_id)
+        else:
+            select = f'SELECT * FROM {table} WHERE 1=1'
+        
+        if user_id:
+            select += ' AND user_id = ?'
+            params.append(user_id)
+        if action_type:
+            select += ' AND action_type = ?'
+            params.append(action_type)
+        if start:
+            select += ' AND timestamp >= ?'
+            params.append(start)
+        if end:
+            select += ' AND timestamp < ?'
+            params.append(end)
+        selects.append(select)
+    
+    return ' UNION ALL '.join(selects) + ' ORDER BY timestamp DESC', params
+
+
+# Rollup bucket expressions; strftime accepts both the CURRENT_TIMESTAMP and
+# ISO 'T' timestamp formats found in audit_log
+_HOUR_BUCKET = "COALESCE(strftime('%Y-%m-%d %H:00', {ts}), '')"
+_DAY_BUCKET = "COALESCE(date({ts}), '')"
+
+ROLLUP_PERIODS = ('hour', 'day')
+
+# Bucket label formats written by _HOUR_BUCKET / _DAY_BUCKET
+_ROLLUP_BUCKET_FORMATS = {'hour': '%Y-%m-%d %H:00', 'day': '%Y-%m-%d'}
+
+
+def _rollup_bound(value, period, round_up=False):
+    """
+    Convert a start/end filter to the bucket label format of a rollup period.
+    
+    Buckets are compared as strings, so a bound such as '2025-01-01T10:00'
+    must be rewritten first (' ' sorts before 'T'). A bound inside a bucket
+    is truncated to that bucket, or moved to the next one with round_up, so
+    start/end select every bucket overlapping [start, end).
+    
+    Raises:
+        ValueError: If value is not an ISO 8601 date/datetime
+    """
+    normalized = normalize_timestamp(value)
+    if normalized is None:
+        return None
+    parsed = datetime.strptime(normalized, '%Y-%m-%d %H:%M:%S')
+    bucket = parsed.replace(minute=0, second=0)
+    if period == 'day':
+        bucket = bucket.replace(hour=0)
+    if round_up and bucket != parsed:
+        bucket += timedelta(hours=1) if period == 'hour' else timedelta(days=1)
+    return bucket.strftime(_ROLLUP_BUCKET_FORMATS[period])
+
+
+def _create_rollup_tables(cursor):
+    """
+    Create the audit rollup tables and the trigger that maintains them.
+    
+    audit_rollup_users / audit_rollup_actions hold running totals per user and
+    per action type (their row counts are the distinct counts); audit_rollups
+    holds hourly and daily buckets per (user, action). The trigger updates all
+    of them in the same transaction as each audit_log insert.
+    
+    Returns:
+        bool: True if the tables were just created and need a backfill
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_rollups'"
+    )
+    created = cursor.fetchone() is None
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_rollup_users (
+            user_id TEXT PRIMARY KEY,
+            entries INTEGER NOT NULL DEFAULT 0,
+            successes INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_rollup_actions (
+            action_type TEXT PRIMARY KEY,
+            entries INTEGER NOT NULL DEFAULT 0,
+            successes INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_rollups (
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            action_type TEXT NOT NULL,
+            entries INTEGER NOT NULL DEFAULT 0,
+            successes INTEGER NOT NULL DEFAULT 0,
+            duration_ms_total INTEGER NOT NULL DEFAULT 0,
+            timed_entries INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket, user_id, action_type)
+        ) WITHOUT ROWID
+    ''')
+    
+    success = "(NEW.status IS 'success')"
+    bucket_upserts = ''.join(f'''
+            INSERT INTO audit_rollups (period, bucket, user_id, action_type, entries, successes,
+                                       duration_ms_total, timed_entries)
+            VALUES ('{period}', {expr.format(ts='NEW.timestamp')}, NEW.user_id, NEW.action_type,
+                    1, {success}, COALESCE(NEW.duration_ms, 0), NEW.duration_ms IS NOT NULL)
+            ON CONFLICT (period, bucket, user_id, action_type) DO UPDATE SET
+                entries = entries + 1,
+                successes = successes + excluded.successes,
+                duration_ms_total = duration_ms_total + excluded.duration_ms_total,
+                timed_entries = timed_entries + excluded.timed_entries;
+    ''' for period, expr in (('hour', _HOUR_BUCKET), ('day', _DAY_BUCKET)))
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_audit_rollups
+        AFTER INSERT ON audit_log
+        BEGIN
+            INSERT INTO audit_rollup_users (user_id, entries, successes)
+            VALUES (NEW.user_id, 1, {success})
+            ON CONFLICT (user_id) DO UPDATE SET
+                entries = entries + 1, successes = successes + excluded.successes;
+            INSERT INTO audit_rollup_actions (action_type, entries, successes)
+            VALUES (NEW.action_type, 1, {success})
+            ON CONFLICT (action_type) DO UPDATE SET
+                entries = entries + 1, successes = successes + excluded.successes;
+            {bucket_upserts}
+        END
+    ''')
+    return created
+
+
+def _rebuild_rollups(cursor):
+    """Recompute every rollup table from audit_log and its partitions"""
+    cursor.execute('DELETE FROM audit_rollup_users')
+    cursor.execute('DELETE FROM audit_rollup_actions')
+    cursor.execute('DELETE FROM audit_rollups')
+    cursor.execute('''
+        INSERT INTO audit_rollup_users (user_id, entries, successes)
+        SELECT user_id, COUNT(*), SUM(status IS 'success') FROM audit_log_all GROUP BY user_id
+    ''')
+    cursor.execute('''
+        INSERT INTO audit_rollup_actions (action_type, entries, successes)
+        SELECT action_type, COUNT(*), SUM(status IS 'success') FROM audit_log_all GROUP BY action_type
+    ''')
+    for period, expr in (('hour', _HOUR_BUCKET), ('day', _DAY_BUCKET)):
+        bucket = expr.format(ts='timestamp')
+        cursor.execute(f'''
+            INSERT INTO audit_rollups (period, bucket, user_id, action_type, entries, successes,
+                                       duration_ms_total, timed_entries)
+            SELECT '{period}', {bucket}, user_id, action_type,
+                   COUNT(*), SUM(status IS 'success'), COALESCE(SUM(duration_ms), 0), COUNT(duration_ms)
+            FROM audit_log_all
+            GROUP BY {bucket}, user_id, action_type
+        ''')
+
+
+def rebuild_audit_rollups():
+    """
+    Recompute the audit rollups from audit_log.
+    
+    Only needed after rows are removed from audit_log outside clear_audit_logs;
+    inserts keep the rollups current on their own.
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        _rebuild_rollups(cursor)
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Error rebuilding audit rollups: {str(e)}")
+        return False
+
+
 def initialize_database():
     """
     Initialize the audit database with tables and indexes.
@@ -35,17 +356,12 @@ def initialize_database():
     cursor = conn.cursor()
     
     # Create audit_log table
-    cursor.execute('''
+    # Current partition: every insert lands here, and completed months are
+    # moved out to audit_log_YYYYMM tables (see src/audit_partitions.py).
+    # AUTOINCREMENT keeps ids unique across all partitions.
+    cursor.execute(f'''
         CREATE TABLE IF NOT EXISTS audit_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            action_type TEXT NOT NULL,
-            customer_ids TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            ip_address TEXT,
-            status TEXT,
-            error_message TEXT,
-            duration_ms INTEGER
+            id INTEGER PRIMARY KEY AUTOINCREMENT,{_AUDIT_LOG_COLUMNS}
         )
     ''')
     
@@ -65,10 +381,73 @@ def initialize_database():
         ON audit_log(timestamp DESC)
     ''')
     
+    # Customer lookups go through audit_log_customers; an index on the JSON
+    # text could never serve them
+    cursor.execute('DROP INDEX IF EXISTS idx_customer_search')
+    
+    # One row per (customer, audit entry), filled by a trigger on every
+    # insert into audit_log - including rows written outside log_action
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_log_customers'"
+    )
+    needs_backfill = cursor.fetchone() is None
+    
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_log_customers (
+            customer_id TEXT NOT NULL,
+            log_id INTEGER NOT NULL,
+            PRIMARY KEY (customer_id, log_id)
+        ) WITHOUT ROWID
+    ''')
+    
+    if needs_backfill:
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO audit_log_customers (customer_id, log_id)
+            SELECT CAST(c.value AS TEXT), a.id
+            FROM audit_log a, {customer_ids_each('a.customer_ids')} c
+            WHERE a.customer_ids IS NOT NULL AND c.value IS NOT NULL AND c.value != ''
+        ''')
+        if cursor.rowcount:
+            print(f"[AUDIT] Backfilled audit_log_customers with {cursor.rowcount} rows")
+    
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_audit_log_customers
+        AFTER INSERT ON audit_log
+        WHEN NEW.customer_ids IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO audit_log_customers (customer_id, log_id)
+            SELECT CAST(c.value AS TEXT), NEW.id
+            FROM {customer_ids_each('NEW.customer_ids')} c
+            WHERE c.value IS NOT NULL AND c.value != '';
+        END
+    ''')
+    
+    # Monthly partitions, unioned with audit_log by the audit_log_all view
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_partitions (
+            month TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL UNIQUE,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    ''')
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_customer_search 
-        ON audit_log(customer_ids)
+        CREATE TABLE IF NOT EXISTS audit_archives (
+            month TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL,
+            archive_path TEXT,
+            dropped_at TEXT NOT NULL
+        )
     ''')
+    refresh_audit_view(cursor)
+    
+    if _create_rollup_tables(cursor):
+        _rebuild_rollups(cursor)
+        cursor.execute('SELECT COALESCE(SUM(entries), 0) FROM audit_rollup_actions')
+        backfilled = cursor.fetchone()[0]
+        if backfilled:
+            print(f"[AUDIT] Built audit rollups from {backfilled} existing audit_log rows")
     
     conn.commit()
     conn.close()
@@ -76,6 +455,50 @@ def initialize_database():
     return True
 
 
+def build_audit_row(user_id, action_type, customer_ids=None, ip_address=None,
+                    status='success', error_message=None, duration_ms=None, timestamp=None):
+    """
+    Build an audit_log row tuple for insert_audit_rows.
+    
+    The timestamp is taken now (UTC, in CURRENT_TIMESTAMP format) unless given,
+    so a row written later by the background writer keeps the time of the action.
+    
+    Returns:
+        tuple: (user_id, action_type, customer_ids, timestamp, ip_address,
+                status, error_message, duration_ms)
+    """
+    # Convert customer_ids to JSON string if it's a list
+    if isinstance(customer_ids, list):
+        customer_ids_str = json.dumps(customer_ids)
+    else:
+        customer_ids_str = customer_ids
+    
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    
+    return (user_id, action_type, customer_ids_str, timestamp, ip_address,
+            status, error_message, duration_ms)
+
+
+def insert_audit_rows(rows):
+    """
+    Insert rows from build_audit_row in a single transaction.
+    
+    Returns:
+        int: Number of rows written
+    
+    Raises:
+        sqlite3.Error: If the transaction fails (nothing is written)
+    """
+    with get_pool(AUDIT_DB_PATH).connection() as conn:
+        conn.executemany('''
+            INSERT INTO audit_log 
+            (user_id, action_type, customer_ids, timestamp, ip_address, status, error_message, duration_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return len(rows)
+
+
 def log_action(user_id, action_type, customer_ids=None, ip_address=None, 
                status='success', error_message=None, duration_ms=None):
     """
@@ -94,20 +517,17 @@ def log_action(user_id, action_type, customer_ids=None, ip_address=None,
         int: ID of the logged action or None if failed
     """
     try:
-        # Convert customer_ids to JSON string if it's a list
-        if isinstance(customer_ids, list):
-            customer_ids_str = json.dumps(customer_ids)
-        else:
-            customer_ids_str = customer_ids
+        row = build_audit_row(user_id, action_type, customer_ids, ip_address,
+                              status, error_message, duration_ms)
         
         conn = get_db_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
             INSERT INTO audit_log 
-            (user_id, action_type, customer_ids, ip_address, status, error_message, duration_ms)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, action_type, customer_ids_str, ip_address, status, error_message, duration_ms))
+            (user_id, action_type, customer_ids, timestamp, ip_address, status, error_message, duration_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', row)
         
         conn.commit()
         log_id = cursor.lastrowid
@@ -120,43 +540,42 @@ def log_action(user_id, action_type, customer_ids=None, ip_address=None,
         return None
 
 
-def get_audit_trail(limit=50, user_id=None, action_type=None, customer_id=None):
+def get_audit_trail(limit=50, user_id=None, action_type=None, customer_id=None, start=None, end=None):
     """
     Retrieve audit trail records from the database.
     
+    Only partitions overlapping [start, end) are read, so a window within the
+    current month touches audit_log alone.
+    
     Args:
         limit (int): Maximum number of records to return
         user_id (str): Filter by user (optional)
         action_type (str): Filter by action type (optional)
-        customer_id (str): Filter by customer ID (optional)
+        customer_id (str): Filter by customer ID, exact match (optional)
+        start (str): Only records at or after this timestamp (optional)
+        end (str): Only records before this timestamp (optional)
     
     Returns:
         list: List of audit log records (dicts)
+    
+    Raises:
+        ValueError: If start or end is not a valid timestamp
     """
+    start = normalize_timestamp(start)
+    end = normalize_timestamp(end)
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        query = 'SELECT * FROM audit_log WHERE 1=1'
-        params = []
-        
-        if user_id:
-            query += ' AND user_id = ?'
-            params.append(user_id)
-        
-        if action_type:
-            query += ' AND action_type = ?'
-            params.append(action_type)
-        
-        if customer_id:
-            query += ' AND customer_ids LIKE ?'
-            params.append(f'%{customer_id}%')
-        
-        query += ' ORDER BY timestamp DESC LIMIT ?'
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        # Read the partition list and the rows from one snapshot, so a
+        # concurrent rollover cannot hide the rows it is moving
+        cursor.execute('BEGIN')
+        try:
+            query, params = _build_trail_query(cursor, user_id, action_type, customer_id, start, end)
+            cursor.execute(query + ' LIMIT ?', params + [limit])
+            rows = cursor.fetchall()
+        finally:
+            conn.rollback()
         conn.close()
         
         # Convert rows to dictionaries
@@ -179,6 +598,57 @@ def get_audit_trail(limit=50, user_id=None, action_type=None, customer_id=None):
         return []
 
 
+# Column order of audit trail rows (audit_log and every partition)
+AUDIT_TRAIL_COLUMNS = ('id', 'user_id', 'action_type', 'customer_ids', 'timestamp',
+                       'ip_address', 'status', 'error_message', 'duration_ms')
+
+# Rows fetched per round trip while streaming an export
+EXPORT_FETCH_SIZE = 1000
+
+
+def iter_audit_trail(user_id=None, action_type=None, customer_id=None, start=None, end=None,
+                     limit=None, fetch_size=EXPORT_FETCH_SIZE):
+    """
+    Stream audit trail records, newest first, in batches.
+    
+    Uses the same filters and partition routing as get_audit_trail, but reads
+    the cursor fetch_size rows at a time, so memory stays flat however many
+    rows match. The whole export reads one snapshot; the connection is held
+    until the generator is exhausted or closed.
+    
+    Args:
+        user_id (str): Filter by user (optional)
+        action_type (str): Filter by action type (optional)
+        customer_id (str): Filter by customer ID, exact match (optional)
+        start (str): Only records at or after this timestamp (optional)
+        end (str): Only records before this timestamp (optional)
+        limit (int): Maximum number of records (default: all)
+        fetch_size (int): Rows per batch
+    
+    Yields:
+        list: Up to fetch_size rows (tuples in AUDIT_TRAIL_COLUMNS order,
+              customer_ids as stored)
+    """
+    conn = get_db_connection()
+    conn.row_factory = None  # Plain tuples; the pool resets this on checkout
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN')
+        query, params = _build_trail_query(cursor, user_id, action_type, customer_id, start, end)
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.rollback()
+        conn.close()
+
+
 def get_user_actions(user_id, limit=50):
     """
     Get all actions performed by a specific user.
@@ -217,7 +687,7 @@ def get_action_types():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT DISTINCT action_type FROM audit_log ORDER BY action_type')
+        cursor.execute('SELECT action_type FROM audit_rollup_actions ORDER BY action_type')
         rows = cursor.fetchall()
         conn.close()
         return [row[0] for row in rows]
@@ -230,6 +700,8 @@ def get_audit_stats():
     """
     Get statistics about audit logs.
     
+    Read from the rollup tables, so the cost does not grow with audit_log.
+    
     Returns:
         dict: Statistics including total records, unique users, action types, etc.
     """
@@ -237,22 +709,18 @@ def get_audit_stats():
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Total records
-        cursor.execute('SELECT COUNT(*) as total FROM audit_log')
-        total = cursor.fetchone()[0]
+        # Total records and successes
+        cursor.execute('SELECT COALESCE(SUM(entries), 0), COALESCE(SUM(successes), 0) FROM audit_rollup_actions')
+        total, successes = cursor.fetchone()
         
         # Total users
-        cursor.execute('SELECT COUNT(DISTINCT user_id) as users FROM audit_log')
+        cursor.execute('SELECT COUNT(*) FROM audit_rollup_users')
         users = cursor.fetchone()[0]
         
         # Total actions
-        cursor.execute('SELECT COUNT(DISTINCT action_type) as actions FROM audit_log')
+        cursor.execute('SELECT COUNT(*) FROM audit_rollup_actions')
         actions = cursor.fetchone()[0]
         
-        # Success rate
-        cursor.execute('SELECT COUNT(*) as success FROM audit_log WHERE status = "success"')
-        successes = cursor.fetchone()[0]
-        
         success_rate = (successes / total * 100) if total > 0 else 0
         
         conn.close()
@@ -271,9 +739,93 @@ def get_audit_stats():
         return {}
 
 
+def get_audit_rollups(period='hour', start=None, end=None, user_id=None, action_type=None,
+                      group_by=None, limit=1000):
+    """
+    Get bucketed audit counts, oldest bucket first.
+    
+    Args:
+        period (str): 'hour' or 'day'
+        start (str): ISO date/datetime (UTC unless it has an offset); its bucket is the first included
+        end (str): ISO date/datetime; only buckets that start before it are included
+        user_id (str): Only this user (optional)
+        action_type (str): Only this action type (optional)
+        group_by (str): 'user', 'action', 'user_action' or None (totals per bucket)
+        limit (int): Maximum number of rows to return
+    
+    Returns:
+        list: [{'bucket': str, ['user_id': str,] ['action_type': str,] 'entries': int,
+                'successes': int, 'failures': int, 'avg_duration_ms': float or None}]
+    
+    Raises:
+        ValueError: If period or group_by is not recognized, or start/end is not a valid timestamp
+    """
+    if period not in ROLLUP_PERIODS:
+        raise ValueError(f'period must be one of {", ".join(ROLLUP_PERIODS)}')
+    start = _rollup_bound(start, period)
+    end = _rollup_bound(end, period, round_up=True)
+    group_columns = {
+        None: [],
+        'user': ['user_id'],
+        'action': ['action_type'],
+        'user_action': ['user_id', 'action_type']
+    }
+    if group_by not in group_columns:
+        raise ValueError('group_by must be user, action or user_action')
+    columns = group_columns[group_by]
+    
+    query_columns = ', '.join(['bucket'] + columns)
+    query = f'''
+        SELECT {query_columns}, SUM(entries), SUM(successes), SUM(duration_ms_total), SUM(timed_entries)
+        FROM audit_rollups WHERE period = ?
+    '''
+    params = [period]
+    
+    if start:
+        query += ' AND bucket >= ?'
+        params.append(start)
+    if end:
+        query += ' AND bucket < ?'
+        params.append(end)
+    if user_id:
+        query += ' AND user_id = ?'
+        params.append(user_id)
+    if action_type:
+        query += ' AND action_type = ?'
+        params.append(action_type)
+    
+    query += f' GROUP BY {query_columns} ORDER BY {query_columns} LIMIT ?'
+    params.append(limit)
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+    except Exception as e:
+        print(f"Error getting audit rollups: {str(e)}")
+        return []
+    
+    results = []
+    for row in rows:
+        entries, successes, duration_total, timed = row[-4:]
+        record = {'bucket': row[0]}
+        for i, column in enumerate(columns, start=1):
+            record[column] = row[i]
+        record.update({
+            'entries': entries,
+            'successes': successes,
+            'failures': entries - successes,
+            'avg_duration_ms': round(duration_total / timed, 1) if timed else None
+        })
+        results.append(record)
+    return results
+
+
 def clear_audit_logs():
     """
-    Clear all audit logs from the database.
+    Clear all audit logs from the database, including every partition.
     WARNING: This is a destructive operation and should be used with caution.
     
     Returns:
@@ -282,7 +834,16 @@ def clear_audit_logs():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
+        cursor.execute('SELECT table_name FROM audit_partitions')
+        for (table,) in cursor.fetchall():
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        cursor.execute('DELETE FROM audit_partitions')
+        refresh_audit_view(cursor)
         cursor.execute('DELETE FROM audit_log')
+        cursor.execute('DELETE FROM audit_log_customers')
+        cursor.execute('DELETE FROM audit_rollup_users')
+        cursor.execute('DELETE FROM audit_rollup_actions')
+        cursor.execute('DELETE FROM audit_rollups')
         conn.commit()
         conn.close()
         return True
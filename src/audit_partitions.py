@@ -0,0 +1,291 @@
+"""
+Audit Partition Maintenance Module
+Keeps audit_log small by moving each completed month into its own
+audit_log_YYYYMM table, and retires partitions past the retention period.
+
+audit_log is the current partition: every insert (and its customer-index and
+rollup triggers) lands there. roll_over_partitions() moves rows from earlier
+months into their partitions, keeping their ids, so audit_log_customers keeps
+pointing at them. apply_retention() writes each expired partition to a
+gzip-compressed NDJSON archive, removes its customer index entries and
+rollup counts, and drops the table.
+
+Reads go through audit_db: get_audit_trail picks the partitions a time
+window overlaps, and the audit_log_all view unions everything. Both jobs run
+from the maintenance scheduler via run_partition_maintenance().
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from src.audit_db import (create_partition_table, customer_ids_each, get_db_connection, month_range,
+                          partition_table_name, refresh_audit_view)
+
+# Months of partitions kept after the current one (0 keeps every partition)
+AUDIT_RETENTION_MONTHS = int(os.environ.get('AUDIT_RETENTION_MONTHS', 12))
+
+# Write expired partitions to a compressed archive before dropping them
+AUDIT_ARCHIVE_ENABLED = os.environ.get('AUDIT_ARCHIVE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Where partition archives (audit_log_YYYYMM.ndjson.gz) are written
+AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR',
+                                   os.path.join(os.path.dirname(__file__), '..', 'audit_archive'))
+
+# Rows fetched per round trip while archiving
+ARCHIVE_FETCH_SIZE = 1000
+
+
+def _current_month(now=None):
+    """'YYYY-MM' of now (UTC, matching CURRENT_TIMESTAMP)"""
+    return (now or datetime.now(timezone.utc)).strftime('%Y-%m')
+
+
+def _shift_month(month, delta):
+    """Add delta months to a 'YYYY-MM' string"""
+    index = int(month[:4]) * 12 + int(month[5:]) - 1 + delta
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+
+def roll_over_partitions(now=None):
+    """
+    Move rows of completed months out of audit_log into their partitions.
+
+    Each month is moved in its own transaction (copy, then delete), so readers
+    see a row either in audit_log or in its partition, never in both or neither.
+
+    Args:
+        now (datetime): Current time (default: now, UTC)
+
+    Returns:
+        int: Number of rows moved
+    """
+    current_start = month_range(_current_month(now))[0]
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute('''
+            SELECT DISTINCT substr(timestamp, 1, 7) FROM audit_log
+            WHERE timestamp < ?
+        ''', (current_start,))
+        months = sorted(row[0] for row in cursor.fetchall())
+
+        moved_total = 0
+        for month in months:
+            try:
+                low, high = month_range(month)
+            except ValueError:
+                print(f"[AUDIT_PARTITIONS] Skipping rows with unrecognised timestamp prefix {month!r}")
+                continue
+
+            table = create_partition_table(cursor, month)
+            cursor.execute(f'''
+                INSERT INTO {table}
+                SELECT * FROM audit_log WHERE timestamp >= ? AND timestamp < ?
+            ''', (low, high))
+            moved = cursor.rowcount
+            cursor.execute('DELETE FROM audit_log WHERE timestamp >= ? AND timestamp < ?', (low, high))
+
+            now_str = datetime.now().isoformat()
+            cursor.execute('''
+                INSERT INTO audit_partitions (month, table_name, row_count, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (month) DO UPDATE SET
+                    row_count = row_count + excluded.row_count,
+                    updated_at = excluded.updated_at
+            ''', (month, table, moved, now_str, now_str))
+            refresh_audit_view(cursor)
+            conn.commit()
+
+            moved_total += moved
+            print(f"[AUDIT_PARTITIONS] Moved {moved} rows into {table}")
+
+        return moved_total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def archive_partition(month, archive_dir=None):
+    """
+    Write a partition to a gzip-compressed NDJSON file (one audit row per line).
+
+    The file is written under a temporary name and renamed when complete.
+
+    Args:
+        month (str): 'YYYY-MM'
+        archive_dir (str): Target directory (default AUDIT_ARCHIVE_DIR)
+
+    Returns:
+        tuple: (archive path, rows written)
+    """
+    table = partition_table_name(month)
+    archive_dir = archive_dir or AUDIT_ARCHIVE_DIR
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{table}.ndjson.gz')
+    tmp_path = path + '.tmp'
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT * FROM {table} ORDER BY id')
+        columns = [column[0] for column in cursor.description]
+        count = 0
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as out:
+            while True:
+                rows = cursor.fetchmany(ARCHIVE_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    out.write(json.dumps(dict(zip(columns, row))) + '\n')
+                count += len(rows)
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    return path, count
+
+
+def drop_partition(month, archive=None):
+    """
+    Retire a partition: archive it, then remove its rows and their derived data.
+
+    Customer index entries are deleted by primary key, rollup counters are
+    decremented by the partition's totals, and the month's hourly/daily
+    buckets are deleted - all in one transaction with the DROP TABLE.
+
+    Args:
+        month (str): 'YYYY-MM'
+        archive (bool): Write an archive first (default AUDIT_ARCHIVE_ENABLED)
+
+    Returns:
+        int: Number of rows dropped
+    """
+    table = partition_table_name(month)
+    if archive is None:
+        archive = AUDIT_ARCHIVE_ENABLED
+    archive_path = None
+    if archive:
+        archive_path, _ = archive_partition(month)
+
+    low, high = month_range(month)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        row_count = cursor.fetchone()[0]
+
+        cursor.execute(f'''
+            DELETE FROM audit_log_customers
+            WHERE (customer_id, log_id) IN (
+                SELECT CAST(c.value AS TEXT), p.id
+                FROM {table} p, {customer_ids_each('p.customer_ids')} c
+                WHERE p.customer_ids IS NOT NULL
+            )
+        ''')
+
+        for rollup, key in (('audit_rollup_users', 'user_id'), ('audit_rollup_actions', 'action_type')):
+            cursor.execute(f'''
+                UPDATE {rollup}
+                SET entries = entries - g.dropped, successes = successes - g.dropped_successes
+                FROM (
+                    SELECT {key} AS k, COUNT(*) AS dropped, SUM(status IS 'success') AS dropped_successes
+                    FROM {table} GROUP BY {key}
+                ) AS g
+                WHERE {rollup}.{key} = g.k
+            ''')
+            cursor.execute(f'DELETE FROM {rollup} WHERE entries <= 0')
+
+        # Hour and day buckets never straddle a month boundary
+        cursor.execute('''
+            DELETE FROM audit_rollups
+            WHERE period IN ('hour', 'day') AND bucket >= ? AND bucket < ?
+        ''', (low, high))
+
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute('DELETE FROM audit_partitions WHERE month = ?', (month,))
+        cursor.execute('''
+            INSERT OR REPLACE INTO audit_archives (month, row_count, archive_path, dropped_at)
+            VALUES (?, ?, ?, ?)
+        ''', (month, row_count, archive_path, datetime.now().isoformat()))
+        refresh_audit_view(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    print(f"[AUDIT_PARTITIONS] Dropped {table} ({row_count} rows, archive: {archive_path or 'none'})")
+    return row_count
+
+
+def apply_retention(now=None):
+    """
+    Drop partitions older than AUDIT_RETENTION_MONTHS before the current month.
+
+    Args:
+        now (datetime): Current time (default: now, UTC)
+
+    Returns:
+        int: Number of rows dropped
+    """
+    if AUDIT_RETENTION_MONTHS <= 0:
+        return 0
+    oldest_kept = _shift_month(_current_month(now), -AUDIT_RETENTION_MONTHS)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT month FROM audit_partitions WHERE month < ? ORDER BY month', (oldest_kept,))
+    expired = [row[0] for row in cursor.fetchall()]
+    conn.close()
+
+    return sum(drop_partition(month) for month in expired)
+
+
+def run_partition_maintenance():
+    """
+    Maintenance task: roll completed months over, then apply retention.
+
+    Returns:
+        int: Rows moved plus rows dropped
+    """
+    return roll_over_partitions() + apply_retention()
+
+
+def get_partition_info():
+    """
+    Describe the current partition layout.
+
+    Returns:
+        dict: {
+            'current_month': str, 'current_rows': int,
+            'retention_months': int, 'archive_enabled': bool, 'archive_dir': str,
+            'partitions': [{'month': str, 'table_name': str, 'row_count': int, 'updated_at': str}],
+            'archives': [{'month': str, 'row_count': int, 'archive_path': str, 'dropped_at': str}]
+        }
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT COUNT(*) FROM audit_log')
+    current_rows = cursor.fetchone()[0]
+    cursor.execute('''
+        SELECT month, table_name, row_count, updated_at FROM audit_partitions ORDER BY month DESC
+    ''')
+    partitions = [dict(row) for row in cursor.fetchall()]
+    cursor.execute('SELECT month, row_count, archive_path, dropped_at FROM audit_archives ORDER BY month DESC')
+    archives = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+
+    return {
+        'current_month': _current_month(),
+        'current_rows': current_rows,
+        'retention_months': AUDIT_RETENTION_MONTHS,
+        'archive_enabled': AUDIT_ARCHIVE_ENABLED,
+        'archive_dir': os.path.abspath(AUDIT_ARCHIVE_DIR),
+        'partitions': partitions,
+        'archives': archives
+    }
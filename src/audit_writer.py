@@ -0,0 +1,234 @@
+"""
+Audit Writer Module
+Moves audit log inserts off the request path.
+
+audit_action and log_user_action hand finished rows to a bounded in-memory
+queue; one background thread drains it and commits up to
+AUDIT_WRITE_BATCH_SIZE rows per transaction, waiting at most
+AUDIT_WRITE_INTERVAL_MS for a batch to fill. Each row carries the timestamp
+of the action itself, taken when it was queued.
+
+When the queue is full the AUDIT_WRITE_OVERFLOW policy applies: 'sync'
+(default) writes the row inline on the caller's thread, so no entry is lost
+and callers are only slowed while the writer is behind; 'drop' discards it
+and counts the drop. Queued rows are flushed when the process exits.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from src.audit_db import build_audit_row, insert_audit_rows, log_action
+
+# Write audit rows on the background writer (False: write inline, as before)
+AUDIT_ASYNC_WRITES = os.environ.get('AUDIT_ASYNC_WRITES', 'true').lower() in ('1', 'true', 'yes')
+
+# Maximum rows committed per transaction
+AUDIT_WRITE_BATCH_SIZE = int(os.environ.get('AUDIT_WRITE_BATCH_SIZE', 500))
+
+# Longest a queued row waits for its batch to fill before it is committed
+AUDIT_WRITE_INTERVAL_MS = int(os.environ.get('AUDIT_WRITE_INTERVAL_MS', 200))
+
+# Maximum rows waiting to be written
+AUDIT_WRITE_QUEUE_SIZE = int(os.environ.get('AUDIT_WRITE_QUEUE_SIZE', 10000))
+
+# What happens to a row when the queue is full: 'sync' or 'drop'
+AUDIT_WRITE_OVERFLOW = os.environ.get('AUDIT_WRITE_OVERFLOW', 'sync')
+
+# Attempts per batch before its rows are counted as failed
+AUDIT_WRITE_ATTEMPTS = 3
+
+# Seconds to wait for queued rows to be written at exit
+AUDIT_SHUTDOWN_TIMEOUT = 10
+
+_STOP = object()
+
+_queue = queue.Queue(maxsize=AUDIT_WRITE_QUEUE_SIZE)
+_lock = threading.Lock()
+_writer_thread = None
+_stats = {
+    'queued': 0,
+    'written': 0,
+    'batches': 0,
+    'failed': 0,
+    'dropped': 0,
+    'written_inline': 0,
+    'last_batch_size': 0,
+    'last_batch_ms': 0.0,
+    'last_lag_ms': 0.0,
+    'max_lag_ms': 0.0
+}
+
+
+def _write_batch(items):
+    """Commit one batch of (row, queued_at) items, retrying transient errors"""
+    rows = [row for row, _ in items]
+    for attempt in range(1, AUDIT_WRITE_ATTEMPTS + 1):
+        try:
+            start = time.monotonic()
+            insert_audit_rows(rows)
+            done = time.monotonic()
+            break
+        except Exception as e:
+            print(f"[AUDIT_WRITER] Batch of {len(rows)} failed (attempt {attempt}): {str(e)}")
+            if attempt == AUDIT_WRITE_ATTEMPTS:
+                _write_rows_singly(rows)
+                return
+            time.sleep(0.1 * attempt)
+
+    lag_ms = (done - items[0][1]) * 1000
+    with _lock:
+        _stats['written'] += len(rows)
+        _stats['batches'] += 1
+        _stats['last_batch_size'] = len(rows)
+        _stats['last_batch_ms'] = round((done - start) * 1000, 2)
+        _stats['last_lag_ms'] = round(lag_ms, 2)
+        _stats['max_lag_ms'] = max(_stats['max_lag_ms'], round(lag_ms, 2))
+
+
+def _write_rows_singly(rows):
+    """Last resort for a failing batch: one transaction per row, so one bad row loses only itself"""
+    written = 0
+    for row in rows:
+        try:
+            insert_audit_rows([row])
+            written += 1
+        except Exception as e:
+            print(f"[AUDIT_WRITER] Dropping unwritable {row[1]} entry for {row[0]}: {str(e)}")
+    with _lock:
+        _stats['written'] += written
+        _stats['failed'] += len(rows) - written
+
+
+def _writer_loop():
+    """Drain the queue in batches until told to stop"""
+    stopping = False
+    while not stopping:
+        item = _queue.get()
+        if item is _STOP:
+            _queue.task_done()
+            return
+        batch = [item]
+        deadline = time.monotonic() + AUDIT_WRITE_INTERVAL_MS / 1000
+        while len(batch) < AUDIT_WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                item = _queue.get(timeout=remaining) if remaining > 0 else _queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                _queue.task_done()
+                stopping = True
+                break
+            batch.append(item)
+
+        try:
+            _write_batch(batch)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _ensure_writer():
+    """Start the writer thread on first use (and replace it if it died)"""
+    global _writer_thread
+    with _lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name='audit-writer', daemon=True)
+            _writer_thread.start()
+
+
+def submit_audit_entry(user_id, action_type, customer_ids=None, ip_address=None,
+                       status='success', error_message=None, duration_ms=None):
+    """
+    Record an audit entry without waiting for the database.
+
+    Takes the same arguments as audit_db.log_action.
+
+    Returns:
+        int: ID of the entry when it was written inline (async writes
+             disabled, or queue full under the 'sync' policy)
+        None: If it was queued for the writer, dropped or failed
+    """
+    if not AUDIT_ASYNC_WRITES:
+        return log_action(user_id, action_type, customer_ids, ip_address,
+                          status, error_message, duration_ms)
+
+    row = build_audit_row(user_id, action_type, customer_ids, ip_address,
+                          status, error_message, duration_ms)
+    _ensure_writer()
+    try:
+        _queue.put_nowait((row, time.monotonic()))
+    except queue.Full:
+        if AUDIT_WRITE_OVERFLOW == 'drop':
+            with _lock:
+                _stats['dropped'] += 1
+            print(f"[AUDIT_WRITER] Queue full ({AUDIT_WRITE_QUEUE_SIZE}), dropped {action_type} entry for {user_id}")
+            return None
+        log_id = log_action(user_id, action_type, customer_ids, ip_address,
+                            status, error_message, duration_ms)
+        with _lock:
+            _stats['written_inline' if log_id is not None else 'failed'] += 1
+        return log_id
+
+    with _lock:
+        _stats['queued'] += 1
+    return None
+
+
+def flush_audit_writes():
+    """Block until every queued audit entry has been written"""
+    _queue.join()
+
+
+def shutdown_audit_writer(timeout=AUDIT_SHUTDOWN_TIMEOUT):
+    """
+    Write everything still queued and stop the writer thread.
+
+    Registered with atexit; safe to call more than once.
+
+    Returns:
+        bool: True if the writer finished within the timeout
+    """
+    thread = _writer_thread
+    if thread is None or not thread.is_alive():
+        return True
+    # Blocks only if the queue is full; the writer is draining it
+    _queue.put(_STOP)
+    thread.join(timeout)
+    if thread.is_alive():
+        print(f"[AUDIT_WRITER] WARNING: {_queue.qsize()} audit entries not written at shutdown")
+        return False
+    return True
+
+
+atexit.register(shutdown_audit_writer)
+
+
+def get_audit_writer_stats():
+    """
+    Get background writer statistics.
+
+    Returns:
+        dict: {'enabled': bool, 'overflow_policy': str, 'batch_size': int, 'interval_ms': int,
+               'queue_size': int, 'queue_depth': int, 'oldest_queued_ms': float, 'writer_alive': bool,
+               'queued': int, 'written': int, 'batches': int, 'failed': int, 'dropped': int,
+               'written_inline': int, 'last_batch_size': int, 'last_batch_ms': float,
+               'last_lag_ms': float, 'max_lag_ms': float}
+    """
+    with _lock:
+        stats = dict(_stats)
+        stats['writer_alive'] = _writer_thread is not None and _writer_thread.is_alive()
+    stats['enabled'] = AUDIT_ASYNC_WRITES
+    stats['overflow_policy'] = AUDIT_WRITE_OVERFLOW
+    stats['batch_size'] = AUDIT_WRITE_BATCH_SIZE
+    stats['interval_ms'] = AUDIT_WRITE_INTERVAL_MS
+    stats['queue_size'] = AUDIT_WRITE_QUEUE_SIZE
+    with _queue.mutex:
+        head = _queue.queue[0] if _queue.queue else None
+        stats['queue_depth'] = len(_queue.queue)
+    oldest = head[1] if head is not None and head is not _STOP else None
+    stats['oldest_queued_ms'] = round((time.monotonic() - oldest) * 1000, 2) if oldest else 0
+    return stats
@@ -0,0 +1,349 @@
+"""
+SQLite Connection Pool Module
+Keeps a bounded pool of optimized SQLite connections per database file.
+
+Opening a connection and running the optimizer PRAGMAs costs more than most of
+the small queries this app runs, so connections are opened (and optimized)
+once and then handed out again. Callers keep the familiar pattern:
+
+    conn = get_pool(DB_PATH).acquire()
+    try:
+        ...
+    finally:
+        conn.close()        # returns the connection to the pool
+
+or the context-manager form, which commits on success and rolls back on error:
+
+    with get_pool(DB_PATH).connection() as conn:
+        conn.execute(...)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from src.db_optimizer import optimize_db_connection
+
+# Connections kept open per database file
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+
+# Seconds to wait for a free pooled connection before opening an overflow one
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 2))
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _file_identity(path):
+    """Return (device, inode) of the database file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+        return (st.st_dev, st.st_ino)
+    except OSError:
+        return None
+
+
+class PooledConnection:
+    """
+    Proxy around a pooled sqlite3.Connection.
+
+    Behaves like the underlying connection, except close() hands it back to
+    the pool instead of closing it.
+    """
+
+    def __init__(self, pool, conn, generation, overflow=False):
+        self._pool = pool
+        self._conn = conn
+        self._generation = generation
+        self._overflow = overflow
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Same semantics as sqlite3.Connection: commit or roll back, don't close
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+        return False
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)"""
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            return
+        self._conn = None
+        self._pool._release(conn, self._generation, self._overflow)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded pool of optimized connections to one SQLite database file"""
+
+    def __init__(self, path, max_size=None, timeout=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.max_size = max_size if max_size is not None else DB_POOL_SIZE
+        self.timeout = timeout if timeout is not None else DB_POOL_TIMEOUT
+
+        self._idle = deque()
+        self._open = 0
+        self._generation = 0
+        self._identity = None
+        self._cond = threading.Condition()
+
+        self._stats = {
+            'connections_opened': 0,
+            'acquires': 0,
+            'reused': 0,
+            'waits': 0,
+            'overflow': 0,
+            'rollbacks_on_release': 0,
+            'resets': 0
+        }
+
+    def _new_connection(self):
+        """Open and optimize a new connection (PRAGMAs run once, here)"""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        return optimize_db_connection(conn, self.name)
+
+    def _check_file(self):
+        """
+        Drop idle connections if the database file was removed or replaced.
+        Must be called with the condition held.
+        """
+        identity = _file_identity(self.path)
+        if identity is None or identity != self._identity:
+            if self._identity is not None:
+                self._stats['resets'] += 1
+            while self._idle:
+                self._close_quietly(self._idle.pop())
+                self._open -= 1
+            self._generation += 1
+            self._identity = identity
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """
+        Check out a connection.
+
+        Reuses an idle connection when one is available, opens a new one while
+        the pool is below max_size, otherwise waits up to timeout seconds and
+        then opens a short-lived overflow connection rather than failing.
+
+        Returns:
+            PooledConnection: Connection proxy; close() returns it to the pool
+        """
+        deadline = None
+        with self._cond:
+            self._stats['acquires'] += 1
+            while True:
+                self._check_file()
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._stats['reused'] += 1
+                    conn.row_factory = None
+                    return PooledConnection(self, conn, self._generation)
+                if self._open < self.max_size:
+                    self._open += 1
+                    generation = self._generation
+                    break
+                if deadline is None:
+                    self._stats['waits'] += 1
+                    deadline = time.monotonic() + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['overflow'] += 1
+                    generation = None
+                    break
+                self._cond.wait(remaining)
+
+        # Open outside the lock so a slow open doesn't stall other threads
+        try:
+            conn = self._new_connection()
+        except Exception:
+            if generation is not None:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats['connections_opened'] += 1
+            if generation is not None and self._identity is None:
+                # The connect just created the file; remember it
+                self._identity = _file_identity(self.path)
+
+        return PooledConnection(self, conn, generation, overflow=generation is None)
+
+    def _release(self, conn, generation, overflow):
+        """Return a checked-out connection; roll back anything left uncommitted"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+                with self._cond:
+                    self._stats['rollbacks_on_release'] += 1
+        except Exception:
+            overflow = True
+            if generation is not None:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+            self._close_quietly(conn)
+            return
+
+        if overflow:
+            self._close_quietly(conn)
+            return
+
+        with self._cond:
+            if generation != self._generation:
+                # Database file was replaced while this connection was out
+                self._open -= 1
+                self._cond.notify()
+                self._close_quietly(conn)
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled connection.
+
+        Commits when the block succeeds, rolls back when it raises, and always
+        returns the connection to the pool.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def close(self):
+        """Close all idle connections; checked-out ones are closed when released"""
+        with self._cond:
+            while self._idle:
+                self._close_quietly(self._idle.pop())
+                self._open -= 1
+            self._generation += 1
+            self._identity = None
+            self._cond.notify_all()
+
+    def get_stats(self):
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: Pool size, idle/in-use counts and lifetime counters
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'path': os.path.abspath(self.path),
+                'max_size': self.max_size,
+                'open_connections': self._open,
+                'idle_connections': len(self._idle),
+                'in_use_connections': self._open - len(self._idle)
+            })
+            return stats
+
+
+def get_pool(path):
+    """
+    Get (or create) the connection pool for a database file.
+
+    Args:
+        path (str): Database file path
+
+    Returns:
+        ConnectionPool: Pool shared by every caller using the same file
+    """
+    key = os.path.abspath(path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(path)
+                _pools[key] = pool
+    return pool
+
+
+def pooled_connect(path):
+    """
+    Drop-in replacement for sqlite3.connect() that draws from the pool.
+
+    Args:
+        path (str): Database file path
+
+    Returns:
+        PooledConnection: Connection proxy; close() returns it to the pool
+    """
+    return get_pool(path).acquire()
+
+
+def get_pool_stats():
+    """
+    Get statistics for every connection pool.
+
+    Returns:
+        dict: {'config': {...}, 'pools': {'db_name': {...}, ...}}
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+
+    return {
+        'config': {
+            'pool_size': DB_POOL_SIZE,
+            'timeout_seconds': DB_POOL_TIMEOUT
+        },
+        'pools': {os.path.abspath(pool.path): pool.get_stats() for pool in pools}
+    }
+
+
+def close_all_pools():
+    """
+    Close idle connections in every pool.
+
+    Returns:
+        int: Number of pools closed
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
+    return len(pools)
@@ -0,0 +1,142 @@
+"""
+Job Events Module
+In-process publish/subscribe for job lifecycle events.
+
+create_job and update_job publish here; the /api/jobs/events Server-Sent
+Events endpoint subscribes one bounded queue per open browser connection.
+Events are routed by owning user, so a subscriber only ever sees its own
+user's jobs. An idle subscriber makes no database queries, but the app runs
+on the threaded Werkzeug server (no async worker), so every open stream holds
+one server thread blocked on its queue for as long as it stays open.
+"""
+
+import itertools
+import os
+import queue
+import threading
+import time
+
+# Events buffered per subscriber; the oldest are dropped when a slow client falls behind
+JOB_EVENTS_QUEUE_SIZE = int(os.environ.get('JOB_EVENTS_QUEUE_SIZE', 100))
+
+# Maximum concurrent subscribers (open event streams) across all users. Each
+# one pins a server thread, so this is the thread budget given to idle streams;
+# keep it well below what the host can run alongside normal requests
+JOB_EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('JOB_EVENTS_MAX_SUBSCRIBERS', 64))
+
+_subscribers = {}
+_lock = threading.Lock()
+_event_ids = itertools.count(1)
+_stats = {
+    'published': 0,
+    'delivered': 0,
+    'dropped': 0,
+    'rejected': 0
+}
+
+
+class Subscription:
+    """One subscriber's event queue"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=JOB_EVENTS_QUEUE_SIZE)
+        self.created_at = time.time()
+
+    def get(self, timeout):
+        """
+        Wait for the next event.
+
+        Returns:
+            dict: Event, or None if nothing arrived within timeout
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def subscribe(user_id):
+    """
+    Register a subscriber for a user's job events.
+
+    Returns:
+        Subscription: Subscription to read events from, or None if the
+                      subscriber limit has been reached
+    """
+    with _lock:
+        total = sum(len(subs) for subs in _subscribers.values())
+        if total >= JOB_EVENTS_MAX_SUBSCRIBERS:
+            _stats['rejected'] += 1
+            return None
+        subscription = Subscription(user_id)
+        _subscribers.setdefault(user_id, set()).add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription):
+    """Remove a subscriber (safe to call more than once)"""
+    with _lock:
+        subs = _subscribers.get(subscription.user_id)
+        if subs:
+            subs.discard(subscription)
+            if not subs:
+                del _subscribers[subscription.user_id]
+
+
+def has_subscribers(user_id=None):
+    """Return True if anyone (or the given user) is subscribed"""
+    with _lock:
+        if user_id is None:
+            return bool(_subscribers)
+        return user_id in _subscribers
+
+
+def publish(user_id, event_type, data):
+    """
+    Publish an event to every subscriber of a user.
+
+    Never blocks: a subscriber whose queue is full loses its oldest event.
+
+    Args:
+        user_id (str): Owning user of the job
+        event_type (str): Event name (e.g. 'created', 'success', 'failed')
+        data (dict): Event payload
+
+    Returns:
+        int: Number of subscribers the event was delivered to
+    """
+    event = {'id': next(_event_ids), 'type': event_type, 'data': data}
+    delivered = 0
+    with _lock:
+        _stats['published'] += 1
+        for subscription in _subscribers.get(user_id, ()):
+            while True:
+                try:
+                    subscription.queue.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        subscription.queue.get_nowait()
+                        _stats['dropped'] += 1
+                    except queue.Empty:
+                        pass
+            delivered += 1
+        _stats['delivered'] += delivered
+    return delivered
+
+
+def get_event_stats():
+    """
+    Get pub/sub statistics.
+
+    Returns:
+        dict: {'subscribers': int, 'users': int, 'max_subscribers': int, 'published': int,
+               'delivered': int, 'dropped': int, 'rejected': int}
+    """
+    with _lock:
+        stats = dict(_stats)
+        stats['subscribers'] = sum(len(subs) for subs in _subscribers.values())
+        stats['users'] = len(_subscribers)
+    stats['max_subscribers'] = JOB_EVENTS_MAX_SUBSCRIBERS
+    return stats
@@ -0,0 +1,140 @@
+"""
+Job Queue Module
+Runs long upstream jobs (set actions) on a bounded in-process worker pool,
+so Flask request threads hand the work off and return immediately.
+
+Callers create the job row first (status IN_PROGRESS), then submit the work
+keyed by its job_id; the submitted function is responsible for recording
+the outcome with update_job. Clients follow progress through the job status.
+
+The queue is not persisted: at startup, jobs left IN_PROGRESS by a previous
+process are marked FAILED (jobs.fail_interrupted_jobs).
+"""
+
+import os
+import queue
+import threading
+import time
+
+# Worker threads executing queued jobs
+JOB_QUEUE_WORKERS = int(os.environ.get('JOB_QUEUE_WORKERS', 4))
+
+# Maximum jobs waiting for a worker; submit_job() refuses work beyond this
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 1000))
+
+_queue = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+_lock = threading.Lock()
+_workers = []
+_queued = {}
+_running = {}
+_stats = {
+    'submitted': 0,
+    'completed': 0,
+    'failed': 0,
+    'rejected': 0
+}
+
+
+def _worker_loop():
+    """Take jobs off the queue and run them until the process exits"""
+    while True:
+        job_id, func, args, kwargs = _queue.get()
+        with _lock:
+            _queued.pop(job_id, None)
+            _running[job_id] = time.time()
+        try:
+            func(*args, **kwargs)
+            outcome = 'completed'
+        except Exception as e:
+            print(f"[JOB_QUEUE] Job {job_id} raised: {str(e)}")
+            outcome = 'failed'
+        finally:
+            with _lock:
+                _running.pop(job_id, None)
+                _stats[outcome] += 1
+            _queue.task_done()
+
+
+def _ensure_workers():
+    """Start the worker threads on first use (and replace any that died)"""
+    with _lock:
+        _workers[:] = [t for t in _workers if t.is_alive()]
+        while len(_workers) < JOB_QUEUE_WORKERS:
+            worker = threading.Thread(target=_worker_loop, name=f'job-worker-{len(_workers)}', daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+def submit_job(job_id, func, *args, **kwargs):
+    """
+    Queue a job for execution on the worker pool.
+
+    Args:
+        job_id (str): ID of the job being executed (used for tracking)
+        func (callable): Work to run; called as func(*args, **kwargs)
+
+    Returns:
+        bool: True if queued, False if the queue is full
+    """
+    _ensure_workers()
+    with _lock:
+        try:
+            _queue.put_nowait((job_id, func, args, kwargs))
+        except queue.Full:
+            _stats['rejected'] += 1
+            print(f"[JOB_QUEUE] Queue full ({JOB_QUEUE_SIZE}), rejected job {job_id}")
+            return False
+        _queued[job_id] = time.time()
+        _stats['submitted'] += 1
+    return True
+
+
+def get_job_queue_state(job_id):
+    """
+    Get where a job currently is in the queue.
+
+    Returns:
+        str: 'queued', 'running' or None if the queue does not hold it
+    """
+    with _lock:
+        if job_id in _running:
+            return 'running'
+        if job_id in _queued:
+            return 'queued'
+    return None
+
+
+def get_active_job_ids():
+    """
+    Get the IDs of every job this process still holds.
+
+    Returns:
+        set: Job IDs that are queued or running
+    """
+    with _lock:
+        return set(_queued) | set(_running)
+
+
+def wait_for_jobs():
+    """Block until every submitted job has finished"""
+    _queue.join()
+
+
+def get_job_queue_stats():
+    """
+    Get worker pool statistics.
+
+    Returns:
+        dict: {'workers': int, 'queue_size': int, 'queued': int, 'running': int,
+               'oldest_queued_seconds': float, 'submitted': int, 'completed': int,
+               'failed': int, 'rejected': int}
+    """
+    now = time.time()
+    with _lock:
+        stats = dict(_stats)
+        stats['workers'] = len([t for t in _workers if t.is_alive()])
+        stats['queued'] = len(_queued)
+        stats['running'] = len(_running)
+        stats['oldest_queued_seconds'] = round(now - min(_queued.values()), 1) if _queued else 0
+    stats['queue_size'] = JOB_QUEUE_SIZE
+    return stats
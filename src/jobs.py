@@ -5,20 +5,127 @@ Handles job creation, storage, and retrieval for scoped customer operations.
 """
 
 import sqlite3 as _sqlite3
+import base64
 import json
 import os
-from datetime import datetime
+import queue
+import threading
+from datetime import datetime, timedelta
 import uuid
 from src.db_optimizer import optimize_db_connection
+from src.db_pool import get_pool, pooled_connect
+from src.events import publish, has_subscribers
+from src.memory_cache import TTLLRUCache
 
 # Database file location
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'jobs.db')
 
+# CIDs per IN (...) query in bulk cache lookups (stays under SQLite's variable limit)
+CACHE_LOOKUP_CHUNK_SIZE = 500
+
+# Rows per multi-row INSERT into job_customers (2 variables per row stays under
+# SQLite's 999 variable limit)
+JOB_CUSTOMER_INSERT_CHUNK_SIZE = 400
+
+# How new jobs store their customer lists:
+#   'rows'    - one job_customers row per (job_id, cid)
+#   'compact' - integer job_key + cid_dictionary, in the WITHOUT ROWID
+#               job_customer_keys table
+# Reads handle both, so this can be switched at any time.
+JOB_CUSTOMER_STORAGE = os.environ.get('JOB_CUSTOMER_STORAGE', 'rows')
+
+# CIDs per IN (...) when resolving dictionary keys (stays under SQLite's variable limit)
+CID_DICTIONARY_CHUNK_SIZE = 900
+
+# Maximum rows the background cache writer commits in one transaction
+CACHE_WRITE_BATCH_SIZE = 1000
+
+# Maximum expired cache rows deleted per transaction during a purge
+CACHE_PURGE_BATCH_SIZE = 5000
+
+# In-process tier in front of appstatus_cache: decoded status objects keyed by
+# (cid, app_name). 0 disables it.
+APPSTATUS_MEMORY_CACHE_SIZE = int(os.environ.get('APPSTATUS_MEMORY_CACHE_SIZE', 10000))
+
+_memory_cache = TTLLRUCache(max_entries=APPSTATUS_MEMORY_CACHE_SIZE)
+
+# How long past its TTL an entry is kept so it can still be served stale
+# (stale-while-revalidate) before the purge removes it
+APPSTATUS_STALE_GRACE_SECONDS = int(os.environ.get('APPSTATUS_STALE_GRACE_SECONDS', 3600))
+
+# appstatus_cache rows written from batch responses hold one dict per CID;
+# single-CID responses (a list of per-app dicts) are cached under their own
+# app_name key, so neither path reads the other's payload shape
+SINGLE_CID_CACHE_SUFFIX = '#single'
+
+
+def single_cid_cache_app(app_name):
+    """Return the appstatus_cache app_name key for single-CID payloads of an app"""
+    return f'{app_name}{SINGLE_CID_CACHE_SUFFIX}'
+
+
+def cluster_base_url(url):
+    """
+    Reduce a cluster or upstream API URL to the cluster base URL.
+    
+    Jobs are stored and filtered by base URL, e.g.
+    'https://cnx-apigw-.../tms/v1/set/action' -> 'https://cnx-apigw-...'.
+    
+    Args:
+        url (str): Cluster base URL or any URL under its /tms/ API
+    
+    Returns:
+        str: Base URL without a trailing slash, or url unchanged if empty
+    """
+    if not url:
+        return url
+    return url.split('/tms/', 1)[0].rstrip('/')
+
+
+def normalize_created_at(value):
+    """
+    Convert a created_from/created_to filter to the stored created_at format.
+    
+    created_at holds local datetime.now().isoformat() values and is compared
+    as a string, so '2025-03-01 10:00' must be rewritten with the 'T'
+    separator first (' ' sorts before 'T').
+    
+    Args:
+        value (str): ISO 8601 date or datetime; one with an offset is converted to local time
+    
+    Returns:
+        str: Normalized timestamp, or None if value is empty
+    
+    Raises:
+        ValueError: If value is not an ISO 8601 date/datetime
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError(f'Invalid timestamp: {value!r} (expected ISO 8601, e.g. 2025-03-01 or 2025-03-01T10:00)')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+_cache_write_queue = queue.Queue()
+_cache_writer_thread = None
+_cache_writer_lock = threading.Lock()
+
 # Create wrapper for sqlite3.connect that auto-optimizes
 def sqlite3_connect(path, *args, **kwargs):
-    """Connect to SQLite database with automatic optimization"""
-    conn = _sqlite3.connect(path, *args, **kwargs)
-    return optimize_db_connection(conn, os.path.basename(path))
+    """
+    Connect to SQLite database with automatic optimization
+    
+    Plain calls draw an already-optimized connection from the shared pool;
+    close() hands it back. Extra connect arguments bypass the pool.
+    """
+    if args or kwargs:
+        conn = _sqlite3.connect(path, *args, **kwargs)
+        return optimize_db_connection(conn, os.path.basename(path))
+    return pooled_connect(path)
 
 def initialize_jobs_database():
     """Initialize the jobs database schema"""
@@ -40,7 +147,9 @@ def initialize_jobs_database():
             status TEXT DEFAULT 'IN_PROGRESS',
             http_status INTEGER,
             error_message TEXT,
-            updated_at TEXT
+            updated_at TEXT,
+            customer_count INTEGER,
+            job_key INTEGER
         )
     ''')
     
@@ -57,13 +166,30 @@ def initialize_jobs_database():
     
     # Create index for faster lookups
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_jobs_user_id ON jobs(user_id)
+        CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at)
     ''')
+    # CID -> jobs lookups; (job_id, cid) lookups use the UNIQUE constraint's index
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at)
+        CREATE INDEX IF NOT EXISTS idx_job_customers_cid_job ON job_customers(cid, job_id)
+    ''')
+    
+    # Compact customer storage (JOB_CUSTOMER_STORAGE = 'compact'): each CID is
+    # stored once, and a job's list is (job_key, cid_key) integer pairs
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cid_dictionary (
+            cid_key INTEGER PRIMARY KEY,
+            cid TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_customer_keys (
+            job_key INTEGER NOT NULL,
+            cid_key INTEGER NOT NULL,
+            PRIMARY KEY (job_key, cid_key)
+        ) WITHOUT ROWID
     ''')
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_job_customers_job_id ON job_customers(job_id)
+        CREATE INDEX IF NOT EXISTS idx_job_customer_keys_cid ON job_customer_keys(cid_key, job_key)
     ''')
     
     # Create appstatus_cache table for Phase 3 caching
@@ -75,6 +201,7 @@ def initialize_jobs_database():
             status_data TEXT NOT NULL,
             cached_at TEXT NOT NULL,
             ttl_seconds INTEGER DEFAULT 1800,
+            expires_at TEXT,
             UNIQUE(cid, app_name)
         )
     ''')
@@ -103,6 +230,80 @@ def initialize_jobs_database():
         if 'updated_at' not in columns:
             cursor.execute('ALTER TABLE jobs ADD COLUMN updated_at TEXT')
             print("[JOBS] Added updated_at column to jobs table")
+        
+        # Customer count is stored on the job so listings need no join
+        if 'customer_count' not in columns:
+            cursor.execute('ALTER TABLE jobs ADD COLUMN customer_count INTEGER')
+            print("[JOBS] Added customer_count column to jobs table")
+        cursor.execute('''
+            UPDATE jobs
+            SET customer_count = (SELECT COUNT(*) FROM job_customers jc WHERE jc.job_id = jobs.job_id)
+            WHERE customer_count IS NULL
+        ''')
+        if cursor.rowcount:
+            print(f"[JOBS] Backfilled customer_count for {cursor.rowcount} jobs")
+        
+        # Integer surrogate key, assigned to jobs stored in compact form
+        if 'job_key' not in columns:
+            cursor.execute('ALTER TABLE jobs ADD COLUMN job_key INTEGER')
+            print("[JOBS] Added job_key column to jobs table")
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_job_key ON jobs(job_key) WHERE job_key IS NOT NULL
+        ''')
+        
+        # Jobs used to store the full proxied URL (.../tms/v1/set/action);
+        # keep only the cluster base URL so the cluster_url filter matches
+        cursor.execute('''
+            UPDATE jobs
+            SET cluster_url = rtrim(substr(cluster_url, 1, instr(cluster_url, '/tms/') - 1), '/')
+            WHERE instr(cluster_url, '/tms/') > 0
+        ''')
+        if cursor.rowcount:
+            print(f"[JOBS] Reduced cluster_url to the base URL for {cursor.rowcount} jobs")
+        
+        # A user's job listing (and each keyset page of it) is a range scan on
+        # (user_id, created_at DESC, job_id DESC); status, action_code and
+        # cluster_url filters each get their own range, so a rare value never
+        # walks the user's whole history. The older user_id indexes are
+        # prefixes of these.
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_user_created_id
+            ON jobs(user_id, created_at DESC, job_id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_user_status_created_id
+            ON jobs(user_id, status, created_at DESC, job_id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_user_action_created_id
+            ON jobs(user_id, action_code, created_at DESC, job_id DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_user_cluster_created_id
+            ON jobs(user_id, cluster_url, created_at DESC, job_id DESC)
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS idx_jobs_user_id')
+        cursor.execute('DROP INDEX IF EXISTS idx_jobs_user_created')
+        
+        # Every job_id lookup is served by the UNIQUE(job_id, cid) index
+        cursor.execute('DROP INDEX IF EXISTS idx_job_customers_job_id')
+        
+        cursor.execute('PRAGMA table_info(appstatus_cache)')
+        cache_columns = {row[1] for row in cursor.fetchall()}
+        
+        if 'expires_at' not in cache_columns:
+            cursor.execute('ALTER TABLE appstatus_cache ADD COLUMN expires_at TEXT')
+            cursor.execute('''
+                UPDATE appstatus_cache
+                SET expires_at = strftime('%Y-%m-%dT%H:%M:%f', cached_at, '+' || ttl_seconds || ' seconds')
+                WHERE expires_at IS NULL
+            ''')
+            print(f"[JOBS] Added expires_at column to appstatus_cache table ({cursor.rowcount} rows backfilled)")
+        
+        # Purges are range deletes on expires_at
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_appstatus_cache_expires_at ON appstatus_cache(expires_at)
+        ''')
     except Exception as e:
         print(f"[JOBS] WARNING: Schema migration error (columns may already exist): {str(e)}")
     
@@ -111,17 +312,73 @@ def initialize_jobs_database():
     print("[JOBS] Database initialized successfully")
 
 
+def _insert_job_customers(cursor, job_id, cids):
+    """
+    Insert (job_id, cid) rows using multi-row VALUES statements.
+    
+    Every full chunk reuses the same statement text, so SQLite prepares at
+    most two statements however many CIDs there are.
+    """
+    chunk_size = JOB_CUSTOMER_INSERT_CHUNK_SIZE
+    for i in range(0, len(cids), chunk_size):
+        chunk = cids[i:i + chunk_size]
+        placeholders = ', '.join(['(?, ?)'] * len(chunk))
+        params = []
+        for cid in chunk:
+            params.append(job_id)
+            params.append(cid)
+        cursor.execute(f'INSERT INTO job_customers (job_id, cid) VALUES {placeholders}', params)
+
+
+def _insert_job_customers_compact(cursor, job_id, cids):
+    """
+    Store a job's CIDs in compact form (cid_dictionary + job_customer_keys).
+    
+    Must run inside the create_job write transaction: the job row is already
+    inserted, and job_key is allocated while the write lock is held.
+    """
+    cursor.execute('''
+        UPDATE jobs SET job_key = (SELECT COALESCE(MAX(job_key), 0) + 1 FROM jobs)
+        WHERE job_id = ?
+    ''', (job_id,))
+    cursor.execute('SELECT job_key FROM jobs WHERE job_id = ?', (job_id,))
+    job_key = cursor.fetchone()[0]
+    
+    chunk_size = CID_DICTIONARY_CHUNK_SIZE
+    for i in range(0, len(cids), chunk_size):
+        chunk = cids[i:i + chunk_size]
+        placeholders = ', '.join(['(?)'] * len(chunk))
+        cursor.execute(f'INSERT OR IGNORE INTO cid_dictionary (cid) VALUES {placeholders}', chunk)
+        cursor.execute(f'''
+            INSERT INTO job_customer_keys (job_key, cid_key)
+            SELECT ?, cid_key FROM cid_dictionary WHERE cid IN ({', '.join(['?'] * len(chunk))})
+        ''', [job_key] + chunk)
+
+
+def _publish_job_event(user_id, event_type, job):
+    """Publish a job lifecycle event; failures never affect the job write"""
+    try:
+        publish(user_id, event_type, job)
+    except Exception as e:
+        print(f"[JOBS] WARNING: Failed to publish {event_type} event for job {job.get('job_id')}: {str(e)}")
+
+
 def create_job(user_id, action_code, action_name, cids, cluster_url=None, 
                batch_id=None, request_payload=None, response_summary=None, status='IN_PROGRESS'):
     """
     Create a new job and store associated customer IDs
     
+    Duplicate CIDs are dropped (first occurrence kept) and the customers are
+    inserted with chunked multi-row INSERTs, keeping the write transaction short.
+    The customer list is stored as rows or in compact form depending on
+    JOB_CUSTOMER_STORAGE.
+    
     Args:
         user_id (str): ID of the user who triggered the action
         action_code (int): Code for the action (1-6)
         action_name (str): Name of the action (e.g., 'tran-begin', 'pe-enable')
         cids (list): List of customer IDs to store with this job
-        cluster_url (str): Optional cluster URL
+        cluster_url (str): Optional cluster URL; stored as its base URL (see cluster_base_url)
         batch_id (str): Optional batch ID
         request_payload (dict): Optional request payload
         response_summary (str): Optional response summary
@@ -139,6 +396,9 @@ def create_job(user_id, action_code, action_name, cids, cluster_url=None,
         # Convert request_payload to JSON string if provided
         payload_str = json.dumps(request_payload) if request_payload else None
         
+        # De-duplicate up front (job_customers is UNIQUE(job_id, cid))
+        unique_cids = list(dict.fromkeys(cids))
+        
         conn = sqlite3_connect(DB_PATH)
         cursor = conn.cursor()
         
@@ -146,30 +406,31 @@ def create_job(user_id, action_code, action_name, cids, cluster_url=None,
         cursor.execute('''
             INSERT INTO jobs 
             (job_id, user_id, batch_id, action_code, action_name, cluster_url, 
-             created_at, request_payload, response_summary, status, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (job_id, user_id, batch_id, action_code, action_name, cluster_url,
-              created_at, payload_str, response_summary, status, created_at))
+             created_at, request_payload, response_summary, status, updated_at, customer_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (job_id, user_id, batch_id, action_code, action_name, cluster_base_url(cluster_url),
+              created_at, payload_str, response_summary, status, created_at, len(unique_cids)))
         
         # Insert customer IDs for this job
-        for cid in cids:
-            cursor.execute('''
-                INSERT INTO job_customers (job_id, cid)
-                VALUES (?, ?)
-            ''', (job_id, cid))
+        if JOB_CUSTOMER_STORAGE == 'compact':
+            _insert_job_customers_compact(cursor, job_id, unique_cids)
+        else:
+            _insert_job_customers(cursor, job_id, unique_cids)
         
         conn.commit()
         conn.close()
         
         print(f"[JOBS] create_job: Successfully created job {job_id}")
-        return {
+        job = {
             'job_id': job_id,
             'user_id': user_id,
             'action_code': action_code,
             'action_name': action_name,
-            'customer_count': len(cids),
+            'customer_count': len(unique_cids),
             'created_at': created_at
         }
+        _publish_job_event(user_id, 'created', dict(job, status=status, updated_at=created_at))
+        return job
         
     except Exception as e:
         print(f"[JOBS] ERROR in create_job: {str(e)}")
@@ -219,9 +480,25 @@ def update_job(job_id, status, http_status=None, error_message=None, response_su
         query = f'UPDATE jobs SET {", ".join(update_fields)} WHERE job_id = ?'
         cursor.execute(query, update_values)
         
+        # Look up the owner only when someone is listening for events
+        owner = None
+        if cursor.rowcount and has_subscribers():
+            cursor.execute('SELECT user_id, action_name FROM jobs WHERE job_id = ?', (job_id,))
+            owner = cursor.fetchone()
+        
         conn.commit()
         conn.close()
         
+        if owner:
+            _publish_job_event(owner[0], status.lower(), {
+                'job_id': job_id,
+                'action_name': owner[1],
+                'status': status,
+                'http_status': http_status,
+                'error_message': error_message,
+                'updated_at': updated_at
+            })
+        
         print(f"[JOBS] update_job: Successfully updated job {job_id} with status={status}, http_status={http_status}")
         return True
         
@@ -232,6 +509,183 @@ def update_job(job_id, status, http_status=None, error_message=None, response_su
         return False
 
 
+def fail_interrupted_jobs(active_job_ids=()):
+    """
+    Mark IN_PROGRESS jobs that no worker will ever finish as FAILED.
+    
+    Queued set-action jobs live only in process memory (src/job_queue.py),
+    so after a restart or crash their rows would stay IN_PROGRESS and status
+    polling would never end. Called at startup.
+    
+    Args:
+        active_job_ids (iterable): Job IDs still queued or running in this process
+    
+    Returns:
+        int: Number of jobs marked FAILED
+    """
+    try:
+        active = list(active_job_ids)
+        conn = sqlite3_connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs
+            SET status = 'FAILED', error_message = ?, updated_at = ?
+            WHERE status = 'IN_PROGRESS'
+              AND job_id NOT IN (SELECT value FROM json_each(?))
+        ''', ('Job interrupted: the server restarted before it finished. '
+              'Check the customers\' current actions before retrying.',
+              datetime.now().isoformat(), json.dumps(active)))
+        failed = cursor.rowcount
+        conn.commit()
+        conn.close()
+        
+        if failed:
+            print(f"[JOBS] Marked {failed} interrupted IN_PROGRESS job(s) as FAILED")
+        return failed
+        
+    except Exception as e:
+        print(f"[JOBS] ERROR in fail_interrupted_jobs: {str(e)}")
+        return 0
+
+
+def encode_job_cursor(created_at, job_id):
+    """Encode a job's sort key as an opaque pagination cursor"""
+    raw = json.dumps([created_at, job_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_job_cursor(cursor):
+    """
+    Decode a cursor from encode_job_cursor.
+    
+    Returns:
+        tuple: (created_at, job_id)
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, job_id = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(job_id, str):
+        raise ValueError('Invalid cursor')
+    return created_at, job_id
+
+
+def _build_jobs_page(rows, limit):
+    """
+    Turn listing rows (fetched with LIMIT limit + 1) into a page.
+    
+    Rows are (job_id, user_id, action_code, action_name, cluster_url,
+    created_at, status, http_status, error_message, customer_count).
+    
+    Returns:
+        dict: {'jobs': [job dicts], 'next_cursor': str or None}
+    """
+    jobs = []
+    for row in rows[:limit]:
+        jobs.append({
+            'job_id': row[0],
+            'user_id': row[1],
+            'action_code': row[2],
+            'action_name': row[3],
+            'cluster_url': row[4],
+            'created_at': row[5],
+            'status': row[6],
+            'http_status': row[7],
+            'error_message': row[8],
+            'customer_count': row[9]
+        })
+    
+    next_cursor = None
+    if len(rows) > limit:
+        last = jobs[-1]
+        next_cursor = encode_job_cursor(last['created_at'], last['job_id'])
+    
+    return {'jobs': jobs, 'next_cursor': next_cursor}
+
+
+def get_user_jobs_page(user_id, limit=50, cursor=None, status=None, action_code=None,
+                       cluster_url=None, created_from=None, created_to=None):
+    """
+    Get one page of a user's jobs, newest first, using keyset pagination.
+    
+    Pages are ordered by (created_at, job_id) descending and continue strictly
+    after the cursor, so each page is an index range scan of about `limit` rows
+    no matter how many jobs the user has. Each of status, action_code and
+    cluster_url has its own (user_id, <filter>, created_at, job_id) index.
+    
+    Args:
+        user_id (str): ID of the user
+        limit (int): Page size
+        cursor (str): next_cursor from the previous page (None for the first page)
+        status (str): Only jobs with this status
+        action_code (int): Only jobs with this action code
+        cluster_url (str): Only jobs for this cluster; a URL under its /tms/ API
+            matches the same jobs as the base URL
+        created_from (str): Only jobs created at or after this ISO timestamp (local time
+            unless it has an offset)
+        created_to (str): Only jobs created before this ISO timestamp
+    
+    Returns:
+        dict: {'jobs': [job dicts], 'next_cursor': str or None}
+    
+    Raises:
+        ValueError: If the cursor or a timestamp is malformed
+    """
+    created_from = normalize_created_at(created_from)
+    created_to = normalize_created_at(created_to)
+    
+    conditions = ['user_id = ?']
+    params = [user_id]
+    
+    if status:
+        conditions.append('status = ?')
+        params.append(status)
+    if action_code is not None:
+        conditions.append('action_code = ?')
+        params.append(action_code)
+    if cluster_url:
+        conditions.append('cluster_url = ?')
+        params.append(cluster_base_url(cluster_url))
+    if created_from:
+        conditions.append('created_at >= ?')
+        params.append(created_from)
+    if created_to:
+        conditions.append('created_at < ?')
+        params.append(created_to)
+    if cursor:
+        conditions.append('(created_at, job_id) < (?, ?)')
+        params.extend(decode_job_cursor(cursor))
+    
+    # One extra row tells us whether there is a next page
+    params.append(limit + 1)
+    
+    try:
+        conn = sqlite3_connect(DB_PATH)
+        cur = conn.cursor()
+        
+        cur.execute(f'''
+            SELECT 
+                job_id, user_id, action_code, action_name, 
+                cluster_url, created_at, status, http_status, error_message,
+                customer_count
+            FROM jobs
+            WHERE {' AND '.join(conditions)}
+            ORDER BY created_at DESC, job_id DESC
+            LIMIT ?
+        ''', params)
+        rows = cur.fetchall()
+        conn.close()
+    except Exception as e:
+        print(f"[JOBS] ERROR in get_user_jobs_page: {str(e)}")
+        return {'jobs': [], 'next_cursor': None}
+    
+    return _build_jobs_page(rows, limit)
+
+
 def get_user_jobs(user_id, limit=50):
     """
     Get all jobs for a user, ordered by newest first
@@ -243,50 +697,79 @@ def get_user_jobs(user_id, limit=50):
     Returns:
         list: List of job dictionaries with customer counts
     """
+    return get_user_jobs_page(user_id, limit=limit)['jobs']
+
+
+def get_jobs_for_customer(cid, user_id=None, limit=50, cursor=None):
+    """
+    Get one page of the jobs that included a customer, newest first.
+    
+    Both customer storages are searched through their (cid, job) indexes, so
+    the cost depends on how many jobs touched the CID, not on table size.
+    Pages use the same (created_at, job_id) keyset cursor as get_user_jobs_page.
+    
+    Args:
+        cid (str): Customer ID
+        user_id (str): Only jobs owned by this user (None for all users)
+        limit (int): Page size
+        cursor (str): next_cursor from the previous page (None for the first page)
+    
+    Returns:
+        dict: {'jobs': [job dicts], 'next_cursor': str or None}
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    conditions = []
+    params = [cid, cid]
+    
+    if user_id is not None:
+        conditions.append('j.user_id = ?')
+        params.append(user_id)
+    if cursor:
+        conditions.append('(j.created_at, j.job_id) < (?, ?)')
+        params.extend(decode_job_cursor(cursor))
+    
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    params.append(limit + 1)
+    
     try:
         conn = sqlite3_connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Get jobs for user, ordered by newest first
-        cursor.execute('''
+        cur = conn.cursor()
+        
+        cur.execute(f'''
+            WITH matched(job_id) AS (
+                SELECT job_id FROM job_customers WHERE cid = ?
+                UNION ALL
+                SELECT mj.job_id FROM job_customer_keys k
+                JOIN jobs mj ON mj.job_key = k.job_key
+                WHERE k.cid_key = (SELECT cid_key FROM cid_dictionary WHERE cid = ?)
+            )
             SELECT 
                 j.job_id, j.user_id, j.action_code, j.action_name, 
                 j.cluster_url, j.created_at, j.status, j.http_status, j.error_message,
-                COUNT(jc.cid) as customer_count
-            FROM jobs j
-            LEFT JOIN job_customers jc ON j.job_id = jc.job_id
-            WHERE j.user_id = ?
-            GROUP BY j.job_id
-            ORDER BY j.created_at DESC
+                j.customer_count
+            FROM matched m
+            JOIN jobs j ON j.job_id = m.job_id
+            {where}
+            ORDER BY j.created_at DESC, j.job_id DESC
             LIMIT ?
-        ''', (user_id, limit))
-        
-        jobs = []
-        for row in cursor.fetchall():
-            jobs.append({
-                'job_id': row[0],
-                'user_id': row[1],
-                'action_code': row[2],
-                'action_name': row[3],
-                'cluster_url': row[4],
-                'created_at': row[5],
-                'status': row[6],
-                'http_status': row[7],
-                'error_message': row[8],
-                'customer_count': row[9]
-            })
-        
+        ''', params)
+        rows = cur.fetchall()
         conn.close()
-        return jobs
-        
     except Exception as e:
-        return []
+        print(f"[JOBS] ERROR in get_jobs_for_customer: {str(e)}")
+        return {'jobs': [], 'next_cursor': None}
+    
+    return _build_jobs_page(rows, limit)
 
 
 def get_job_customers(job_id):
     """
     Get all customer IDs for a job
     
+    Reads compact storage when the job has a job_key, job_customers rows otherwise.
+    
     Args:
         job_id (str): ID of the job
     
@@ -297,13 +780,25 @@ def get_job_customers(job_id):
         conn = sqlite3_connect(DB_PATH)
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT cid FROM job_customers
-            WHERE job_id = ?
-            ORDER BY cid
-        ''', (job_id,))
+        cursor.execute('SELECT job_key FROM jobs WHERE job_id = ?', (job_id,))
+        row = cursor.fetchone()
+        
+        if row and row[0] is not None:
+            # Sorted in Python: cheaper than a temp B-tree sort on the join
+            cursor.execute('''
+                SELECT d.cid FROM job_customer_keys k
+                JOIN cid_dictionary d ON d.cid_key = k.cid_key
+                WHERE k.job_key = ?
+            ''', (row[0],))
+            cids = sorted(r[0] for r in cursor.fetchall())
+        else:
+            cursor.execute('''
+                SELECT cid FROM job_customers
+                WHERE job_id = ?
+                ORDER BY cid
+            ''', (job_id,))
+            cids = [r[0] for r in cursor.fetchall()]
         
-        cids = [row[0] for row in cursor.fetchall()]
         conn.close()
         return cids
         
@@ -329,11 +824,10 @@ def get_job_details(job_id):
             SELECT 
                 j.job_id, j.user_id, j.batch_id, j.action_code, j.action_name,
                 j.cluster_url, j.created_at, j.request_payload, j.response_summary, 
-                j.status, COUNT(jc.cid) as customer_count
+                j.status, j.customer_count,
+                j.http_status, j.error_message, j.updated_at
             FROM jobs j
-            LEFT JOIN job_customers jc ON j.job_id = jc.job_id
             WHERE j.job_id = ?
-            GROUP BY j.job_id
         ''', (job_id,))
         
         row = cursor.fetchone()
@@ -361,7 +855,10 @@ def get_job_details(job_id):
             'request_payload': payload,
             'response_summary': row[8],
             'status': row[9],
-            'customer_count': row[10]
+            'customer_count': row[10],
+            'http_status': row[11],
+            'error_message': row[12],
+            'updated_at': row[13]
         }
         
     except Exception as e:
@@ -372,6 +869,13 @@ def get_job_details(job_id):
 # PHASE 3: APP STATUS CACHING FUNCTIONS
 # ============================================================================
 
+def _fill_memory_cache(cid, app_name, status_data, cached_at, ttl_seconds):
+    """Promote a SQLite cache hit into the in-process tier, keeping its age"""
+    if status_data and ttl_seconds:
+        _memory_cache.put((cid, app_name), status_data, ttl_seconds + APPSTATUS_STALE_GRACE_SECONDS,
+                          stored_at=cached_at.timestamp())
+
+
 def get_cached_appstatus(cid, app_name='ALL', ttl_seconds=1800):
     """
     Retrieve cached app status for a CID if it exists and hasn't expired
@@ -385,13 +889,17 @@ def get_cached_appstatus(cid, app_name='ALL', ttl_seconds=1800):
         dict: Cached status data or None if expired/missing
     """
     try:
+        status_data = _memory_cache.get((cid, app_name), max_age_seconds=ttl_seconds)
+        if status_data is not None:
+            return status_data
+        
         conn = sqlite3_connect(DB_PATH)
         cursor = conn.cursor()
         
         now = datetime.now()
         
         cursor.execute('''
-            SELECT status_data, cached_at FROM appstatus_cache
+            SELECT status_data, cached_at, ttl_seconds FROM appstatus_cache
             WHERE cid = ? AND app_name = ?
         ''', (cid, app_name))
         
@@ -401,7 +909,7 @@ def get_cached_appstatus(cid, app_name='ALL', ttl_seconds=1800):
         if not row:
             return None
         
-        status_data_str, cached_at_str = row
+        status_data_str, cached_at_str, row_ttl = row
         
         # Parse cached_at timestamp and check if expired
         try:
@@ -414,6 +922,7 @@ def get_cached_appstatus(cid, app_name='ALL', ttl_seconds=1800):
             
             # Cache is valid, return parsed data
             status_data = json.loads(status_data_str)
+            _fill_memory_cache(cid, app_name, status_data, cached_at, row_ttl)
             return status_data
             
         except Exception as e:
@@ -438,7 +947,9 @@ def cache_appstatus(cid, status_data, app_name='ALL', ttl_seconds=1800):
     """
     try:
         status_data_str = json.dumps(status_data)
-        cached_at = datetime.now().isoformat()
+        now = datetime.now()
+        cached_at = now.isoformat()
+        expires_at = (now + timedelta(seconds=ttl_seconds)).isoformat()
         
         conn = sqlite3_connect(DB_PATH)
         cursor = conn.cursor()
@@ -446,84 +957,254 @@ def cache_appstatus(cid, status_data, app_name='ALL', ttl_seconds=1800):
         # Insert or replace existing cache entry
         cursor.execute('''
             INSERT OR REPLACE INTO appstatus_cache 
-            (cid, app_name, status_data, cached_at, ttl_seconds)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (cid, app_name, status_data_str, cached_at, ttl_seconds))
+            (cid, app_name, status_data, cached_at, ttl_seconds, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (cid, app_name, status_data_str, cached_at, ttl_seconds, expires_at))
         
         conn.commit()
         conn.close()
         
+        if status_data:
+            _memory_cache.put((cid, app_name), status_data, ttl_seconds + APPSTATUS_STALE_GRACE_SECONDS,
+                              stored_at=now.timestamp())
+        
         return True
         
     except Exception as e:
         return False
 
 
-def cleanup_expired_cache(ttl_seconds=1800):
+def _write_appstatus_rows(rows):
     """
-    Remove expired cache entries
+    Write (cid, app_name, status_data_str, cached_at, ttl_seconds, expires_at)
+    rows in a single transaction.
+    
+    Returns:
+        int: Number of rows written
+    """
+    with get_pool(DB_PATH).connection() as conn:
+        conn.executemany('''
+            INSERT OR REPLACE INTO appstatus_cache 
+            (cid, app_name, status_data, cached_at, ttl_seconds, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return len(rows)
+
+
+def _cache_writer_loop():
+    """Drain queued cache rows and commit them in batches"""
+    while True:
+        rows = [_cache_write_queue.get()]
+        while len(rows) < CACHE_WRITE_BATCH_SIZE:
+            try:
+                rows.append(_cache_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        try:
+            _write_appstatus_rows(rows)
+        except Exception as e:
+            print(f"[CACHE] ERROR in background cache writer: {str(e)}")
+        finally:
+            for _ in rows:
+                _cache_write_queue.task_done()
+
+
+def _ensure_cache_writer():
+    """Start the background cache writer thread on first use"""
+    global _cache_writer_thread
+    with _cache_writer_lock:
+        if _cache_writer_thread is None or not _cache_writer_thread.is_alive():
+            _cache_writer_thread = threading.Thread(
+                target=_cache_writer_loop, name='appstatus-cache-writer', daemon=True
+            )
+            _cache_writer_thread.start()
+
+
+def cache_appstatus_bulk(entries, app_name='ALL', ttl_seconds=1800, defer=False):
+    """
+    Store app status for many CIDs in one transaction
     
     Args:
-        ttl_seconds (int): Default TTL to use for cleanup
+        entries (dict): {cid: status_data, ...}
+        app_name (str): App name (default 'ALL')
+        ttl_seconds (int): Time-to-live in seconds
+        defer (bool): If True, hand the rows to the background writer and
+                      return immediately; queued rows are batched together
     
     Returns:
-        int: Number of rows deleted
+        int: Number of rows written (or queued, when deferred)
     """
     try:
-        conn = sqlite3_connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        now = datetime.now().isoformat()
-        
-        # Delete entries where (now - cached_at) > ttl_seconds
-        cursor.execute('''
-            DELETE FROM appstatus_cache
-            WHERE (julianday(?) - julianday(cached_at)) * 86400 > ttl_seconds
-        ''', (now,))
+        now = datetime.now()
+        cached_at = now.isoformat()
+        expires_at = (now + timedelta(seconds=ttl_seconds)).isoformat()
+        rows = [
+            (cid, app_name, json.dumps(status_data), cached_at, ttl_seconds, expires_at)
+            for cid, status_data in entries.items()
+        ]
+        if not rows:
+            return 0
+        
+        # Write-through: the in-process tier sees the data immediately,
+        # even when the SQLite write is deferred
+        _memory_cache.put_many(
+            {(cid, app_name): status_data for cid, status_data in entries.items() if status_data},
+            ttl_seconds + APPSTATUS_STALE_GRACE_SECONDS, stored_at=now.timestamp()
+        )
         
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        if defer:
+            _ensure_cache_writer()
+            for row in rows:
+                _cache_write_queue.put(row)
+            return len(rows)
         
-        return deleted
+        return _write_appstatus_rows(rows)
         
     except Exception as e:
+        print(f"[CACHE] ERROR in cache_appstatus_bulk: {str(e)}")
         return 0
 
 
-def get_cached_appstatus_batch(cids, app_name='ALL', ttl_seconds=1800):
+def flush_cache_writes():
+    """Block until every deferred cache write has been committed"""
+    _cache_write_queue.join()
+
+
+def cleanup_expired_cache(ttl_seconds=1800):
+    """
+    Remove expired cache entries
+    
+    Each row stores its own expires_at, so this is an indexed range delete.
+    Rows are kept for APPSTATUS_STALE_GRACE_SECONDS past expiry so they can
+    still be served stale while a refresh is pending. Rows are removed in
+    CACHE_PURGE_BATCH_SIZE transactions so a large purge never holds the
+    write lock for long. Runs from the maintenance scheduler, not from
+    request handlers.
+    
+    Args:
+        ttl_seconds (int): Unused; kept for existing callers (each row's own
+                           TTL is already baked into expires_at)
+    
+    Returns:
+        int: Number of rows deleted
+    
+    Raises:
+        sqlite3.Error: If the purge fails; errors are left to the scheduler,
+                       which logs them and counts the failed run
+    """
+    cutoff = (datetime.now() - timedelta(seconds=APPSTATUS_STALE_GRACE_SECONDS)).isoformat()
+    deleted = 0
+    
+    conn = sqlite3_connect(DB_PATH)
+    try:
+        while True:
+            cursor = conn.execute('''
+                DELETE FROM appstatus_cache
+                WHERE id IN (
+                    SELECT id FROM appstatus_cache
+                    WHERE expires_at < ?
+                    LIMIT ?
+                )
+            ''', (cutoff, CACHE_PURGE_BATCH_SIZE))
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < CACHE_PURGE_BATCH_SIZE:
+                break
+    finally:
+        conn.close()
+    
+    return deleted
+
+
+def get_cached_appstatus_batch(cids, app_name='ALL', ttl_seconds=1800, stale_seconds=0):
     """
     Retrieve cached app status for multiple CIDs
     Returns dict with cache hits and misses
     
+    With stale_seconds > 0, entries up to stale_seconds past the TTL are
+    returned separately under 'stale' (and are not counted as misses) so the
+    caller can serve them while refreshing in the background.
+    
+    CIDs are served from the in-process tier first; the rest come from
+    SQLite using one connection and chunked IN (...) queries. The TTL check
+    runs in SQL so only unexpired rows come back and get JSON-decoded, and
+    those rows are promoted into the in-process tier.
+    
     Args:
         cids (list): List of customer IDs
         app_name (str): App name (default 'ALL')
         ttl_seconds (int): Time-to-live in seconds
+        stale_seconds (int): How far past the TTL an entry may still be
+                             returned as stale (default 0 = never)
     
     Returns:
         dict: {
             'hits': {'cid': status_data, ...},
+            'stale': {'cid': status_data, ...},
             'misses': ['cid1', 'cid2', ...],
             'hit_count': int,
+            'stale_count': int,
             'miss_count': int
         }
     """
     try:
+        unique_cids = list(dict.fromkeys(cids))
+        stale_seconds = max(0, stale_seconds)
         hits = {}
-        misses = []
+        stale = {}
         
-        for cid in cids:
-            cached = get_cached_appstatus(cid, app_name, ttl_seconds)
-            if cached:
-                hits[cid] = cached
+        memory_hits = _memory_cache.get_many(
+            [(cid, app_name) for cid in unique_cids],
+            max_age_seconds=ttl_seconds + stale_seconds, with_age=True
+        )
+        for (cid, _), (status_data, age_seconds) in memory_hits.items():
+            if age_seconds <= ttl_seconds:
+                hits[cid] = status_data
             else:
-                misses.append(cid)
+                stale[cid] = status_data
+        remaining = [cid for cid in unique_cids if cid not in hits and cid not in stale]
+        
+        if remaining:
+            now = datetime.now()
+            # Entries cached at or after fresh_cutoff are fresh; back to cutoff, stale
+            fresh_cutoff = now - timedelta(seconds=ttl_seconds)
+            cutoff = (fresh_cutoff - timedelta(seconds=stale_seconds)).isoformat()
+            
+            conn = sqlite3_connect(DB_PATH)
+            cursor = conn.cursor()
+            
+            for i in range(0, len(remaining), CACHE_LOOKUP_CHUNK_SIZE):
+                chunk = remaining[i:i + CACHE_LOOKUP_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT cid, status_data, cached_at, ttl_seconds FROM appstatus_cache
+                    WHERE app_name = ? AND cached_at >= ? AND cid IN ({placeholders})
+                ''', [app_name, cutoff] + chunk)
+                
+                for cid, status_data_str, cached_at_str, row_ttl in cursor.fetchall():
+                    try:
+                        status_data = json.loads(status_data_str)
+                        cached_at = datetime.fromisoformat(cached_at_str)
+                    except (ValueError, TypeError):
+                        continue
+                    if status_data:
+                        if cached_at >= fresh_cutoff:
+                            hits[cid] = status_data
+                        else:
+                            stale[cid] = status_data
+                        _fill_memory_cache(cid, app_name, status_data, cached_at, row_ttl)
+            
+            conn.close()
+        
+        misses = [cid for cid in cids if cid not in hits and cid not in stale]
         
         result = {
             'hits': hits,
+            'stale': stale,
             'misses': misses,
             'hit_count': len(hits),
+            'stale_count': len(stale),
             'miss_count': len(misses)
         }
         
@@ -532,8 +1213,10 @@ def get_cached_appstatus_batch(cids, app_name='ALL', ttl_seconds=1800):
     except Exception as e:
         return {
             'hits': {},
+            'stale': {},
             'misses': cids,
             'hit_count': 0,
+            'stale_count': 0,
             'miss_count': len(cids)
         }
 
@@ -550,6 +1233,17 @@ def invalidate_appstatus_cache(cid=None, app_name=None):
         int: Number of rows deleted
     """
     try:
+        # An app's single-CID payloads are cached under their own key
+        app_names = (app_name, single_cid_cache_app(app_name))
+        if cid and app_name:
+            _memory_cache.invalidate(lambda key: key[0] == cid and key[1] in app_names)
+        elif cid:
+            _memory_cache.invalidate(lambda key: key[0] == cid)
+        elif app_name:
+            _memory_cache.invalidate(lambda key: key[1] in app_names)
+        else:
+            _memory_cache.invalidate()
+        
         conn = sqlite3_connect(DB_PATH)
         cursor = conn.cursor()
         
@@ -557,8 +1251,8 @@ def invalidate_appstatus_cache(cid=None, app_name=None):
             # Invalidate specific CID+app combo
             cursor.execute('''
                 DELETE FROM appstatus_cache
-                WHERE cid = ? AND app_name = ?
-            ''', (cid, app_name))
+                WHERE cid = ? AND app_name IN (?, ?)
+            ''', (cid,) + app_names)
             deleted = cursor.rowcount
             
         elif cid:
@@ -573,8 +1267,8 @@ def invalidate_appstatus_cache(cid=None, app_name=None):
             # Invalidate all CIDs for an app
             cursor.execute('''
                 DELETE FROM appstatus_cache
-                WHERE app_name = ?
-            ''', (app_name,))
+                WHERE app_name IN (?, ?)
+            ''', app_names)
             deleted = cursor.rowcount
             
         else:
@@ -616,19 +1310,29 @@ def get_cache_stats():
         ''')
         size_bytes = cursor.fetchone()[0] or 0
         
+        # Expired rows still waiting for the next purge
+        cursor.execute('''
+            SELECT COUNT(*) FROM appstatus_cache WHERE expires_at < ?
+        ''', (datetime.now().isoformat(),))
+        expired = cursor.fetchone()[0]
+        
         conn.close()
         
         return {
             'total_entries': total,
             'unique_cids': unique_cids,
+            'expired_entries': expired,
             'size_bytes': size_bytes,
-            'size_kb': round(size_bytes / 1024, 2)
+            'size_kb': round(size_bytes / 1024, 2),
+            'memory': _memory_cache.get_stats()
         }
         
     except Exception as e:
         return {
             'total_entries': 0,
             'unique_cids': 0,
+            'expired_entries': 0,
             'size_bytes': 0,
-            'size_kb': 0
+            'size_kb': 0,
+            'memory': _memory_cache.get_stats()
         }
@@ -0,0 +1,179 @@
+"""
+Streaming JSON Module
+Incrementally reads the members of a top-level JSON object from a stream of
+chunks, so large upstream maps ({"cid": {...}, ...}) can be filtered without
+ever holding the whole body or the whole decoded dict in memory.
+"""
+
+import codecs
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_VALUE_TERMINATORS = _WHITESPACE + ',:}]'
+
+# Fast paths for the common case: an unescaped key and its colon, and the
+# separator after a member. Both fall back to the general reader on no match.
+_PLAIN_KEY = re.compile(r'[ \t\n\r]*"([^"\\]*)"[ \t\n\r]*:[ \t\n\r]*')
+_SEPARATOR = re.compile(r'[ \t\n\r]*([,}])')
+
+# Drop consumed text from the buffer once this many characters have been read
+_COMPACT_THRESHOLD = 1 << 16
+
+
+class _Reader:
+    """Character buffer over an iterator of byte/str chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def more(self):
+        """Append the next chunk to the buffer; False once the stream is exhausted"""
+        if self.eof:
+            return False
+        if self.pos > _COMPACT_THRESHOLD:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if isinstance(chunk, bytes):
+                self.bytes_read += len(chunk)
+                chunk = self._utf8.decode(chunk)
+            self.buf += chunk
+            return True
+        self.buf += self._utf8.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Return the next non-whitespace character (without consuming it), or '' at EOF"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, char):
+        """Consume one expected structural character"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'Expected {char!r} at offset {self.pos}, found {found!r}')
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode the next JSON value.
+
+        A value is only accepted once a delimiter follows it in the buffer (or
+        the stream has ended), so a number split across chunks (e.g. '1.' + '25')
+        is never decoded from its first half.
+        """
+        if self.pos >= len(self.buf) or self.buf[self.pos] in _WHITESPACE:
+            self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                # Incomplete value: read more and retry, unless there is no more
+                if not self.more():
+                    raise
+                continue
+            if self.eof or (end < len(self.buf) and self.buf[end] in _VALUE_TERMINATORS):
+                self.pos = end
+                return value
+            self.more()
+
+
+def _iter_members(reader, keys):
+    """Yield (key, value) members of the object the reader is positioned at"""
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+        return
+
+    while True:
+        match = _PLAIN_KEY.match(reader.buf, reader.pos)
+        if match and match.end() < len(reader.buf):
+            key = match.group(1)
+            reader.pos = match.end()
+        else:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError(f'Object key must be a string at offset {reader.pos}')
+            reader.expect(':')
+        value = reader.value()
+        if keys is None or key in keys:
+            yield key, value
+
+        match = _SEPARATOR.match(reader.buf, reader.pos)
+        if match:
+            separator = match.group(1)
+            reader.pos = match.end()
+        else:
+            separator = reader.peek()
+            reader.expect(',' if separator != '}' else '}')
+        if separator == '}':
+            return
+
+
+def iter_object_items(chunks, keys=None):
+    """
+    Yield (key, value) pairs of a top-level JSON object, reading chunk by chunk.
+
+    Args:
+        chunks (iterable): Byte (UTF-8) or str chunks, e.g. response.iter_content()
+        keys (set): If given, only members whose key is in this set are yielded;
+                    other values are decoded and dropped immediately
+
+    Yields:
+        tuple: (key, value)
+
+    Raises:
+        ValueError: If the stream is not a well-formed JSON object
+    """
+    return _iter_members(_Reader(chunks), keys)
+
+
+def filter_object_stream(chunks, keys):
+    """
+    Read a top-level JSON object stream, keeping only the given keys.
+
+    Args:
+        chunks (iterable): Byte (UTF-8) or str chunks
+        keys (set): Keys to keep
+
+    Returns:
+        dict: {
+            'items': {key: value} for the kept members,
+            'member_count': int (members seen in the whole object),
+            'bytes_read': int
+        }
+
+    Raises:
+        ValueError: If the stream is not a well-formed JSON object
+    """
+    reader = _Reader(chunks)
+    items = {}
+    member_count = 0
+    for key, value in _iter_members(reader, None):
+        member_count += 1
+        if key in keys:
+            items[key] = value
+
+    if reader.peek() != '':
+        raise ValueError(f'Extra data after JSON object at offset {reader.pos}')
+
+    return {
+        'items': items,
+        'member_count': member_count,
+        'bytes_read': reader.bytes_read
+    }
@@ -0,0 +1,189 @@
+"""
+Maintenance Scheduler Module
+Runs periodic housekeeping tasks (cache purges etc.) on a background thread,
+so that none of that work happens inside user-facing requests.
+
+Tasks are plain callables registered with an interval. A task may return an
+int (e.g. rows purged), which is recorded alongside the run duration.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+_tasks = {}
+_tasks_lock = threading.Lock()
+_wakeup = threading.Event()
+_stop = threading.Event()
+_scheduler_thread = None
+
+
+def register_task(name, func, interval_seconds, run_immediately=False):
+    """
+    Register (or replace) a periodic maintenance task.
+
+    Args:
+        name (str): Unique task name
+        func (callable): Task to run; may return an int count of affected rows
+        interval_seconds (float): Seconds between runs
+        run_immediately (bool): Run on the next scheduler tick instead of
+                                waiting a full interval
+    """
+    now = time.monotonic()
+    with _tasks_lock:
+        _tasks[name] = {
+            'func': func,
+            'interval_seconds': interval_seconds,
+            'next_run': now if run_immediately else now + interval_seconds,
+            'running': False,
+            'runs': 0,
+            'failures': 0,
+            'rows_total': 0,
+            'last_run_at': None,
+            'last_duration_ms': None,
+            'last_rows': None,
+            'last_error': None
+        }
+    _wakeup.set()
+
+
+def _run_task(name):
+    """Run one task and record its duration and result"""
+    with _tasks_lock:
+        task = _tasks.get(name)
+        if task is None or task['running']:
+            return None
+        task['running'] = True
+        func = task['func']
+
+    started_at = datetime.now().isoformat()
+    start = time.perf_counter()
+    result = None
+    error = None
+    try:
+        result = func()
+    except Exception as e:
+        error = str(e)
+        print(f"[MAINTENANCE] Task {name} failed: {error}")
+    duration_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    with _tasks_lock:
+        task['running'] = False
+        task['runs'] += 1
+        task['last_run_at'] = started_at
+        task['last_duration_ms'] = duration_ms
+        task['last_error'] = error
+        task['next_run'] = time.monotonic() + task['interval_seconds']
+        if error is not None:
+            task['failures'] += 1
+        if isinstance(result, int):
+            task['last_rows'] = result
+            task['rows_total'] += result
+
+    return result
+
+
+def run_task_now(name):
+    """
+    Run a registered task immediately on the calling thread.
+
+    Args:
+        name (str): Task name
+
+    Returns:
+        Task result, or None if the task is unknown or already running
+    """
+    return _run_task(name)
+
+
+def _scheduler_loop():
+    """Sleep until the next task is due, run it, repeat"""
+    while not _stop.is_set():
+        _wakeup.clear()
+        now = time.monotonic()
+        with _tasks_lock:
+            idle = {name: task for name, task in _tasks.items() if not task['running']}
+            due = [name for name, task in idle.items() if task['next_run'] <= now]
+            next_due = min((task['next_run'] for task in idle.values()), default=now + 1)
+
+        for name in due:
+            if _stop.is_set():
+                return
+            _run_task(name)
+
+        if not due:
+            _wakeup.wait(max(0.0, next_due - time.monotonic()))
+
+
+def start_scheduler():
+    """
+    Start the background scheduler thread (no-op if already running).
+
+    Returns:
+        bool: True if a new thread was started
+    """
+    global _scheduler_thread
+    with _tasks_lock:
+        if _scheduler_thread is not None and _scheduler_thread.is_alive():
+            return False
+        _stop.clear()
+        _scheduler_thread = threading.Thread(target=_scheduler_loop, name='maintenance', daemon=True)
+        _scheduler_thread.start()
+    print(f"[MAINTENANCE] Scheduler started with {len(_tasks)} task(s)")
+    return True
+
+
+def stop_scheduler(timeout=5):
+    """Stop the scheduler thread; a task already running finishes first"""
+    global _scheduler_thread
+    _stop.set()
+    _wakeup.set()
+    thread = _scheduler_thread
+    if thread is not None:
+        thread.join(timeout)
+    _scheduler_thread = None
+
+
+def get_maintenance_stats():
+    """
+    Get scheduler state and per-task run statistics.
+
+    Returns:
+        dict: {
+            'running': bool,
+            'tasks': {
+                'name': {
+                    'interval_seconds': float,
+                    'runs': int,
+                    'failures': int,
+                    'last_run_at': str or None,
+                    'last_duration_ms': float or None,
+                    'last_rows': int or None,
+                    'rows_total': int,
+                    'last_error': str or None,
+                    'next_run_in_seconds': float
+                }
+            }
+        }
+    """
+    now = time.monotonic()
+    with _tasks_lock:
+        tasks = {
+            name: {
+                'interval_seconds': task['interval_seconds'],
+                'runs': task['runs'],
+                'failures': task['failures'],
+                'last_run_at': task['last_run_at'],
+                'last_duration_ms': task['last_duration_ms'],
+                'last_rows': task['last_rows'],
+                'rows_total': task['rows_total'],
+                'last_error': task['last_error'],
+                'next_run_in_seconds': round(max(0.0, task['next_run'] - now), 1)
+            }
+            for name, task in _tasks.items()
+        }
+    thread = _scheduler_thread
+    return {
+        'running': thread is not None and thread.is_alive(),
+        'tasks': tasks
+    }
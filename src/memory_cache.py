@@ -0,0 +1,166 @@
+"""
+In-Process Cache Module
+Size-bounded LRU cache with per-entry TTL, used as a fast tier in front of
+SQLite-backed caches.
+
+Values are stored as-is (already decoded), so callers must treat returned
+objects as read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLLRUCache:
+    """
+    Thread-safe LRU cache whose entries also expire after their own TTL.
+
+    Each entry remembers when it was stored, so lookups can additionally ask
+    for a maximum age (max_age_seconds) tighter than the entry's TTL.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key, max_age_seconds=None, now=None):
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+            max_age_seconds (float): Treat entries older than this as misses
+            now (float): Current epoch time (default time.time())
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, stored_at, expires_at = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            if max_age_seconds is not None and now - stored_at > max_age_seconds:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def get_many(self, keys, max_age_seconds=None, with_age=False):
+        """
+        Look up many keys under one lock acquisition.
+
+        Args:
+            keys (iterable): Cache keys
+            max_age_seconds (float): Treat entries older than this as misses
+            with_age (bool): Return (value, age_seconds) pairs instead of values
+
+        Returns:
+            dict: {key: value} (or {key: (value, age_seconds)}) for the keys that hit
+        """
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    self._misses += 1
+                    continue
+                value, stored_at, expires_at = entry
+                if now >= expires_at:
+                    del self._entries[key]
+                    self._expirations += 1
+                    self._misses += 1
+                    continue
+                if max_age_seconds is not None and now - stored_at > max_age_seconds:
+                    self._misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                self._hits += 1
+                found[key] = (value, now - stored_at) if with_age else value
+        return found
+
+    def put(self, key, value, ttl_seconds, stored_at=None):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl_seconds (float): Lifetime of this entry
+            stored_at (float): Epoch time the value was produced (default now);
+                               entries loaded from a slower tier keep their age
+        """
+        self.put_many({key: value}, ttl_seconds, stored_at)
+
+    def put_many(self, items, ttl_seconds, stored_at=None):
+        """Store several values with the same TTL, evicting LRU entries as needed"""
+        if self.max_entries <= 0:
+            return
+        if stored_at is None:
+            stored_at = time.time()
+        expires_at = stored_at + ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (value, stored_at, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, predicate=None):
+        """
+        Drop entries.
+
+        Args:
+            predicate (callable): Drop keys for which predicate(key) is True;
+                                  None drops everything
+
+        Returns:
+            int: Number of entries dropped
+        """
+        with self._lock:
+            if predicate is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def get_stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Size, capacity, hit/miss/eviction/expiration counts and hit rate
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0
+            }
@@ -12,14 +12,22 @@ import math
 import io
 import csv
 from src.db_optimizer import optimize_db_connection
+from src.db_pool import pooled_connect
 
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'prod_customer_data.db')
 
 # Create wrapper for sqlite3.connect that auto-optimizes
 def sqlite3_connect(path, *args, **kwargs):
-    """Connect to SQLite database with automatic optimization"""
-    conn = _sqlite3.connect(path, *args, **kwargs)
-    return optimize_db_connection(conn, os.path.basename(path))
+    """
+    Connect to SQLite database with automatic optimization
+    
+    Plain calls draw an already-optimized connection from the shared pool;
+    close() hands it back. Extra connect arguments bypass the pool.
+    """
+    if args or kwargs:
+        conn = _sqlite3.connect(path, *args, **kwargs)
+        return optimize_db_connection(conn, os.path.basename(path))
+    return pooled_connect(path)
 
 
 def normalize_customer_ids(customer_ids):
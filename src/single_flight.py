@@ -0,0 +1,144 @@
+"""
+Single-Flight Module
+Coalesces concurrent identical upstream GETs into one in-flight call.
+
+While a GET for a given (URL, auth identity) is in flight, further identical
+GETs wait for it and share its response (including the parsed JSON) instead
+of going upstream themselves. Nothing is cached once the call completes.
+
+Only GETs are coalesced. Writes such as /tms/v1/set/action must always go
+through upstream_post directly.
+"""
+
+import hashlib
+import json
+import threading
+
+from src.upstream_client import upstream_get
+
+_in_flight = {}
+_lock = threading.Lock()
+_stats = {
+    'upstream_calls': 0,
+    'coalesced': 0,
+    'errors': 0
+}
+
+
+class CoalescedResponse:
+    """
+    Read-only response shared by every caller of one coalesced GET.
+
+    Exposes the parts of requests.Response the app uses. json() is parsed
+    once and the same object is returned to every caller, so callers must
+    not mutate it.
+    """
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self.url = response.url
+        self.content = response.content
+        self.encoding = response.encoding
+        self._json_lock = threading.Lock()
+        self._json = None
+        self._json_error = None
+        self._json_parsed = False
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        """Parse the body once; raises ValueError like requests does"""
+        with self._json_lock:
+            if not self._json_parsed:
+                try:
+                    self._json = json.loads(self.content)
+                except ValueError as e:
+                    self._json_error = e
+                self._json_parsed = True
+        if self._json_error is not None:
+            raise ValueError(str(self._json_error))
+        return self._json
+
+
+class _Call:
+    """One in-flight upstream GET and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+        self.waiters = 0
+
+
+def auth_identity(headers):
+    """Hash the Authorization header so tokens are never kept as map keys"""
+    auth = (headers or {}).get('Authorization', '')
+    return hashlib.sha256(auth.encode()).hexdigest()
+
+
+def single_flight_get(url, headers=None, timeout=None):
+    """
+    GET a URL, sharing the call with any identical GET already in flight.
+
+    Args:
+        url (str): Full upstream URL
+        headers (dict): Request headers (the Authorization header is part of the key)
+        timeout: Same as upstream_get
+
+    Returns:
+        CoalescedResponse: Shared response
+
+    Raises:
+        requests.exceptions.RequestException: If the shared upstream call failed
+    """
+    key = ('GET', url, auth_identity(headers))
+
+    with _lock:
+        call = _in_flight.get(key)
+        if call is not None:
+            call.waiters += 1
+            _stats['coalesced'] += 1
+            leader = False
+        else:
+            call = _Call()
+            _in_flight[key] = call
+            _stats['upstream_calls'] += 1
+            leader = True
+
+    if not leader:
+        # The leader's own connect/read timeouts bound how long this waits
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.response
+
+    try:
+        call.response = CoalescedResponse(upstream_get(url, headers=headers, timeout=timeout))
+    except Exception as e:
+        call.error = e
+        with _lock:
+            _stats['errors'] += 1
+    finally:
+        with _lock:
+            _in_flight.pop(key, None)
+        call.done.set()
+
+    if call.error is not None:
+        raise call.error
+    return call.response
+
+
+def get_single_flight_stats():
+    """
+    Get coalescing statistics.
+
+    Returns:
+        dict: {'upstream_calls': int, 'coalesced': int, 'errors': int, 'in_flight': int}
+    """
+    with _lock:
+        stats = dict(_stats)
+        stats['in_flight'] = len(_in_flight)
+    return stats
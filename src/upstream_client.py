@@ -0,0 +1,238 @@
+"""
+Upstream HTTP Client Module
+Shared, pooled HTTP client for calls to the upstream TMS API gateways.
+
+Every upstream host (e.g. cnx-apigw-evian3...) gets its own requests.Session
+with a keep-alive connection pool, so repeated calls to the same gateway reuse
+TCP+TLS connections instead of paying a new handshake per request.
+Sessions are shared by every dashboard user, so they never store cookies:
+a Set-Cookie returned to one user's call must not be replayed on another's.
+"""
+
+import http.cookiejar
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pool configuration (overridable through environment variables)
+UPSTREAM_POOL_CONNECTIONS = int(os.environ.get('UPSTREAM_POOL_CONNECTIONS', 4))
+UPSTREAM_POOL_MAXSIZE = int(os.environ.get('UPSTREAM_POOL_MAXSIZE', 32))
+UPSTREAM_POOL_BLOCK = os.environ.get('UPSTREAM_POOL_BLOCK', 'false').lower() == 'true'
+UPSTREAM_CONNECT_TIMEOUT = float(os.environ.get('UPSTREAM_CONNECT_TIMEOUT', 5))
+UPSTREAM_READ_TIMEOUT = float(os.environ.get('UPSTREAM_READ_TIMEOUT', 30))
+
+_sessions = {}
+_host_stats = {}
+_lock = threading.Lock()
+
+
+def _host_key(url):
+    """Return the (scheme, host:port) key used to select a connection pool"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _new_session():
+    """Create a requests.Session with a keep-alive connection pool and no cookie storage"""
+    sess = requests.Session()
+    sess.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=UPSTREAM_POOL_CONNECTIONS,
+        pool_maxsize=UPSTREAM_POOL_MAXSIZE,
+        pool_block=UPSTREAM_POOL_BLOCK
+    )
+    sess.mount('https://', adapter)
+    sess.mount('http://', adapter)
+    sess.headers['Connection'] = 'keep-alive'
+    return sess
+
+
+def _get_session_and_stats(url):
+    """Return the (session, stats dict) pair for the host of a URL"""
+    key = _host_key(url)
+    with _lock:
+        sess = _sessions.get(key)
+        if sess is None:
+            sess = _new_session()
+            _sessions[key] = sess
+            _host_stats[key] = {
+                'requests': 0,
+                'errors': 0,
+                'in_flight': 0,
+                'total_elapsed_ms': 0.0,
+                'created_at': time.time()
+            }
+            print(f"[UPSTREAM] Created connection pool for {key} (maxsize={UPSTREAM_POOL_MAXSIZE})")
+        return sess, _host_stats[key]
+
+
+def get_session(url):
+    """
+    Get the shared session for the host of a URL, creating it on first use.
+
+    Args:
+        url (str): Upstream URL
+
+    Returns:
+        requests.Session: Session bound to the host's connection pool
+    """
+    return _get_session_and_stats(url)[0]
+
+
+def _resolve_timeout(timeout):
+    """Split a single timeout value into (connect, read) timeouts"""
+    if timeout is None:
+        return (UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT)
+    if isinstance(timeout, (int, float)):
+        return (min(UPSTREAM_CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def upstream_request(method, url, timeout=None, **kwargs):
+    """
+    Issue an HTTP request to an upstream API through the shared pool.
+
+    Args:
+        method (str): HTTP method ('GET', 'POST', ...)
+        url (str): Upstream URL
+        timeout (float or tuple): Read timeout, or (connect, read) tuple
+        **kwargs: Passed through to requests.Session.request
+
+    Returns:
+        requests.Response: Upstream response
+
+    Raises:
+        requests.exceptions.RequestException: On network errors/timeouts
+    """
+    sess, stats = _get_session_and_stats(url)
+
+    with _lock:
+        stats['requests'] += 1
+        stats['in_flight'] += 1
+
+    start_time = time.time()
+    try:
+        return sess.request(method, url, timeout=_resolve_timeout(timeout), **kwargs)
+    except requests.exceptions.RequestException:
+        with _lock:
+            stats['errors'] += 1
+        raise
+    finally:
+        elapsed_ms = (time.time() - start_time) * 1000
+        with _lock:
+            stats['in_flight'] -= 1
+            stats['total_elapsed_ms'] += elapsed_ms
+
+
+def upstream_get(url, timeout=None, **kwargs):
+    """GET an upstream URL through the shared connection pool"""
+    return upstream_request('GET', url, timeout=timeout, **kwargs)
+
+
+def upstream_post(url, timeout=None, **kwargs):
+    """POST to an upstream URL through the shared connection pool"""
+    return upstream_request('POST', url, timeout=timeout, **kwargs)
+
+
+def _pool_counts(sess):
+    """
+    Read connection counters from the urllib3 pools behind a session.
+
+    Returns:
+        dict: opened, idle and requests counts summed across pools
+    """
+    opened = 0
+    idle = 0
+    requests_sent = 0
+    # The same adapter is mounted for http:// and https://
+    adapters = {id(adapter): adapter for adapter in sess.adapters.values()}
+    for adapter in adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        if pool_manager is None:
+            continue
+        for pool_key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(pool_key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            requests_sent += pool.num_requests
+            queue = getattr(pool.pool, 'queue', None) or []
+            idle += sum(1 for conn in list(queue) if conn is not None)
+    return {'opened': opened, 'idle': idle, 'requests': requests_sent}
+
+
+def get_pool_stats():
+    """
+    Get connection pool statistics for every upstream host.
+
+    Returns:
+        dict: {
+            'config': {...},
+            'hosts': {
+                'https://host': {
+                    'requests': int,
+                    'errors': int,
+                    'active_connections': int,
+                    'idle_connections': int,
+                    'opened_connections': int,
+                    'reused_connections': int,
+                    'avg_elapsed_ms': float
+                },
+                ...
+            }
+        }
+    """
+    hosts = {}
+    with _lock:
+        items = list(_sessions.items())
+        snapshot = {key: dict(value) for key, value in _host_stats.items()}
+
+    for key, sess in items:
+        stats = snapshot.get(key, {})
+        counts = _pool_counts(sess)
+        total_requests = stats.get('requests', 0)
+        hosts[key] = {
+            'requests': total_requests,
+            'errors': stats.get('errors', 0),
+            'active_connections': stats.get('in_flight', 0),
+            'idle_connections': counts['idle'],
+            'opened_connections': counts['opened'],
+            'reused_connections': max(0, counts['requests'] - counts['opened']),
+            'avg_elapsed_ms': round(stats.get('total_elapsed_ms', 0) / total_requests, 2) if total_requests else 0
+        }
+
+    return {
+        'config': {
+            'pool_connections': UPSTREAM_POOL_CONNECTIONS,
+            'pool_maxsize': UPSTREAM_POOL_MAXSIZE,
+            'pool_block': UPSTREAM_POOL_BLOCK,
+            'connect_timeout': UPSTREAM_CONNECT_TIMEOUT,
+            'read_timeout': UPSTREAM_READ_TIMEOUT
+        },
+        'hosts': hosts
+    }
+
+
+def close_all_sessions():
+    """
+    Close every pooled session and drop its connections.
+
+    Returns:
+        int: Number of sessions closed
+    """
+    with _lock:
+        items = list(_sessions.values())
+        _sessions.clear()
+        _host_stats.clear()
+
+    for sess in items:
+        try:
+            sess.close()
+        except Exception as e:
+            print(f"[UPSTREAM] Error closing session: {str(e)}")
+
+    return len(items)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-cluster action map snapshot (src/action_snapshot.py)
+Runs against a local stub server - no TMS gateway required
+"""
+
+import http.server
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import action_snapshot
+from src.action_snapshot import get_action_snapshot, select_actions, prune_action_snapshots, get_snapshot_stats
+
+downloads = []
+ACTION_MAP = {f'cid-{i:05d}': {'action_code': i % 5, 'action_desc': 'x'} for i in range(20000)}
+
+
+class ActionMapHandler(http.server.BaseHTTPRequestHandler):
+    """Stub /tms/v1/get/action?cid=ALL returning a 20k-CID map"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        downloads.append(self.path)
+        if 'broken' in self.path:
+            status, body = 503, b'maintenance'
+        elif self.headers.get('Authorization') != 'Bearer token':
+            status, body = 401, b'unauthorized'
+        else:
+            status, body = 200, json.dumps(ACTION_MAP).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server():
+    """Start the stub server on a free port and return its base URL"""
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), ActionMapHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def test_snapshot_is_reused_within_ttl():
+    """One download serves every lookup until the TTL passes or a refresh is forced"""
+    print("=" * 60)
+    print("TEST: snapshot reuse, TTL and forced refresh")
+    print("=" * 60)
+
+    server, base_url = start_stub_server()
+    original_ttl = action_snapshot.ACTION_SNAPSHOT_TTL
+    action_snapshot.ACTION_SNAPSHOT_TTL = 0.5
+    try:
+        downloads.clear()
+        first = get_action_snapshot(base_url + '/', 'token')
+        assert first['from_snapshot'] is False
+        assert first['snapshot']['cid_count'] == 20000
+
+        for _ in range(5):
+            again = get_action_snapshot(base_url, 'token')
+            assert again['from_snapshot'] is True
+        assert len(downloads) == 1
+
+        job_cids = ['cid-00001', 'cid-19999', 'not-in-map']
+        assert select_actions(again['snapshot'], job_cids) == {
+            'cid-00001': ACTION_MAP['cid-00001'],
+            'cid-19999': ACTION_MAP['cid-19999']
+        }
+
+        forced = get_action_snapshot(base_url, 'token', refresh=True)
+        assert forced['from_snapshot'] is False
+        assert len(downloads) == 2
+
+        time.sleep(0.6)
+        assert get_action_snapshot(base_url, 'token')['from_snapshot'] is False
+        assert len(downloads) == 3
+
+        stats = get_snapshot_stats()['clusters'][base_url]
+        print(f"  Stats: {stats}")
+        assert stats['cid_count'] == 20000
+        assert stats['size_bytes'] > 0
+
+        assert prune_action_snapshots(max_age_seconds=0) >= 1
+        assert base_url not in get_snapshot_stats()['clusters']
+        print("  ✓ PASS")
+    finally:
+        action_snapshot.ACTION_SNAPSHOT_TTL = original_ttl
+        server.shutdown()
+
+
+def test_snapshot_is_not_shared_across_tokens():
+    """Another token never gets a cached snapshot; an expired one sees the upstream 401"""
+    print("\n" + "=" * 60)
+    print("TEST: snapshots keyed by token")
+    print("=" * 60)
+
+    server, base_url = start_stub_server()
+    try:
+        downloads.clear()
+        assert get_action_snapshot(base_url, 'token')['snapshot']['cid_count'] == 20000
+        assert get_action_snapshot(base_url, 'token')['from_snapshot'] is True
+
+        expired = get_action_snapshot(base_url, 'expired-token')
+        assert expired['snapshot'] is None and expired['from_snapshot'] is False
+        assert expired['http_status'] == 401
+        assert len(downloads) == 2
+        assert get_snapshot_stats()['clusters'][base_url]['snapshots'] == 1
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+def test_upstream_errors_are_not_cached():
+    """A failed download reports the upstream status and leaves no snapshot behind"""
+    print("\n" + "=" * 60)
+    print("TEST: upstream errors")
+    print("=" * 60)
+
+    server, base_url = start_stub_server()
+    try:
+        downloads.clear()
+        cluster_url = base_url + '/broken'
+        for _ in range(2):
+            result = get_action_snapshot(cluster_url, 'token')
+            assert result['snapshot'] is None
+            assert result['http_status'] == 503
+        assert len(downloads) == 2
+        assert cluster_url not in get_snapshot_stats()['clusters']
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    test_snapshot_is_reused_within_ttl()
+    test_snapshot_is_not_shared_across_tokens()
+    test_upstream_errors_are_not_cached()
+    print("\nAll action snapshot tests passed")
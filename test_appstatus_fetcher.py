@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script for app status fan-out and adaptive batch chunking (src/appstatus_fetcher.py)
+Runs against a local stub gateway - no TMS gateway required
+"""
+
+import http.server
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import appstatus_fetcher
+from src.appstatus_fetcher import (split_into_chunks, fetch_appstatus_batch_chunked,
+                                   fetch_appstatus_concurrent, get_chunk_limit)
+
+# Gateway behaviour: reject batch URLs with more than this many CIDs
+MAX_ACCEPTED_CIDS = 3
+SLOW_CID = 'slow-cid'
+BAD_CID = 'bad-cid'
+CALLS = []
+
+
+class GatewayHandler(http.server.BaseHTTPRequestHandler):
+    """Stub /tms/v1/get/appstatus that rejects oversized batches with 414"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        cids = parse_qs(urlsplit(self.path).query)['cid'][0].split(',')
+        CALLS.append(len(cids))
+        if BAD_CID in cids:
+            status, payload = 400, {'error': f'Invalid cid {BAD_CID}'}
+        elif len(cids) > MAX_ACCEPTED_CIDS * 2:
+            status, payload = 414, {'error': 'URI too long'}
+        elif len(cids) > MAX_ACCEPTED_CIDS:
+            status, payload = 400, {'error': 'Request Header Or Cookie Too Large'}
+        else:
+            if SLOW_CID in cids:
+                time.sleep(2)
+            status, payload = 200, {cid: {'status': 'Ready'} for cid in cids}
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_gateway():
+    """Start the stub gateway on a free port and return its base URL"""
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), GatewayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def test_split_into_chunks():
+    """Chunks respect both the CID count and the URL length bound"""
+    print("=" * 60)
+    print("TEST: split_into_chunks()")
+    print("=" * 60)
+
+    cids = [f'{i:032x}' for i in range(10)]
+    by_count = split_into_chunks(cids, 'https://gw/x?cid=', chunk_size=4, max_url_length=10000)
+    assert [len(chunk) for chunk in by_count] == [4, 4, 2]
+
+    base_url = 'https://gw/x?cid='
+    by_length = split_into_chunks(cids, base_url, chunk_size=100, max_url_length=len(base_url) + 66)
+    assert [len(chunk) for chunk in by_length] == [2, 2, 2, 2, 2]
+    assert sum(by_length, []) == cids
+    print("  ✓ PASS")
+
+
+def test_chunk_limit_is_learned():
+    """A 414 shrinks the chunk size; later calls reuse the learned limit"""
+    print("\n" + "=" * 60)
+    print("TEST: adaptive chunk limit")
+    print("=" * 60)
+
+    server, base_url = start_gateway()
+    try:
+        cids = [f'cid-{i:03d}' for i in range(20)]
+        first = fetch_appstatus_batch_chunked(cids, base_url, 'token')
+        assert set(first['results']) == set(cids)
+        assert first['failed'] == []
+        assert MAX_ACCEPTED_CIDS <= get_chunk_limit(base_url) < len(cids)
+
+        # One more rejection pins the limit at the largest accepted size
+        second = fetch_appstatus_batch_chunked(cids, base_url, 'token')
+        assert set(second['results']) == set(cids)
+        assert get_chunk_limit(base_url) == MAX_ACCEPTED_CIDS
+
+        third = fetch_appstatus_batch_chunked(cids, base_url, 'token')
+        assert set(third['results']) == set(cids)
+        assert third['chunk_count'] == 7
+        print(f"  Learned limits: {appstatus_fetcher.get_chunk_stats()[base_url]}")
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+def test_rejections_split_safely():
+    """A rejection at a size once accepted still halves; a bad-CID 400 is not split"""
+    print("\n" + "=" * 60)
+    print("TEST: chunk rejection handling")
+    print("=" * 60)
+
+    server, base_url = start_gateway()
+    try:
+        # Learned state claiming 100-CID chunks work, which the gateway now rejects
+        appstatus_fetcher._chunk_limits[base_url] = {
+            'limit': 100, 'largest_accepted': 100, 'smallest_rejected': None, 'accepted': 1, 'rejected': 0
+        }
+        cids = [f'cid-{i:03d}' for i in range(100)]
+        del CALLS[:]
+        outcome = fetch_appstatus_batch_chunked(cids, base_url, 'token')
+        assert set(outcome['results']) == set(cids) and outcome['failed'] == []
+        state = appstatus_fetcher.get_chunk_stats()[base_url]
+        assert state['largest_accepted'] <= MAX_ACCEPTED_CIDS
+        assert state['limit'] < 100
+        print(f"  100 CIDs in {len(CALLS)} upstream calls, state {state}")
+        assert len(CALLS) < 100
+
+        # A 400 about the request itself fails the chunk once, without splitting
+        del CALLS[:]
+        outcome = fetch_appstatus_batch_chunked(['cid-1', BAD_CID], base_url, 'token')
+        assert CALLS == [2]
+        assert sorted(outcome['failed']) == sorted(['cid-1', BAD_CID])
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+def test_deadline_returns_partial_results():
+    """CIDs still running at the deadline are reported as pending"""
+    print("\n" + "=" * 60)
+    print("TEST: fetch_appstatus_concurrent() deadline")
+    print("=" * 60)
+
+    server, base_url = start_gateway()
+    try:
+        streamed = []
+        start = time.time()
+        outcome = fetch_appstatus_concurrent(
+            ['fast-1', 'fast-2', SLOW_CID], base_url, 'token',
+            deadline_seconds=0.5,
+            on_result=lambda cid, result: streamed.append(cid)
+        )
+        assert time.time() - start < 1.5
+        assert set(outcome['results']) == {'fast-1', 'fast-2'}
+        assert outcome['pending'] == [SLOW_CID]
+
+        # The slow call still completes and is streamed to the callback
+        time.sleep(2)
+        assert SLOW_CID in streamed
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    test_split_into_chunks()
+    test_chunk_limit_is_learned()
+    test_rejections_split_safely()
+    test_deadline_returns_partial_results()
+    print("\nAll app status fetcher tests passed")
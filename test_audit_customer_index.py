@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the audit_log_customers index in src/audit_db.py
+(insert trigger, backfill migration, exact-match customer lookups)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db
+
+
+def index_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT customer_id, log_id FROM audit_log_customers ORDER BY log_id, customer_id').fetchall()
+    conn.close()
+    return rows
+
+
+def test_trigger_and_exact_lookup():
+    """Every customer_ids format is indexed on insert, and lookups match whole IDs only"""
+    print("=" * 60)
+    print("TEST: audit_log_customers trigger and lookups")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        try:
+            audit_db.initialize_database()
+            first = audit_db.log_action('alice', 'PE-Enable', ['cid-1', 'cid-12'])
+            second = audit_db.log_action('bob', 'T-Enable', 'cid-1')
+            third = audit_db.log_action('alice', 'Trans-Begin', '["cid-123"]')
+            audit_db.log_action('alice', 'Login')
+
+            assert index_rows(audit_db.AUDIT_DB_PATH) == [
+                ('cid-1', first), ('cid-12', first), ('cid-1', second), ('cid-123', third)
+            ]
+
+            def ids(**kwargs):
+                return sorted(record['id'] for record in audit_db.get_audit_trail(**kwargs))
+
+            # LIKE '%cid-1%' used to match all three
+            assert ids(customer_id='cid-1') == [first, second]
+            assert ids(customer_id='cid-12') == [first]
+            assert ids(customer_id='cid-1', user_id='bob') == [second]
+            assert ids(customer_id='cid-1', action_type='PE-Enable') == [first]
+            assert ids(customer_id='cid-') == []
+
+            records = audit_db.get_customer_actions('cid-12')
+            assert records[0]['customer_ids'] == ['cid-1', 'cid-12']
+
+            conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            conn.close()
+            assert 'idx_customer_search' not in indexes
+
+            assert audit_db.clear_audit_logs()
+            assert index_rows(audit_db.AUDIT_DB_PATH) == []
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+
+
+def test_backfill():
+    """Entries written before the index existed are backfilled once on startup"""
+    print("\n" + "=" * 60)
+    print("TEST: audit_log_customers backfill")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        try:
+            # Old schema: no junction table, JSON text index
+            conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+            conn.executescript('''
+                CREATE TABLE audit_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL,
+                    action_type TEXT NOT NULL, customer_ids TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, ip_address TEXT,
+                    status TEXT, error_message TEXT, duration_ms INTEGER
+                );
+                CREATE INDEX idx_customer_search ON audit_log(customer_ids);
+                INSERT INTO audit_log (user_id, action_type, customer_ids) VALUES
+                    ('alice', 'PE-Enable', '["a", "b"]'),
+                    ('alice', 'PE-Enable', 'c'),
+                    ('alice', 'Login', NULL),
+                    ('alice', 'PE-Enable', '[]');
+            ''')
+            conn.commit()
+            conn.close()
+
+            audit_db.initialize_database()
+            assert index_rows(audit_db.AUDIT_DB_PATH) == [('a', 1), ('b', 1), ('c', 2)]
+
+            # Running the migration again changes nothing
+            audit_db.initialize_database()
+            assert index_rows(audit_db.AUDIT_DB_PATH) == [('a', 1), ('b', 1), ('c', 2)]
+            assert [r['id'] for r in audit_db.get_customer_actions('b')] == [1]
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+
+
+if __name__ == '__main__':
+    test_trigger_and_exact_lookup()
+    test_backfill()
+    print("\nAll audit customer index tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming audit trail exports (iter_audit_trail in src/audit_db.py)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db, audit_partitions
+from src.db_pool import get_pool
+
+
+def insert_direct(db_path, rows):
+    """Insert (user_id, action_type, customer_ids, timestamp, status) rows bypassing log_action"""
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT INTO audit_log (user_id, action_type, customer_ids, timestamp, status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def test_batches_match_trail():
+    """Streamed batches hold the same rows as get_audit_trail, across partitions"""
+    print("=" * 60)
+    print("TEST: streamed audit export")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        try:
+            audit_db.initialize_database()
+            rows = []
+            for i in range(2500):
+                month = 4 + i % 3
+                rows.append((f'user-{i % 5}', 'PE-Enable' if i % 2 else 'T-Enable', f'["cid-{i % 7}"]',
+                             f'2025-{month:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00',
+                             'success' if i % 4 else 'failure'))
+            insert_direct(audit_db.AUDIT_DB_PATH, rows)
+            audit_partitions.roll_over_partitions(datetime(2025, 6, 10, tzinfo=timezone.utc))
+
+            batches = list(audit_db.iter_audit_trail(fetch_size=1000))
+            assert [len(batch) for batch in batches] == [1000, 1000, 500]
+            streamed = [row for batch in batches for row in batch]
+            assert len(streamed[0]) == len(audit_db.AUDIT_TRAIL_COLUMNS)
+            timestamps = [row[audit_db.AUDIT_TRAIL_COLUMNS.index('timestamp')] for row in streamed]
+            assert timestamps == sorted(timestamps, reverse=True)
+
+            filters = {'user_id': 'user-2', 'customer_id': 'cid-3', 'start': '2025-05-01'}
+            expected = audit_db.get_audit_trail(limit=10000, **filters)
+            streamed = [row for batch in audit_db.iter_audit_trail(fetch_size=7, **filters) for row in batch]
+            assert [row[0] for row in streamed] == [record['id'] for record in expected]
+            # customer_ids is exported as stored, not re-parsed
+            assert streamed[0][audit_db.AUDIT_TRAIL_COLUMNS.index('customer_ids')] == '["cid-3"]'
+
+            limited = [row for batch in audit_db.iter_audit_trail(limit=15, fetch_size=10) for row in batch]
+            assert len(limited) == 15
+            assert list(audit_db.iter_audit_trail(user_id='nobody')) == []
+            print(f"  {len(expected)} filtered rows streamed in batches of 7")
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+
+
+def test_snapshot_and_release():
+    """An export reads one snapshot, and closing it early returns its connection"""
+    print("\n" + "=" * 60)
+    print("TEST: export snapshot and connection release")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        try:
+            audit_db.initialize_database()
+            insert_direct(audit_db.AUDIT_DB_PATH,
+                          [('alice', 'Login', None, f'2025-06-01 00:00:{i:02d}', 'success') for i in range(30)])
+            pool = get_pool(audit_db.AUDIT_DB_PATH)
+            in_use_before = pool.get_stats()['in_use_connections']
+
+            batches = audit_db.iter_audit_trail(fetch_size=10)
+            assert len(next(batches)) == 10
+            # Rows written while the export runs are not part of it
+            insert_direct(audit_db.AUDIT_DB_PATH, [('bob', 'Login', None, '2025-06-02 00:00:00', 'success')])
+            assert sum(len(batch) for batch in batches) == 20
+
+            batches = audit_db.iter_audit_trail(fetch_size=10)
+            next(batches)
+            assert pool.get_stats()['in_use_connections'] == in_use_before + 1
+            batches.close()
+            assert pool.get_stats()['in_use_connections'] == in_use_before
+            assert len(audit_db.get_audit_trail(limit=100)) == 31
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+
+
+if __name__ == '__main__':
+    test_batches_match_trail()
+    test_snapshot_and_release()
+    print("\nAll audit export tests passed")
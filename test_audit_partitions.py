@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test script for monthly audit log partitions (src/audit_partitions.py and the
+partition-aware reads in src/audit_db.py)
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db, audit_partitions
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def insert_direct(db_path, rows):
+    """Insert (user_id, action_type, customer_ids, timestamp, status) rows bypassing log_action"""
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT INTO audit_log (user_id, action_type, customer_ids, timestamp, status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def table_names(db_path):
+    conn = sqlite3.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    return names
+
+
+def query_plan(db_path, sql, params):
+    conn = sqlite3.connect(db_path)
+    plan = ' | '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params))
+    conn.close()
+    return plan
+
+
+SAMPLE_ROWS = [
+    ('alice', 'PE-Enable', '["cid-1"]', '2025-03-10 08:00:00', 'success'),
+    ('bob', 'T-Enable', '["cid-2"]', '2025-03-20 09:00:00', 'failure'),
+    ('alice', 'PE-Enable', '["cid-1", "cid-2"]', '2025-04-02T10:00:00', 'success'),
+    ('carol', 'Login', None, '2025-05-31 23:59:59', 'success'),
+    ('alice', 'PE-Direct', '["cid-1"]', '2025-06-01 00:00:00', 'success'),
+    ('bob', 'PE-Enable', '["cid-3"]', '2025-06-14 17:30:00', 'success'),
+]
+
+
+def test_rollover_and_routing():
+    """Completed months move into their own tables; reads only touch the partitions they need"""
+    print("=" * 60)
+    print("TEST: audit partition rollover and routing")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        try:
+            audit_db.initialize_database()
+            insert_direct(audit_db.AUDIT_DB_PATH, SAMPLE_ROWS)
+            before = {r['id']: r for r in audit_db.get_audit_trail(limit=100)}
+            stats_before = audit_db.get_audit_stats()
+
+            assert audit_partitions.roll_over_partitions(NOW) == 4
+            assert {'audit_log_202503', 'audit_log_202504', 'audit_log_202505'} <= table_names(audit_db.AUDIT_DB_PATH)
+            info = audit_partitions.get_partition_info()
+            assert info['current_rows'] == 2
+            assert [(p['month'], p['row_count']) for p in info['partitions']] == [
+                ('2025-05', 1), ('2025-04', 1), ('2025-03', 2)
+            ]
+
+            # Nothing left to move; rows keep their ids, so every read is unchanged
+            assert audit_partitions.roll_over_partitions(NOW) == 0
+            after = {r['id']: r for r in audit_db.get_audit_trail(limit=100)}
+            assert after == before
+            assert audit_db.get_audit_stats() == stats_before
+            assert [r['timestamp'] for r in audit_db.get_audit_trail(limit=3)] == [
+                '2025-06-14 17:30:00', '2025-06-01 00:00:00', '2025-05-31 23:59:59'
+            ]
+            assert [r['customer_ids'] for r in audit_db.get_customer_actions('cid-2')] == [
+                ['cid-1', 'cid-2'], ['cid-2']
+            ]
+
+            # A window inside the current month reads audit_log alone
+            conn = audit_db.get_db_connection()
+            sql, params = audit_db._build_trail_query(conn.cursor(), start='2025-06-01')
+            assert 'audit_log_2025' not in sql
+            sql, params = audit_db._build_trail_query(conn.cursor(), start='2025-04-01', end='2025-05-01')
+            conn.close()
+            assert 'audit_log_202504' in sql and 'audit_log_202503' not in sql and 'audit_log_202505' not in sql
+            plan = query_plan(audit_db.AUDIT_DB_PATH, sql, params)
+            assert 'MERGE' in plan, plan
+            print(f"  April window plan: {plan}")
+
+            # ISO 'T' bounds on the same day compare correctly against stored timestamps
+            assert audit_db.normalize_timestamp('2025-03-20T09:00') == '2025-03-20 09:00:00'
+            assert audit_db.normalize_timestamp('2025-03-20T11:00+02:00') == '2025-03-20 09:00:00'
+            assert [r['user_id'] for r in audit_db.get_audit_trail(start='2025-03-20T08:30')][-1:] == ['bob']
+            assert [r['user_id'] for r in audit_db.get_audit_trail(start='2025-03-10T07:00',
+                                                                  end='2025-03-10T09:00')] == ['alice']
+            sql, _ = audit_db._build_trail_query(audit_db.get_db_connection().cursor(), start='2025-05-31T23:00')
+            assert 'audit_log_202505' in sql and 'audit_log_202504' not in sql
+            for bad in ('yesterday', '2025-13-01', '03/01/2025'):
+                try:
+                    audit_db.get_audit_trail(start=bad)
+                    assert False, f'expected ValueError for {bad}'
+                except ValueError:
+                    pass
+
+            march = audit_db.get_audit_trail(start='2025-03-01', end='2025-04-01')
+            assert [r['user_id'] for r in march] == ['bob', 'alice']
+            assert audit_db.get_audit_trail(user_id='alice', start='2025-04-01', end='2025-06-01')[0]['action_type'] == 'PE-Enable'
+
+            # A late row for a completed month is moved on the next rollover
+            audit_db.log_action('dave', 'Login')
+            insert_direct(audit_db.AUDIT_DB_PATH, [('dave', 'Login', None, '2025-05-20 12:00:00', 'success')])
+            assert audit_partitions.roll_over_partitions(NOW) == 1
+            assert audit_partitions.get_partition_info()['partitions'][0]['row_count'] == 2
+            assert len(audit_db.get_audit_trail(start='2025-05-01', end='2025-06-01')) == 2
+
+            assert audit_db.clear_audit_logs()
+            assert not any(name.startswith('audit_log_20') for name in table_names(audit_db.AUDIT_DB_PATH))
+            assert audit_db.get_audit_trail() == []
+            assert audit_partitions.get_partition_info()['partitions'] == []
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+
+
+def test_retention_archives_and_drops():
+    """Expired partitions are archived, then dropped with their index entries and rollup counts"""
+    print("\n" + "=" * 60)
+    print("TEST: audit partition retention")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    original_retention = audit_partitions.AUDIT_RETENTION_MONTHS
+    original_archive_dir = audit_partitions.AUDIT_ARCHIVE_DIR
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        audit_partitions.AUDIT_ARCHIVE_DIR = os.path.join(tmp_dir, 'archive')
+        audit_partitions.AUDIT_RETENTION_MONTHS = 2
+        try:
+            audit_db.initialize_database()
+            insert_direct(audit_db.AUDIT_DB_PATH, SAMPLE_ROWS)
+            audit_partitions.roll_over_partitions(NOW)
+
+            # Keeps April and May; March is past retention
+            assert audit_partitions.apply_retention(NOW) == 2
+            assert 'audit_log_202503' not in table_names(audit_db.AUDIT_DB_PATH)
+            assert audit_partitions.apply_retention(NOW) == 0
+
+            info = audit_partitions.get_partition_info()
+            assert [p['month'] for p in info['partitions']] == ['2025-05', '2025-04']
+            assert len(info['archives']) == 1 and info['archives'][0]['row_count'] == 2
+            with gzip.open(info['archives'][0]['archive_path'], 'rt', encoding='utf-8') as archive:
+                archived = [json.loads(line) for line in archive]
+            assert [(r['user_id'], r['timestamp']) for r in archived] == [
+                ('alice', '2025-03-10 08:00:00'), ('bob', '2025-03-20 09:00:00')
+            ]
+
+            # Derived data now describes only the retained rows
+            conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+            indexed = conn.execute('SELECT COUNT(*) FROM audit_log_customers').fetchone()[0]
+            conn.close()
+            assert indexed == 4
+            assert [r['timestamp'] for r in audit_db.get_customer_actions('cid-2')] == ['2025-04-02T10:00:00']
+            stats = audit_db.get_audit_stats()
+            assert stats['total_records'] == 4 and stats['successful_actions'] == 4
+            assert 'T-Enable' not in audit_db.get_action_types()
+            assert audit_db.get_audit_rollups('day', end='2025-04-01') == []
+
+            # Rebuilding from the remaining rows gives the same numbers
+            assert audit_db.rebuild_audit_rollups()
+            assert audit_db.get_audit_stats() == stats
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+            audit_partitions.AUDIT_RETENTION_MONTHS = original_retention
+            audit_partitions.AUDIT_ARCHIVE_DIR = original_archive_dir
+
+
+if __name__ == '__main__':
+    test_rollover_and_routing()
+    test_retention_archives_and_drops()
+    print("\nAll audit partition tests passed")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script for the incrementally maintained audit rollups in src/audit_db.py
+(stats counters, hourly/daily buckets, backfill, reset)
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db
+
+
+def full_scan_stats(db_path):
+    """The statistics as computed before rollups existed"""
+    conn = sqlite3.connect(db_path)
+    total = conn.execute('SELECT COUNT(*) FROM audit_log').fetchone()[0]
+    users = conn.execute('SELECT COUNT(DISTINCT user_id) FROM audit_log').fetchone()[0]
+    actions = conn.execute('SELECT COUNT(DISTINCT action_type) FROM audit_log').fetchone()[0]
+    successes = conn.execute("SELECT COUNT(*) FROM audit_log WHERE status = 'success'").fetchone()[0]
+    conn.close()
+    return {
+        'total_records': total,
+        'unique_users': users,
+        'unique_actions': actions,
+        'successful_actions': successes,
+        'failed_actions': total - successes,
+        'success_rate_percent': round(successes / total * 100, 2) if total else 0
+    }
+
+
+def insert_direct(db_path, rows):
+    """Insert (user_id, action_type, timestamp, status, duration_ms) rows bypassing log_action"""
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT INTO audit_log (user_id, action_type, timestamp, status, duration_ms)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def test_stats_match_full_scan():
+    """Rollup-backed stats equal the old full-table aggregates, however rows are written"""
+    print("=" * 60)
+    print("TEST: audit stats from rollups")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        try:
+            audit_db.initialize_database()
+            assert audit_db.get_audit_stats()['total_records'] == 0
+
+            rng = random.Random(3)
+            for _ in range(200):
+                audit_db.log_action(rng.choice(['alice', 'bob', 'carol']), rng.choice(['PE-Enable', 'T-Enable']),
+                                    status=rng.choice(['success', 'failure']), duration_ms=rng.randint(1, 500))
+            # A NULL status counts as a failure and must not break the insert
+            assert audit_db.log_action('carol', 'PE-Enable', status=None) is not None
+            insert_direct(audit_db.AUDIT_DB_PATH, [
+                ('dave', 'Login', '2025-03-01T10:15:00', 'success', None),
+                ('dave', 'Login', '2025-03-01 10:45:00', 'failure', 40),
+                ('dave', 'PE-Direct', '2025-03-01 11:05:00', 'success', 60),
+            ])
+
+            stats = audit_db.get_audit_stats()
+            assert stats == full_scan_stats(audit_db.AUDIT_DB_PATH), stats
+            print(f"  {stats}")
+
+            # Both timestamp formats land in the same hour bucket
+            hours = audit_db.get_audit_rollups('hour', start='2025-03-01', end='2025-03-02', group_by='action')
+            assert hours == [
+                {'bucket': '2025-03-01 10:00', 'action_type': 'Login', 'entries': 2, 'successes': 1,
+                 'failures': 1, 'avg_duration_ms': 40.0},
+                {'bucket': '2025-03-01 11:00', 'action_type': 'PE-Direct', 'entries': 1, 'successes': 1,
+                 'failures': 0, 'avg_duration_ms': 60.0},
+            ], hours
+            # ISO bounds are rewritten into bucket labels: a 'T' bound keeps its own bucket,
+            # and an end inside a bucket still includes it
+            assert [h['bucket'] for h in audit_db.get_audit_rollups('hour', start='2025-03-01T10:00',
+                                                                  end='2025-03-01T11:00', user_id='dave')] == [
+                '2025-03-01 10:00'
+            ]
+            assert [h['bucket'] for h in audit_db.get_audit_rollups('hour', start='2025-03-01 10:30',
+                                                                  end='2025-03-01T11:05', user_id='dave')] == [
+                '2025-03-01 10:00', '2025-03-01 11:00'
+            ]
+            assert [h['bucket'] for h in audit_db.get_audit_rollups('hour', start='2025-03-01T12:00+01:00',
+                                                                  user_id='dave')] == ['2025-03-01 11:00']
+            assert audit_db.get_audit_rollups('day', start='2025-03-01T23:00', end='2025-03-02',
+                                              user_id='dave')[0]['bucket'] == '2025-03-01'
+            days = audit_db.get_audit_rollups('day', user_id='dave')
+            assert [(d['bucket'], d['entries']) for d in days] == [('2025-03-01', 3)]
+
+            by_user = audit_db.get_audit_rollups('day', start='2025-03-02', group_by='user')
+            assert sorted(d['user_id'] for d in by_user) == ['alice', 'bob', 'carol']
+            assert sum(d['entries'] for d in by_user) == 201
+
+            for bad in ({'period': 'week'}, {'group_by': 'customer'}, {'start': 'yesterday'},
+                        {'end': '2025-13-01'}):
+                try:
+                    audit_db.get_audit_rollups(**bad)
+                    assert False, f'expected ValueError for {bad}'
+                except ValueError:
+                    pass
+
+            assert audit_db.clear_audit_logs()
+            assert audit_db.get_audit_stats() == full_scan_stats(audit_db.AUDIT_DB_PATH)
+            assert audit_db.get_audit_rollups('day') == []
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+
+
+def test_backfill_and_rebuild():
+    """Existing rows are rolled up on first startup; rebuild recovers after raw deletes"""
+    print("\n" + "=" * 60)
+    print("TEST: audit rollup backfill and rebuild")
+    print("=" * 60)
+
+    original_path = audit_db.AUDIT_DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        try:
+            # Old schema: audit_log only
+            conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+            conn.execute('''
+                CREATE TABLE audit_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL,
+                    action_type TEXT NOT NULL, customer_ids TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, ip_address TEXT,
+                    status TEXT, error_message TEXT, duration_ms INTEGER
+                )
+            ''')
+            conn.commit()
+            conn.close()
+            insert_direct(audit_db.AUDIT_DB_PATH, [
+                ('erin', 'PE-Enable', '2025-01-01 09:00:00', 'success', 100),
+                ('erin', 'PE-Enable', '2025-01-01 09:30:00', 'failure', 300),
+                ('frank', 'T-Enable', '2025-01-02 12:00:00', 'success', None),
+            ])
+
+            audit_db.initialize_database()
+            assert audit_db.get_audit_stats() == full_scan_stats(audit_db.AUDIT_DB_PATH)
+            assert audit_db.get_audit_rollups('hour', user_id='erin') == [
+                {'bucket': '2025-01-01 09:00', 'entries': 2, 'successes': 1, 'failures': 1,
+                 'avg_duration_ms': 200.0}
+            ]
+
+            # Running the migration again does not double count
+            audit_db.initialize_database()
+            assert audit_db.get_audit_stats()['total_records'] == 3
+
+            conn = sqlite3.connect(audit_db.AUDIT_DB_PATH)
+            conn.execute("DELETE FROM audit_log WHERE user_id = 'frank'")
+            conn.commit()
+            conn.close()
+            assert audit_db.rebuild_audit_rollups()
+            assert audit_db.get_audit_stats() == full_scan_stats(audit_db.AUDIT_DB_PATH)
+            assert audit_db.get_audit_stats()['unique_users'] == 1
+            print("  ✓ PASS")
+        finally:
+            audit_db.AUDIT_DB_PATH = original_path
+
+
+if __name__ == '__main__':
+    test_stats_match_full_scan()
+    test_backfill_and_rebuild()
+    print("\nAll audit rollup tests passed")
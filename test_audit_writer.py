@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for the background audit writer (src/audit_writer.py)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import audit_db, audit_writer
+
+
+def audit_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT user_id, action_type, customer_ids, timestamp FROM audit_log ORDER BY id').fetchall()
+    conn.close()
+    return rows
+
+
+class TempAuditDb:
+    """Point audit_db at a fresh database for the duration of a test"""
+
+    def __enter__(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._original = audit_db.AUDIT_DB_PATH
+        audit_db.AUDIT_DB_PATH = os.path.join(self._tmp.name, 'audit.db')
+        audit_db.initialize_database()
+        return audit_db.AUDIT_DB_PATH
+
+    def __exit__(self, *exc):
+        audit_writer.flush_audit_writes()
+        audit_db.AUDIT_DB_PATH = self._original
+        self._tmp.cleanup()
+
+
+def test_batched_writes():
+    """Queued entries are committed in batches, keeping the time they were queued"""
+    print("=" * 60)
+    print("TEST: batched background writes")
+    print("=" * 60)
+
+    with TempAuditDb() as db_path:
+        before = audit_writer.get_audit_writer_stats()
+        queued_at = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        for i in range(1200):
+            assert audit_writer.submit_audit_entry('alice', 'PE-Enable', [f'cid-{i}']) is None
+        audit_writer.flush_audit_writes()
+
+        rows = audit_rows(db_path)
+        assert len(rows) == 1200
+        assert rows[0][:3] == ('alice', 'PE-Enable', '["cid-0"]')
+        assert rows[0][3] >= queued_at
+        # Customer index trigger fires for batched inserts too
+        assert [r['customer_ids'] for r in audit_db.get_customer_actions('cid-7')] == [['cid-7']]
+
+        stats = audit_writer.get_audit_writer_stats()
+        batches = stats['batches'] - before['batches']
+        print(f"  1200 entries in {batches} batches, last lag {stats['last_lag_ms']} ms")
+        assert stats['written'] - before['written'] == 1200
+        assert 3 <= batches < 1200
+        assert stats['queue_depth'] == 0 and stats['oldest_queued_ms'] == 0
+        print("  ✓ PASS")
+
+
+def test_overflow_policies():
+    """A full queue writes inline under 'sync' and discards under 'drop'"""
+    print("\n" + "=" * 60)
+    print("TEST: backpressure policies")
+    print("=" * 60)
+
+    with TempAuditDb() as db_path:
+        release = threading.Event()
+        real_insert = audit_writer.insert_audit_rows
+
+        def stalled_insert(rows):
+            release.wait()
+            return real_insert(rows)
+
+        audit_writer.insert_audit_rows = stalled_insert
+        original_policy = audit_writer.AUDIT_WRITE_OVERFLOW
+        try:
+            # The writer takes the first entry and stalls writing it; then the queue fills up
+            audit_writer.submit_audit_entry('alice', 'T-Enable', 'first')
+            time.sleep(audit_writer.AUDIT_WRITE_INTERVAL_MS / 1000 + 0.1)
+            for _ in range(audit_writer.AUDIT_WRITE_QUEUE_SIZE):
+                audit_writer.submit_audit_entry('alice', 'T-Enable', 'queued')
+            stats = audit_writer.get_audit_writer_stats()
+            assert stats['queue_depth'] == audit_writer.AUDIT_WRITE_QUEUE_SIZE
+            assert stats['oldest_queued_ms'] > 0
+
+            audit_writer.AUDIT_WRITE_OVERFLOW = 'sync'
+            log_id = audit_writer.submit_audit_entry('bob', 'PE-Direct', 'inline')
+            assert log_id is not None
+            assert [row[:3] for row in audit_rows(db_path)] == [('bob', 'PE-Direct', 'inline')]
+
+            audit_writer.AUDIT_WRITE_OVERFLOW = 'drop'
+            dropped_before = audit_writer.get_audit_writer_stats()['dropped']
+            assert audit_writer.submit_audit_entry('bob', 'PE-Direct', 'lost') is None
+            assert audit_writer.get_audit_writer_stats()['dropped'] == dropped_before + 1
+        finally:
+            audit_writer.AUDIT_WRITE_OVERFLOW = original_policy
+            release.set()
+            audit_writer.flush_audit_writes()
+            audit_writer.insert_audit_rows = real_insert
+
+        customers = [row[2] for row in audit_rows(db_path)]
+        assert 'lost' not in customers
+        assert customers.count('inline') == 1 and customers.count('first') == 1
+        print(f"  {len(customers)} entries written after the writer caught up")
+        print("  ✓ PASS")
+
+
+def test_bad_row_and_shutdown():
+    """One unwritable row only loses itself; shutdown writes what is still queued"""
+    print("\n" + "=" * 60)
+    print("TEST: failing batch and shutdown flush")
+    print("=" * 60)
+
+    with TempAuditDb() as db_path:
+        failed_before = audit_writer.get_audit_writer_stats()['failed']
+        audit_writer.submit_audit_entry('alice', 'PE-Enable', 'a')
+        audit_writer.submit_audit_entry(None, 'PE-Enable', 'b')  # user_id is NOT NULL
+        audit_writer.submit_audit_entry('alice', 'PE-Enable', 'c')
+        assert audit_writer.shutdown_audit_writer()
+        assert not audit_writer.get_audit_writer_stats()['writer_alive']
+        assert [row[2] for row in audit_rows(db_path)] == ['a', 'c']
+        assert audit_writer.get_audit_writer_stats()['failed'] == failed_before + 1
+        assert audit_writer.shutdown_audit_writer()
+
+        # The writer starts again on the next entry
+        audit_writer.submit_audit_entry('alice', 'PE-Enable', 'd')
+        audit_writer.flush_audit_writes()
+        assert [row[2] for row in audit_rows(db_path)] == ['a', 'c', 'd']
+        print("  ✓ PASS")
+
+
+if __name__ == '__main__':
+    test_batched_writes()
+    test_overflow_policies()
+    test_bad_row_and_shutdown()
+    print("\nAll audit writer tests passed")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for background cache maintenance
+Covers the expires_at migration, the indexed purge and the maintenance scheduler
+Runs against a throwaway jobs database in a temp directory
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+from src import maintenance
+
+
+def test_expires_at_migration():
+    """Existing cache tables get an expires_at column backfilled from cached_at + ttl"""
+    print("=" * 60)
+    print("TEST: expires_at migration")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        conn = sqlite3.connect(jobs.DB_PATH)
+        conn.execute('''
+            CREATE TABLE appstatus_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cid TEXT NOT NULL,
+                app_name TEXT NOT NULL,
+                status_data TEXT NOT NULL,
+                cached_at TEXT NOT NULL,
+                ttl_seconds INTEGER DEFAULT 1800,
+                UNIQUE(cid, app_name)
+            )
+        ''')
+        conn.execute('''
+            INSERT INTO appstatus_cache (cid, app_name, status_data, cached_at, ttl_seconds)
+            VALUES ('old-cid', 'ALL', '{}', '2024-01-01T10:00:00.250000', 60)
+        ''')
+        conn.commit()
+        conn.close()
+
+        jobs.initialize_jobs_database()
+
+        conn = sqlite3.connect(jobs.DB_PATH)
+        expires_at = conn.execute("SELECT expires_at FROM appstatus_cache WHERE cid = 'old-cid'").fetchone()[0]
+        plan = ' '.join(str(row) for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT id FROM appstatus_cache WHERE expires_at < ?', ('x',)))
+        conn.close()
+
+        print(f"  Backfilled expires_at: {expires_at}")
+        assert expires_at == '2024-01-01T10:01:00.250'
+        assert 'idx_appstatus_cache_expires_at' in plan
+        print("  ✓ PASS")
+
+
+def test_purge_removes_only_expired_rows():
+    """cleanup_expired_cache() deletes rows past the stale grace, in batches, and keeps the rest"""
+    print("\n" + "=" * 60)
+    print("TEST: cleanup_expired_cache() range delete")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        jobs.initialize_jobs_database()
+
+        jobs.cache_appstatus_bulk({f'fresh-{i}': {'status': 'Ready'} for i in range(10)}, ttl_seconds=1800)
+        # Expired long enough ago to be past the stale grace period
+        old_at = datetime.now() - timedelta(seconds=jobs.APPSTATUS_STALE_GRACE_SECONDS + 3600)
+        # Expired a minute ago: still servable stale, so it must survive
+        stale_at = datetime.now() - timedelta(seconds=120)
+        conn = sqlite3.connect(jobs.DB_PATH)
+        conn.executemany('''
+            INSERT INTO appstatus_cache (cid, app_name, status_data, cached_at, ttl_seconds, expires_at)
+            VALUES (?, 'ALL', '{}', ?, 60, ?)
+        ''', [(f'old-{i}', old_at.isoformat(), (old_at + timedelta(seconds=60)).isoformat())
+              for i in range(25)] +
+            [(f'stale-{i}', stale_at.isoformat(), (stale_at + timedelta(seconds=60)).isoformat())
+             for i in range(5)])
+        conn.commit()
+        conn.close()
+
+        original_batch = jobs.CACHE_PURGE_BATCH_SIZE
+        jobs.CACHE_PURGE_BATCH_SIZE = 10
+        try:
+            assert jobs.get_cache_stats()['expired_entries'] == 30
+            assert jobs.cleanup_expired_cache() == 25
+        finally:
+            jobs.CACHE_PURGE_BATCH_SIZE = original_batch
+
+        stats = jobs.get_cache_stats()
+        assert stats['total_entries'] == 15
+        assert stats['expired_entries'] == 5
+
+        # A failing purge reaches the scheduler instead of reporting 0 rows
+        jobs.DB_PATH = tmp_dir
+        maintenance.register_task('test_cache_purge', jobs.cleanup_expired_cache, interval_seconds=3600)
+        assert maintenance.run_task_now('test_cache_purge') is None
+        task = maintenance.get_maintenance_stats()['tasks']['test_cache_purge']
+        assert task['failures'] == 1 and task['last_error']
+        print("  ✓ PASS")
+
+
+def test_scheduler_records_runs():
+    """Registered tasks run in the background and report duration and rows"""
+    print("\n" + "=" * 60)
+    print("TEST: maintenance scheduler")
+    print("=" * 60)
+
+    calls = []
+
+    def purge():
+        calls.append(time.monotonic())
+        return 7
+
+    def broken():
+        raise RuntimeError('boom')
+
+    maintenance.register_task('test_purge', purge, interval_seconds=0.1, run_immediately=True)
+    maintenance.register_task('test_broken', broken, interval_seconds=60, run_immediately=True)
+    maintenance.start_scheduler()
+    try:
+        time.sleep(0.5)
+        stats = maintenance.get_maintenance_stats()
+        print(f"  Stats: {stats['tasks']['test_purge']}")
+        assert stats['running']
+        assert len(calls) >= 3
+        assert stats['tasks']['test_purge']['last_rows'] == 7
+        assert stats['tasks']['test_purge']['rows_total'] == 7 * stats['tasks']['test_purge']['runs']
+        assert stats['tasks']['test_purge']['last_duration_ms'] is not None
+        assert stats['tasks']['test_broken']['failures'] == 1
+        assert stats['tasks']['test_broken']['last_error'] == 'boom'
+    finally:
+        maintenance.stop_scheduler()
+
+    assert not maintenance.get_maintenance_stats()['running']
+    assert maintenance.run_task_now('test_purge') == 7
+    print("  ✓ PASS")
+
+
+if __name__ == '__main__':
+    test_expires_at_migration()
+    test_purge_removes_only_expired_rows()
+    test_scheduler_records_runs()
+    print("\nAll cache maintenance tests passed")
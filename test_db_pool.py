@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled SQLite connections (src/db_pool.py)
+Runs against throwaway databases in a temp directory
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.db_pool import ConnectionPool, get_pool, get_pool_stats, close_all_pools
+
+
+def test_connections_are_reused():
+    """Repeated acquire/close should reuse one optimized connection"""
+    print("=" * 60)
+    print("TEST: connection reuse")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pool = ConnectionPool(os.path.join(tmp_dir, 'reuse.db'), max_size=2)
+        for _ in range(20):
+            conn = pool.acquire()
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            conn.close()
+            conn.close()  # second close is a no-op
+
+        stats = pool.get_stats()
+        print(f"  Stats: {stats}")
+        assert stats['connections_opened'] == 1
+        assert stats['reused'] == 19
+        assert stats['idle_connections'] == 1
+        assert stats['in_use_connections'] == 0
+        pool.close()
+        print("  ✓ PASS")
+
+
+def test_uncommitted_work_is_rolled_back():
+    """A connection closed mid-transaction must not leak its writes"""
+    print("\n" + "=" * 60)
+    print("TEST: rollback on release / context manager")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pool = ConnectionPool(os.path.join(tmp_dir, 'tx.db'), max_size=1)
+        with pool.connection() as conn:
+            conn.execute('CREATE TABLE t (v INTEGER)')
+
+        conn = pool.acquire()
+        conn.execute('INSERT INTO t VALUES (1)')
+        conn.close()
+
+        try:
+            with pool.connection() as conn:
+                conn.execute('INSERT INTO t VALUES (2)')
+                raise RuntimeError('boom')
+        except RuntimeError:
+            pass
+
+        with pool.connection() as conn:
+            conn.execute('INSERT INTO t VALUES (3)')
+
+        conn = pool.acquire()
+        assert conn.row_factory is None
+        assert [row[0] for row in conn.execute('SELECT v FROM t')] == [3]
+        conn.close()
+        assert pool.get_stats()['rollbacks_on_release'] == 1
+        pool.close()
+        print("  ✓ PASS")
+
+
+def test_replaced_file_drops_idle_connections():
+    """Deleting and recreating the database file must not serve the old file"""
+    print("\n" + "=" * 60)
+    print("TEST: database file replaced")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'replaced.db')
+        pool = ConnectionPool(path)
+        with pool.connection() as conn:
+            conn.execute('CREATE TABLE old_table (v INTEGER)')
+
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+        with pool.connection() as conn:
+            tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        assert tables == []
+        assert pool.get_stats()['resets'] == 1
+        pool.close()
+        print("  ✓ PASS")
+
+
+def test_pool_is_bounded():
+    """Threads beyond max_size wait, then fall back to overflow connections"""
+    print("\n" + "=" * 60)
+    print("TEST: bounded pool under concurrency")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pool = ConnectionPool(os.path.join(tmp_dir, 'bounded.db'), max_size=2, timeout=0.05)
+        held = [pool.acquire(), pool.acquire()]
+        extra = pool.acquire()  # pool exhausted: overflow after the timeout
+        stats = pool.get_stats()
+        assert stats['open_connections'] == 2
+        assert stats['waits'] == 1 and stats['overflow'] == 1
+        extra.close()
+        for conn in held:
+            conn.close()
+        assert pool.get_stats()['idle_connections'] == 2
+
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(50):
+                    with pool.connection() as conn:
+                        conn.execute('SELECT 1').fetchone()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert pool.get_stats()['open_connections'] == 2
+        pool.close()
+        print("  ✓ PASS")
+
+
+def test_shared_pool_registry():
+    """get_pool() returns one pool per database file"""
+    print("\n" + "=" * 60)
+    print("TEST: get_pool() registry")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'shared.db')
+        assert get_pool(path) is get_pool(os.path.join(tmp_dir, '.', 'shared.db'))
+        get_pool(path).acquire().close()
+        assert os.path.abspath(path) in get_pool_stats()['pools']
+        assert close_all_pools() >= 1
+        print("  ✓ PASS")
+
+
+if __name__ == '__main__':
+    test_connections_are_reused()
+    test_uncommitted_work_is_rolled_back()
+    test_replaced_file_drops_idle_connections()
+    test_pool_is_bounded()
+    test_shared_pool_registry()
+    print("\nAll connection pool tests passed")
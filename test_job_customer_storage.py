@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script for job customer list storage in src/jobs.py ('rows' and 'compact')
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+
+
+def test_compact_and_rows_read_the_same():
+    """Jobs written in either layout read back identically, side by side in one database"""
+    print("=" * 60)
+    print("TEST: mixed storage reads")
+    print("=" * 60)
+
+    original_path, original_storage = jobs.DB_PATH, jobs.JOB_CUSTOMER_STORAGE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        try:
+            jobs.initialize_jobs_database()
+            cids = [f'cid-{i:04d}' for i in range(2500, 0, -1)] + ['cid-0001']
+
+            jobs.JOB_CUSTOMER_STORAGE = 'rows'
+            as_rows = jobs.create_job('alice', 1, 'tran-begin', cids)
+            jobs.JOB_CUSTOMER_STORAGE = 'compact'
+            compact_1 = jobs.create_job('alice', 1, 'tran-begin', cids)
+            compact_2 = jobs.create_job('alice', 2, 'pe-enable', cids[:10] + ['new-cid'])
+
+            expected = sorted(set(cids))
+            assert jobs.get_job_customers(as_rows['job_id']) == expected
+            assert jobs.get_job_customers(compact_1['job_id']) == expected
+            assert jobs.get_job_customers(compact_2['job_id']) == sorted(set(cids[:10] + ['new-cid']))
+            assert compact_1['customer_count'] == 2500
+            assert jobs.get_job_details(compact_2['job_id'])['customer_count'] == 11
+            assert jobs.get_job_customers('no-such-job') == []
+
+            conn = sqlite3.connect(jobs.DB_PATH)
+            # Compact jobs write no job_customers rows, and every CID is stored once
+            assert conn.execute('SELECT COUNT(*) FROM job_customers').fetchone()[0] == 2500
+            assert conn.execute('SELECT COUNT(*) FROM cid_dictionary').fetchone()[0] == 2501
+            keys = [row[0] for row in conn.execute('SELECT job_key FROM jobs ORDER BY created_at')]
+            conn.close()
+            assert keys == [None, 1, 2]
+            print("  ✓ PASS")
+        finally:
+            jobs.DB_PATH, jobs.JOB_CUSTOMER_STORAGE = original_path, original_storage
+
+
+if __name__ == '__main__':
+    test_compact_and_rows_read_the_same()
+    print("\nAll job customer storage tests passed")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for job lifecycle events (src/events.py) and their publication
+from create_job / update_job
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import events, jobs
+from src.events import subscribe, unsubscribe, publish, has_subscribers, get_event_stats
+
+
+def test_events_are_routed_by_user():
+    """Subscribers only receive their own user's events"""
+    print("=" * 60)
+    print("TEST: per-user routing")
+    print("=" * 60)
+
+    alice = subscribe('alice')
+    alice_2 = subscribe('alice')
+    bob = subscribe('bob')
+    try:
+        assert publish('alice', 'success', {'job_id': 'j1'}) == 2
+        assert alice.get(1)['data'] == {'job_id': 'j1'}
+        assert alice_2.get(1)['type'] == 'success'
+        assert bob.get(0.05) is None
+        assert has_subscribers('bob') and not has_subscribers('carol')
+        print("  ✓ PASS")
+    finally:
+        for sub in (alice, alice_2, bob):
+            unsubscribe(sub)
+    assert not has_subscribers('alice')
+
+
+def test_slow_subscriber_drops_oldest():
+    """publish never blocks; a full subscriber queue loses its oldest events"""
+    print("\n" + "=" * 60)
+    print("TEST: bounded subscriber queue")
+    print("=" * 60)
+
+    sub = subscribe('slow')
+    try:
+        before = get_event_stats()['dropped']
+        for i in range(events.JOB_EVENTS_QUEUE_SIZE + 5):
+            publish('slow', 'created', {'n': i})
+        assert get_event_stats()['dropped'] - before == 5
+        assert sub.get(1)['data'] == {'n': 5}
+        print("  ✓ PASS")
+    finally:
+        unsubscribe(sub)
+
+
+def test_subscriber_limit():
+    """Subscriptions beyond JOB_EVENTS_MAX_SUBSCRIBERS are refused"""
+    print("\n" + "=" * 60)
+    print("TEST: subscriber limit")
+    print("=" * 60)
+
+    original = events.JOB_EVENTS_MAX_SUBSCRIBERS
+    events.JOB_EVENTS_MAX_SUBSCRIBERS = 2
+    subs = [subscribe('u1'), subscribe('u2')]
+    try:
+        assert subscribe('u3') is None
+        assert get_event_stats()['subscribers'] == 2
+        print("  ✓ PASS")
+    finally:
+        events.JOB_EVENTS_MAX_SUBSCRIBERS = original
+        for sub in subs:
+            unsubscribe(sub)
+
+
+def test_jobs_publish_lifecycle():
+    """create_job and update_job publish created / success / failed to the owner"""
+    print("\n" + "=" * 60)
+    print("TEST: job lifecycle events")
+    print("=" * 60)
+
+    original_path = jobs.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        try:
+            jobs.initialize_jobs_database()
+            sub = subscribe('owner')
+            try:
+                job = jobs.create_job('owner', 1, 'tran-begin', ['c1', 'c2'])
+                created = sub.get(1)
+                assert created['type'] == 'created'
+                assert created['data']['job_id'] == job['job_id']
+                assert created['data']['status'] == 'IN_PROGRESS'
+
+                jobs.update_job(job['job_id'], 'FAILED', http_status=502, error_message='bad gateway')
+                failed = sub.get(1)
+                assert failed['type'] == 'failed'
+                assert failed['data']['http_status'] == 502
+                assert failed['data']['error_message'] == 'bad gateway'
+                assert failed['data']['action_name'] == 'tran-begin'
+
+                # Other users' jobs are not delivered
+                other = jobs.create_job('someone-else', 1, 'tran-begin', ['c3'])
+                jobs.update_job(other['job_id'], 'SUCCESS', http_status=200)
+                assert sub.get(0.05) is None
+                print("  ✓ PASS")
+            finally:
+                unsubscribe(sub)
+        finally:
+            jobs.DB_PATH = original_path
+
+
+def test_waiting_subscriber_wakes_up():
+    """A subscriber blocked in get() is woken by a publish from another thread"""
+    print("\n" + "=" * 60)
+    print("TEST: blocked subscriber wakes on publish")
+    print("=" * 60)
+
+    sub = subscribe('waiter')
+    received = []
+    try:
+        reader = threading.Thread(target=lambda: received.append(sub.get(5)))
+        reader.start()
+        publish('waiter', 'success', {'job_id': 'j9'})
+        reader.join(2)
+        assert received and received[0]['data']['job_id'] == 'j9'
+        print("  ✓ PASS")
+    finally:
+        unsubscribe(sub)
+
+
+if __name__ == '__main__':
+    test_events_are_routed_by_user()
+    test_slow_subscriber_drops_oldest()
+    test_subscriber_limit()
+    test_jobs_publish_lifecycle()
+    test_waiting_subscriber_wakes_up()
+    print("\nAll job event tests passed")
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Test script for the job listing queries in src/jobs.py
+(stored customer_count, listing index, keyset pagination and filters)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+
+
+def use_temp_db(tmp_dir):
+    """Point jobs.py at a fresh database in tmp_dir"""
+    jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+
+
+def test_customer_count_backfill():
+    """Jobs created before the customer_count column get it backfilled on startup"""
+    print("=" * 60)
+    print("TEST: customer_count migration backfill")
+    print("=" * 60)
+
+    original_path = jobs.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        use_temp_db(tmp_dir)
+        try:
+            # Old schema: no customer_count column
+            conn = sqlite3.connect(jobs.DB_PATH)
+            conn.executescript('''
+                CREATE TABLE jobs (
+                    job_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, batch_id TEXT,
+                    action_code INTEGER NOT NULL, action_name TEXT NOT NULL, cluster_url TEXT,
+                    created_at TEXT NOT NULL, request_payload TEXT, response_summary TEXT,
+                    status TEXT DEFAULT 'IN_PROGRESS', http_status INTEGER, error_message TEXT,
+                    updated_at TEXT
+                );
+                CREATE TABLE job_customers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, cid TEXT NOT NULL,
+                    UNIQUE(job_id, cid)
+                );
+                INSERT INTO jobs (job_id, user_id, action_code, action_name, created_at)
+                VALUES ('old-1', 'alice', 1, 'tran-begin', '2025-01-01T00:00:00'),
+                       ('old-2', 'alice', 1, 'tran-begin', '2025-01-02T00:00:00');
+                UPDATE jobs SET cluster_url = 'https://gw.example/tms/v1/set/action' WHERE job_id = 'old-1';
+                INSERT INTO job_customers (job_id, cid) VALUES ('old-1', 'a'), ('old-1', 'b'), ('old-1', 'c');
+            ''')
+            conn.commit()
+            conn.close()
+
+            jobs.initialize_jobs_database()
+            counts = {job['job_id']: job['customer_count'] for job in jobs.get_user_jobs('alice')}
+            assert counts == {'old-1': 3, 'old-2': 0}, counts
+            # Full proxied URLs are reduced to the cluster base URL
+            assert jobs.get_job_details('old-1')['cluster_url'] == 'https://gw.example'
+            assert jobs.get_job_details('old-2')['cluster_url'] is None
+
+            # Running the migration again changes nothing
+            jobs.initialize_jobs_database()
+            assert jobs.get_job_details('old-1')['customer_count'] == 3
+            print("  ✓ PASS")
+        finally:
+            jobs.DB_PATH = original_path
+
+
+def test_listing_uses_stored_count_and_index():
+    """get_user_jobs reads the stored count and walks idx_jobs_user_created without sorting"""
+    print("\n" + "=" * 60)
+    print("TEST: listing query plan")
+    print("=" * 60)
+
+    original_path = jobs.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        use_temp_db(tmp_dir)
+        try:
+            jobs.initialize_jobs_database()
+            first = jobs.create_job('bob', 1, 'tran-begin', ['a', 'b', 'b'])
+            second = jobs.create_job('bob', 2, 'pe-enable', ['c'])
+            jobs.create_job('carol', 1, 'tran-begin', ['d'])
+
+            listing = jobs.get_user_jobs('bob')
+            assert [job['job_id'] for job in listing] == [second['job_id'], first['job_id']]
+            assert [job['customer_count'] for job in listing] == [1, 2]
+
+            conn = sqlite3.connect(jobs.DB_PATH)
+            plan = ' '.join(row[3] for row in conn.execute('''
+                EXPLAIN QUERY PLAN
+                SELECT job_id FROM jobs WHERE user_id = ? ORDER BY created_at DESC LIMIT 50
+            ''', ('bob',)))
+            conn.close()
+            print(f"  Plan: {plan}")
+            assert 'idx_jobs_user_created_id' in plan
+            assert 'TEMP B-TREE' not in plan
+            print("  ✓ PASS")
+        finally:
+            jobs.DB_PATH = original_path
+
+
+def insert_jobs(rows):
+    """Insert (job_id, user_id, status, action_code, cluster_url, created_at) rows directly"""
+    conn = sqlite3.connect(jobs.DB_PATH)
+    conn.executemany('''
+        INSERT INTO jobs (job_id, user_id, status, action_code, action_name, cluster_url,
+                          created_at, customer_count)
+        VALUES (?, ?, ?, ?, 'action', ?, ?, 1)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def test_keyset_pages():
+    """Pages walk (created_at, job_id) descending with no gaps or repeats, even on timestamp ties"""
+    print("\n" + "=" * 60)
+    print("TEST: keyset pagination")
+    print("=" * 60)
+
+    original_path = jobs.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        use_temp_db(tmp_dir)
+        try:
+            jobs.initialize_jobs_database()
+            # 4 jobs per timestamp so page boundaries fall inside ties
+            rows = [(f'job-{i:03d}', 'dave', 'SUCCESS', 1, 'https://a', f'2025-01-01T00:00:{i // 4:02d}')
+                    for i in range(103)]
+            insert_jobs(rows)
+            expected = [r[0] for r in sorted(rows, key=lambda r: (r[5], r[0]), reverse=True)]
+
+            seen = []
+            cursor = None
+            pages = 0
+            while True:
+                page = jobs.get_user_jobs_page('dave', limit=10, cursor=cursor)
+                seen.extend(job['job_id'] for job in page['jobs'])
+                pages += 1
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
+            assert seen == expected
+            assert pages == 11
+
+            try:
+                jobs.get_user_jobs_page('dave', cursor='not-a-cursor')
+                raise AssertionError('bad cursor accepted')
+            except ValueError:
+                pass
+            print("  ✓ PASS")
+        finally:
+            jobs.DB_PATH = original_path
+
+
+def test_filters():
+    """status, action_code, cluster_url and date range filters combine with paging"""
+    print("\n" + "=" * 60)
+    print("TEST: listing filters")
+    print("=" * 60)
+
+    original_path = jobs.DB_PATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        use_temp_db(tmp_dir)
+        try:
+            jobs.initialize_jobs_database()
+            insert_jobs([
+                ('j1', 'erin', 'FAILED', 1, 'https://a', '2025-01-01T00:00:00'),
+                ('j2', 'erin', 'SUCCESS', 1, 'https://a', '2025-01-02T00:00:00'),
+                ('j3', 'erin', 'FAILED', 2, 'https://b', '2025-01-03T00:00:00'),
+                ('j4', 'erin', 'FAILED', 2, 'https://a', '2025-01-04T00:00:00'),
+                ('j5', 'other', 'FAILED', 2, 'https://a', '2025-01-05T00:00:00'),
+            ])
+
+            def ids(**filters):
+                return [job['job_id'] for job in jobs.get_user_jobs_page('erin', **filters)['jobs']]
+
+            assert ids(status='FAILED') == ['j4', 'j3', 'j1']
+            assert ids(action_code=2) == ['j4', 'j3']
+            assert ids(cluster_url='https://a') == ['j4', 'j2', 'j1']
+            assert ids(created_from='2025-01-02', created_to='2025-01-04') == ['j3', 'j2']
+            assert ids(status='FAILED', action_code=2, cluster_url='https://a') == ['j4']
+
+            # A proxied URL under the cluster matches its base URL, and new jobs store the base
+            assert ids(cluster_url='https://a/tms/v1/set/action') == ['j4', 'j2', 'j1']
+            assert ids(cluster_url='https://b/') == ['j3']
+            created = jobs.create_job('erin', 1, 'tran-begin', ['x'], cluster_url='https://b/tms/v1/set/action')
+            assert jobs.get_job_details(created['job_id'])['cluster_url'] == 'https://b'
+            assert ids(cluster_url='https://b', created_to='2025-02-01') == ['j3']
+
+            # Bounds with a ' ' separator or an offset compare correctly against created_at
+            assert ids(created_from='2025-01-03 10:00', created_to='2025-02-01') == ['j4']
+            assert ids(created_from='2025-01-02 00:00', created_to='2025-01-03T00:00:00') == ['j2']
+            assert jobs.normalize_created_at('2025-01-03 10:00') == '2025-01-03T10:00:00'
+            for bad in ('yesterday', '2025-13-01', '01/03/2025'):
+                try:
+                    ids(created_from=bad)
+                    assert False, f'expected ValueError for {bad}'
+                except ValueError:
+                    pass
+
+            first = jobs.get_user_jobs_page('erin', limit=2, status='FAILED')
+            assert [job['job_id'] for job in first['jobs']] == ['j4', 'j3']
+            assert ids(limit=2, status='FAILED', cursor=first['next_cursor']) == ['j1']
+
+            # Every filter is its own index range, without a sort
+            conn = sqlite3.connect(jobs.DB_PATH)
+            for column, value, index in (('status', 'FAILED', 'idx_jobs_user_status_created_id'),
+                                         ('action_code', 2, 'idx_jobs_user_action_created_id'),
+                                         ('cluster_url', 'https://b', 'idx_jobs_user_cluster_created_id')):
+                plan = ' '.join(row[3] for row in conn.execute(f'''
+                    EXPLAIN QUERY PLAN
+                    SELECT job_id FROM jobs
+                    WHERE user_id = ? AND {column} = ? AND (created_at, job_id) < (?, ?)
+                    ORDER BY created_at DESC, job_id DESC LIMIT 51
+                ''', ('erin', value, '2025-01-04', 'j4')))
+                print(f"  Plan ({column}): {plan}")
+                assert index in plan, plan
+                assert 'TEMP B-TREE' not in plan
+            conn.close()
+            print("  ✓ PASS")
+        finally:
+            jobs.DB_PATH = original_path
+
+
+def test_jobs_for_customer():
+    """CID -> jobs lookups cover both customer storages, owner scoping and keyset pages"""
+    print("\n" + "=" * 60)
+    print("TEST: jobs for a customer (reverse index)")
+    print("=" * 60)
+
+    original_path, original_storage = jobs.DB_PATH, jobs.JOB_CUSTOMER_STORAGE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        use_temp_db(tmp_dir)
+        try:
+            jobs.initialize_jobs_database()
+            created = []
+            for i in range(7):
+                jobs.JOB_CUSTOMER_STORAGE = 'compact' if i % 2 else 'rows'
+                owner = 'frank' if i < 5 else 'gina'
+                created.append(jobs.create_job(owner, 1, 'tran-begin', ['target', f'other-{i}']))
+            jobs.create_job('frank', 1, 'tran-begin', ['unrelated'])
+            newest_first = [job['job_id'] for job in reversed(created)]
+
+            def walk(**kwargs):
+                seen, cursor = [], None
+                while True:
+                    page = jobs.get_jobs_for_customer('target', limit=2, cursor=cursor, **kwargs)
+                    seen.extend(job['job_id'] for job in page['jobs'])
+                    cursor = page['next_cursor']
+                    if cursor is None:
+                        return seen
+
+            assert walk() == newest_first
+            assert walk(user_id='frank') == newest_first[2:]
+            page = jobs.get_jobs_for_customer('target', user_id='gina')
+            assert [job['user_id'] for job in page['jobs']] == ['gina', 'gina']
+            assert page['jobs'][0]['customer_count'] == 2 and page['next_cursor'] is None
+            assert jobs.get_jobs_for_customer('other-3')['jobs'][0]['job_id'] == created[3]['job_id']
+            assert jobs.get_jobs_for_customer('missing') == {'jobs': [], 'next_cursor': None}
+
+            try:
+                jobs.get_jobs_for_customer('target', cursor='garbage')
+                assert False, 'expected ValueError'
+            except ValueError:
+                pass
+
+            conn = sqlite3.connect(jobs.DB_PATH)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            plan = ' '.join(row[3] for row in conn.execute('''
+                EXPLAIN QUERY PLAN
+                SELECT job_id FROM job_customers WHERE cid = ?
+                UNION ALL
+                SELECT job_key FROM job_customer_keys WHERE cid_key = ?
+            ''', ('target', 1)))
+            conn.close()
+            print(f"  Plan: {plan}")
+            assert 'COVERING INDEX idx_job_customers_cid_job' in plan
+            assert 'COVERING INDEX idx_job_customer_keys_cid' in plan
+            assert 'idx_job_customers_job_id' not in indexes
+            print("  ✓ PASS")
+        finally:
+            jobs.DB_PATH, jobs.JOB_CUSTOMER_STORAGE = original_path, original_storage
+
+
+if __name__ == '__main__':
+    test_customer_count_backfill()
+    test_listing_uses_stored_count_and_index()
+    test_keyset_pages()
+    test_filters()
+    test_jobs_for_customer()
+    print("\nAll job listing tests passed")
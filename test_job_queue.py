@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test script for the set action worker pool (src/job_queue.py)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import job_queue, jobs
+from src.job_queue import submit_job, get_job_queue_state, wait_for_jobs, get_job_queue_stats, get_active_job_ids
+
+
+def test_jobs_run_on_bounded_pool():
+    """submit_job returns at once and never runs more than JOB_QUEUE_WORKERS jobs together"""
+    print("=" * 60)
+    print("TEST: bounded worker pool")
+    print("=" * 60)
+
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+    done = []
+
+    def work(job_id):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.1)
+        with lock:
+            active[0] -= 1
+            done.append(job_id)
+
+    before = get_job_queue_stats()
+    start = time.perf_counter()
+    for i in range(12):
+        assert submit_job(f'job-{i}', work, f'job-{i}')
+    submit_elapsed = time.perf_counter() - start
+    wait_for_jobs()
+
+    after = get_job_queue_stats()
+    print(f"  Submitted 12 jobs in {submit_elapsed * 1000:.1f} ms, peak concurrency {peak[0]}")
+    print(f"  Stats: {after}")
+    assert submit_elapsed < 0.1
+    assert sorted(done) == sorted(f'job-{i}' for i in range(12))
+    assert peak[0] <= job_queue.JOB_QUEUE_WORKERS
+    assert after['completed'] - before['completed'] == 12
+    assert after['queued'] == 0 and after['running'] == 0
+    print("  ✓ PASS")
+
+
+def test_queue_state_and_failures():
+    """Jobs report queued/running state, and a raising job does not kill its worker"""
+    print("\n" + "=" * 60)
+    print("TEST: queue state and failures")
+    print("=" * 60)
+
+    release = threading.Event()
+    before = get_job_queue_stats()
+
+    def blocker():
+        release.wait(5)
+
+    def boom():
+        raise RuntimeError('upstream exploded')
+
+    for i in range(job_queue.JOB_QUEUE_WORKERS):
+        submit_job(f'block-{i}', blocker)
+    submit_job('boom', boom)
+    time.sleep(0.1)
+
+    assert get_job_queue_state('block-0') == 'running'
+    assert get_job_queue_state('boom') == 'queued'
+    assert get_job_queue_stats()['oldest_queued_seconds'] >= 0
+
+    release.set()
+    wait_for_jobs()
+    assert get_job_queue_state('boom') is None
+
+    after = get_job_queue_stats()
+    assert after['failed'] - before['failed'] == 1
+    assert after['workers'] == job_queue.JOB_QUEUE_WORKERS
+
+    # Workers are still alive and taking work
+    ran = []
+    submit_job('after-boom', ran.append, 'ok')
+    wait_for_jobs()
+    assert ran == ['ok']
+    print("  ✓ PASS")
+
+
+def test_full_queue_rejects():
+    """Submissions beyond JOB_QUEUE_SIZE are refused so callers can fall back"""
+    print("\n" + "=" * 60)
+    print("TEST: full queue")
+    print("=" * 60)
+
+    release = threading.Event()
+    try:
+        for i in range(job_queue.JOB_QUEUE_WORKERS):
+            assert submit_job(f'hold-{i}', release.wait, 5)
+        while get_job_queue_stats()['running'] < job_queue.JOB_QUEUE_WORKERS:
+            time.sleep(0.01)
+
+        for i in range(job_queue.JOB_QUEUE_SIZE):
+            assert submit_job(f'fill-{i}', lambda: None)
+        before = get_job_queue_stats()['rejected']
+        assert submit_job('overflow', lambda: None) is False
+        assert get_job_queue_stats()['rejected'] == before + 1
+        print("  ✓ PASS")
+    finally:
+        release.set()
+        wait_for_jobs()
+
+
+def test_interrupted_jobs_are_failed():
+    """IN_PROGRESS jobs the queue no longer holds are marked FAILED; live ones are left alone"""
+    print("\n" + "=" * 60)
+    print("TEST: interrupted jobs at startup")
+    print("=" * 60)
+
+    original_path = jobs.DB_PATH
+    release = threading.Event()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        try:
+            jobs.initialize_jobs_database()
+            orphaned = jobs.create_job('alice', 1, 'tran-begin', ['cid-1'])['job_id']
+            live = jobs.create_job('alice', 2, 'pe-enable', ['cid-2'])['job_id']
+            done = jobs.create_job('alice', 3, 't-enable', ['cid-3'], status='SUCCESS')['job_id']
+            assert submit_job(live, release.wait, 5)
+
+            assert jobs.fail_interrupted_jobs(get_active_job_ids()) == 1
+            orphaned_job = jobs.get_job_details(orphaned)
+            assert orphaned_job['status'] == 'FAILED'
+            assert 'restarted' in orphaned_job['error_message']
+            assert jobs.get_job_details(live)['status'] == 'IN_PROGRESS'
+            assert jobs.get_job_details(done)['status'] == 'SUCCESS'
+            assert jobs.fail_interrupted_jobs(get_active_job_ids()) == 0
+            print("  ✓ PASS")
+        finally:
+            release.set()
+            wait_for_jobs()
+            jobs.DB_PATH = original_path
+
+
+class StubResponse:
+    status_code = 200
+    text = '{"success": true}'
+
+    def json(self):
+        return {'success': True}
+
+
+def test_only_posted_set_actions_create_jobs():
+    """A set-action payload sent without isPost is a plain GET: no job, no audit entry"""
+    print("\n" + "=" * 60)
+    print("TEST: proxy_fetch job creation")
+    print("=" * 60)
+
+    from src import audit_db, prod_customer_data
+    from src.audit_writer import flush_audit_writes
+
+    paths = (jobs.DB_PATH, audit_db.AUDIT_DB_PATH, prod_customer_data.DB_PATH)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        audit_db.AUDIT_DB_PATH = os.path.join(tmp_dir, 'audit.db')
+        prod_customer_data.DB_PATH = os.path.join(tmp_dir, 'prod_customer_data.db')
+        # Flask-Session keeps its files under the working directory
+        os.chdir(tmp_dir)
+        try:
+            import app as dashboard
+            dashboard.initialize_database()
+            dashboard.initialize_jobs_database()
+            original_get, original_post = dashboard.single_flight_get, dashboard.upstream_post
+            dashboard.single_flight_get = lambda url, **kwargs: StubResponse()
+            dashboard.upstream_post = lambda url, **kwargs: StubResponse()
+            try:
+                client = dashboard.app.test_client()
+                with client.session_transaction() as sess:
+                    sess['user_id'] = 'alice'
+                    sess['last_activity'] = datetime.now().isoformat()
+                payload = {'url': 'https://cluster.example/tms/v1/set/action', 'token': 't',
+                           'postData': {'action': 'PE-Enable', 'cids': ['cid-1']}}
+
+                response = client.post('/proxy_fetch', json=payload)
+                assert response.status_code == 200, response.get_json()
+                assert 'job_id' not in response.get_json()
+                assert jobs.get_user_jobs_page('alice')['jobs'] == []
+                flush_audit_writes()
+                assert audit_db.get_audit_trail(user_id='alice', action_type='PE-Enable') == []
+
+                response = client.post('/proxy_fetch', json=dict(payload, isPost=True, **{'async': False}))
+                job_id = response.get_json()['job_id']
+                assert jobs.get_job_details(job_id)['status'] == 'SUCCESS'
+                flush_audit_writes()
+                assert len(audit_db.get_audit_trail(user_id='alice', action_type='PE-Enable')) == 1
+                print("  ✓ PASS")
+            finally:
+                dashboard.single_flight_get, dashboard.upstream_post = original_get, original_post
+        finally:
+            os.chdir(cwd)
+            jobs.DB_PATH, audit_db.AUDIT_DB_PATH, prod_customer_data.DB_PATH = paths
+
+
+if __name__ == '__main__':
+    test_jobs_run_on_bounded_pool()
+    test_queue_state_and_failures()
+    test_full_queue_rejects()
+    test_interrupted_jobs_are_failed()
+    test_only_posted_set_actions_create_jobs()
+    print("\nAll job queue tests passed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming JSON object parsing (src/json_stream.py) and the
+streaming action map path (fetch_actions_streaming)
+Runs against a local stub server - no TMS gateway required
+"""
+
+import http.server
+import json
+import os
+import socketserver
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.json_stream import iter_object_items, filter_object_stream
+from src.action_snapshot import fetch_actions_streaming
+
+ACTION_MAP = {f'cid-{i:05d}': {'action_code': i % 5, 'action_desc': f'desc {i} ✓', 'ratio': i / 7}
+              for i in range(5000)}
+
+
+def chunked(data, size):
+    """Split bytes into fixed-size chunks"""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_chunk_boundaries():
+    """Any chunk size, including splits inside numbers and UTF-8 sequences, parses the same"""
+    print("=" * 60)
+    print("TEST: chunk boundaries")
+    print("=" * 60)
+
+    body = json.dumps({'a': 1.25, 'b': [1, 2, {'c': None}], 'ü': 'ünïcode', 'd': -3e5, 'e': True}).encode()
+    expected = json.loads(body)
+    for size in (1, 2, 3, 7, 64, 4096):
+        assert dict(iter_object_items(chunked(body, size))) == expected, size
+    assert dict(iter_object_items(['{}'])) == {}
+    assert dict(iter_object_items([b' { "x" : 1 } '])) == {'x': 1}
+    print("  ✓ PASS")
+
+
+def test_filter_keeps_only_requested_keys():
+    """Only requested members are kept, but every member is counted"""
+    print("\n" + "=" * 60)
+    print("TEST: key filtering")
+    print("=" * 60)
+
+    body = json.dumps(ACTION_MAP).encode()
+    wanted = {'cid-00001', 'cid-04999', 'not-in-map'}
+    result = filter_object_stream(chunked(body, 1000), wanted)
+    assert result['items'] == {k: ACTION_MAP[k] for k in ('cid-00001', 'cid-04999')}
+    assert result['member_count'] == 5000
+    assert result['bytes_read'] == len(body)
+    print("  ✓ PASS")
+
+
+def test_malformed_input_raises():
+    """Truncated, non-object and trailing-garbage bodies raise ValueError"""
+    print("\n" + "=" * 60)
+    print("TEST: malformed input")
+    print("=" * 60)
+
+    for bad in (b'', b'[1, 2]', b'{"a": 1', b'{"a" 1}', b'{1: 2}', b'{"a": 1,}', b'{"a": 1} x', b'{"a": tru'):
+        try:
+            filter_object_stream(chunked(bad, 3), {'a'})
+        except ValueError:
+            continue
+        raise AssertionError(f'{bad!r} did not raise')
+    print("  ✓ PASS")
+
+
+class ActionMapHandler(http.server.BaseHTTPRequestHandler):
+    """Stub /tms/v1/get/action?cid=ALL"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if 'broken' in self.path:
+            status, body = 503, b'maintenance'
+        elif 'garbage' in self.path:
+            status, body = 200, b'{"cid-00001": {"action_code": '
+        else:
+            status, body = 200, json.dumps(ACTION_MAP).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_fetch_actions_streaming():
+    """The streaming fetch returns the job's CIDs and reports upstream errors"""
+    print("\n" + "=" * 60)
+    print("TEST: fetch_actions_streaming")
+    print("=" * 60)
+
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), ActionMapHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        result = fetch_actions_streaming(base_url + '/', 'token', ['cid-00010', 'cid-00020'])
+        assert result['error'] is None
+        assert result['actions'] == {'cid-00010': ACTION_MAP['cid-00010'], 'cid-00020': ACTION_MAP['cid-00020']}
+        assert result['cid_count'] == 5000
+
+        broken = fetch_actions_streaming(base_url + '/broken', 'token', ['cid-00010'])
+        assert broken['actions'] is None and broken['http_status'] == 503
+
+        garbage = fetch_actions_streaming(base_url + '/garbage', 'token', ['cid-00001'])
+        assert garbage['actions'] is None and garbage['http_status'] == 500
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    test_chunk_boundaries()
+    test_filter_keeps_only_requested_keys()
+    test_malformed_input_raises()
+    test_fetch_actions_streaming()
+    print("\nAll streaming JSON tests passed")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process app status cache tier
+Covers TTLLRUCache (src/memory_cache.py) and its use in front of appstatus_cache
+Runs against a throwaway jobs database in a temp directory
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+from src.memory_cache import TTLLRUCache
+
+
+def test_lru_eviction_and_ttl():
+    """Oldest entries are evicted at capacity; entries expire after their TTL"""
+    print("=" * 60)
+    print("TEST: TTLLRUCache eviction and expiry")
+    print("=" * 60)
+
+    cache = TTLLRUCache(max_entries=3)
+    cache.put_many({'a': 1, 'b': 2, 'c': 3}, ttl_seconds=60)
+    assert cache.get('a') == 1  # 'a' becomes most recently used
+    cache.put('d', 4, ttl_seconds=60)
+    assert cache.get('b') is None
+    assert cache.get_many(['a', 'c', 'd']) == {'a': 1, 'c': 3, 'd': 4}
+
+    cache.put('short', 'x', ttl_seconds=0.05)
+    time.sleep(0.1)
+    assert cache.get('short') is None
+
+    # An entry stored 30s ago is too old for a 10s max age but not for 60s
+    cache.put('aged', 'y', ttl_seconds=60, stored_at=time.time() - 30)
+    assert cache.get('aged', max_age_seconds=10) is None
+    assert cache.get('aged', max_age_seconds=60) == 'y'
+
+    stats = cache.get_stats()
+    print(f"  Stats: {stats}")
+    assert stats['evictions'] == 2
+    assert stats['expirations'] == 1
+    assert stats['hits'] == 5
+    assert cache.invalidate(lambda key: key in ('c', 'd')) == 2
+    print("  ✓ PASS")
+
+
+def test_repeated_lookups_are_served_from_memory():
+    """Write-through entries and promoted SQLite hits skip the database"""
+    print("\n" + "=" * 60)
+    print("TEST: app status lookups served from memory")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        jobs.initialize_jobs_database()
+        jobs.invalidate_appstatus_cache()
+
+        jobs.cache_appstatus_bulk({'cid-1': {'status': 'Ready'}, 'cid-2': {'status': 'Down'}})
+        jobs.cache_appstatus('cid-3', {'status': 'Ready'})
+
+        # Rows written behind the cache's back are only visible via SQLite...
+        conn = sqlite3.connect(jobs.DB_PATH)
+        conn.execute("UPDATE appstatus_cache SET status_data = '{\"status\": \"Changed\"}'")
+        conn.execute('''
+            INSERT INTO appstatus_cache (cid, app_name, status_data, cached_at, ttl_seconds, expires_at)
+            VALUES ('cid-4', 'ALL', '{"status": "Ready"}', ?, 1800, '9999-01-01T00:00:00')
+        ''', (jobs.datetime.now().isoformat(),))
+        conn.commit()
+        conn.close()
+
+        # ...so the written-through entries still come from memory
+        first = jobs.get_cached_appstatus_batch(['cid-1', 'cid-2', 'cid-3', 'cid-4', 'cid-5'])
+        assert first['hits']['cid-1'] == {'status': 'Ready'}
+        assert first['hits']['cid-4'] == {'status': 'Ready'}
+        assert first['misses'] == ['cid-5']
+
+        # cid-4 was promoted on the first lookup
+        before = jobs.get_cache_stats()['memory']['hits']
+        second = jobs.get_cached_appstatus_batch(['cid-1', 'cid-2', 'cid-3', 'cid-4'])
+        assert second['hit_count'] == 4
+        assert jobs.get_cache_stats()['memory']['hits'] - before == 4
+
+        # Invalidation drops the in-process entry too
+        jobs.invalidate_appstatus_cache(cid='cid-1')
+        assert jobs.get_cached_appstatus('cid-1') is None
+        assert jobs.get_cached_appstatus('cid-2') == {'status': 'Down'}
+        jobs.invalidate_appstatus_cache()
+        assert jobs.get_cache_stats()['memory']['entries'] == 0
+
+        # Single-CID list payloads live under their own key, apart from batch entries
+        single_app = jobs.single_cid_cache_app('ALL')
+        jobs.cache_appstatus_bulk({'cid-1': {'status': 'Ready'}})
+        jobs.cache_appstatus_bulk({'cid-1': [{'app': 'tms', 'status': 'Ready'}]}, single_app)
+        assert jobs.get_cached_appstatus('cid-1') == {'status': 'Ready'}
+        assert jobs.get_cached_appstatus_batch(['cid-1'], single_app)['hits'] == {
+            'cid-1': [{'app': 'tms', 'status': 'Ready'}]
+        }
+        jobs.invalidate_appstatus_cache(cid='cid-1', app_name='ALL')
+        assert jobs.get_cached_appstatus_batch(['cid-1'], single_app)['misses'] == ['cid-1']
+        print("  ✓ PASS")
+
+
+if __name__ == '__main__':
+    test_lru_eviction_and_ttl()
+    test_repeated_lookups_are_served_from_memory()
+    print("\nAll memory cache tests passed")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for upstream GET coalescing (src/single_flight.py)
+Runs against a local stub server - no TMS gateway required
+"""
+
+import http.server
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.single_flight import single_flight_get, get_single_flight_stats
+
+upstream_hits = []
+
+
+class SlowHandler(http.server.BaseHTTPRequestHandler):
+    """Slow JSON stub that records every request it serves"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        upstream_hits.append((self.path, self.headers.get('Authorization')))
+        time.sleep(0.3)
+        body = json.dumps({'cid-1': {'action_code': 1}, 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server():
+    """Start the stub server on a free port and return its base URL"""
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def run_concurrently(calls):
+    """Run (url, token) GETs at the same time; return responses in call order"""
+    results = [None] * len(calls)
+
+    def worker(index, url, token):
+        results[index] = single_flight_get(url, headers={'Authorization': f'Bearer {token}'}, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i, url, token)) for i, (url, token) in enumerate(calls)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_identical_gets_share_one_call():
+    """Concurrent GETs with the same URL and token go upstream once"""
+    print("=" * 60)
+    print("TEST: identical concurrent GETs are coalesced")
+    print("=" * 60)
+
+    server, base_url = start_stub_server()
+    try:
+        upstream_hits.clear()
+        before = get_single_flight_stats()
+        url = f'{base_url}/tms/v1/get/action?cid=ALL'
+        responses = run_concurrently([(url, 'token-a')] * 8)
+
+        after = get_single_flight_stats()
+        print(f"  Stats: {after}")
+        assert len(upstream_hits) == 1
+        assert after['upstream_calls'] - before['upstream_calls'] == 1
+        assert after['coalesced'] - before['coalesced'] == 7
+        assert after['in_flight'] == 0
+        assert all(r.status_code == 200 for r in responses)
+        # Every caller gets the same parsed object
+        assert all(r.json() is responses[0].json() for r in responses)
+        assert responses[0].json()['cid-1'] == {'action_code': 1}
+
+        # Once the call is finished nothing is cached
+        single_flight_get(url, headers={'Authorization': 'Bearer token-a'}, timeout=5)
+        assert len(upstream_hits) == 2
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+def test_different_tokens_and_urls_are_not_shared():
+    """Auth identity and URL are both part of the coalescing key"""
+    print("\n" + "=" * 60)
+    print("TEST: different token / URL are not coalesced")
+    print("=" * 60)
+
+    server, base_url = start_stub_server()
+    try:
+        upstream_hits.clear()
+        run_concurrently([
+            (f'{base_url}/tms/v1/get/action?cid=ALL', 'token-a'),
+            (f'{base_url}/tms/v1/get/action?cid=ALL', 'token-b'),
+            (f'{base_url}/tms/v1/get/action?cid=X', 'token-a'),
+        ])
+        assert len(upstream_hits) == 3
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+def test_errors_reach_every_waiter():
+    """A failed shared call raises in every coalesced caller"""
+    print("\n" + "=" * 60)
+    print("TEST: shared failures")
+    print("=" * 60)
+
+    server, base_url = start_stub_server()
+    errors = []
+
+    def worker():
+        try:
+            single_flight_get(f'{base_url}/slow', headers={'Authorization': 'Bearer t'}, timeout=(1, 0.05))
+        except requests.exceptions.RequestException as e:
+            errors.append(e)
+
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(errors) == 4
+        assert get_single_flight_stats()['in_flight'] == 0
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    test_identical_gets_share_one_call()
+    test_different_tokens_and_urls_are_not_shared()
+    test_errors_reach_every_waiter()
+    print("\nAll single-flight tests passed")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script for stale-while-revalidate app status
+Covers stale lookups in get_cached_appstatus_batch() and the background
+refresh queue in src/appstatus_fetcher.py
+Runs against a local stub gateway and a throwaway jobs database
+"""
+
+import http.server
+import json
+import os
+import socketserver
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src import jobs
+from src.appstatus_fetcher import enqueue_refresh, wait_for_refreshes, get_refresh_stats
+
+gateway_calls = []
+
+
+class GatewayHandler(http.server.BaseHTTPRequestHandler):
+    """Stub /tms/v1/get/appstatus that answers every CID with 'Refreshed'"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        cids = parse_qs(urlsplit(self.path).query)['cid'][0].split(',')
+        gateway_calls.append(cids)
+        time.sleep(0.2)
+        body = json.dumps({cid: {'status': 'Refreshed'} for cid in cids}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_gateway():
+    """Start the stub gateway on a free port and return its base URL"""
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), GatewayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def insert_cached(cids, age_seconds, ttl_seconds=1800):
+    """Write cache rows directly, as if cached age_seconds ago"""
+    cached_at = datetime.now() - timedelta(seconds=age_seconds)
+    conn = sqlite3.connect(jobs.DB_PATH)
+    conn.executemany('''
+        INSERT OR REPLACE INTO appstatus_cache (cid, app_name, status_data, cached_at, ttl_seconds, expires_at)
+        VALUES (?, 'ALL', '{"status": "Old"}', ?, ?, ?)
+    ''', [(cid, cached_at.isoformat(), ttl_seconds, (cached_at + timedelta(seconds=ttl_seconds)).isoformat())
+          for cid in cids])
+    conn.commit()
+    conn.close()
+
+
+def test_stale_entries_are_returned_separately():
+    """Entries past the TTL come back as stale only when a stale window is given"""
+    print("=" * 60)
+    print("TEST: stale lookups")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        jobs.initialize_jobs_database()
+        jobs.invalidate_appstatus_cache()
+
+        insert_cached(['fresh'], age_seconds=10)
+        insert_cached(['stale'], age_seconds=1900)
+        insert_cached(['ancient'], age_seconds=1800 + 7200)
+
+        strict = jobs.get_cached_appstatus_batch(['fresh', 'stale', 'ancient'])
+        assert set(strict['hits']) == {'fresh'}
+        assert strict['stale'] == {}
+        assert strict['misses'] == ['stale', 'ancient']
+
+        # Twice: once from SQLite, once from the in-process tier
+        for _ in range(2):
+            swr = jobs.get_cached_appstatus_batch(['fresh', 'stale', 'ancient'], stale_seconds=3600)
+            assert set(swr['hits']) == {'fresh'}
+            assert set(swr['stale']) == {'stale'}
+            assert swr['misses'] == ['ancient']
+            assert swr['stale_count'] == 1
+        print("  ✓ PASS")
+
+
+def test_refresh_queue_deduplicates_and_writes_back():
+    """Queued CIDs are refreshed once in the background and written back to the cache"""
+    print("\n" + "=" * 60)
+    print("TEST: background refresh queue")
+    print("=" * 60)
+
+    server, base_url = start_gateway()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs.DB_PATH = os.path.join(tmp_dir, 'jobs.db')
+        jobs.initialize_jobs_database()
+        jobs.invalidate_appstatus_cache()
+        try:
+            insert_cached(['s1', 's2', 's3'], age_seconds=1900)
+            before = get_refresh_stats()
+
+            def write_back(results):
+                jobs.cache_appstatus_bulk(results)
+
+            first = enqueue_refresh(['s1', 's2', 's3'], base_url, 'token', write_back)
+            again = enqueue_refresh(['s2', 's3'], base_url, 'token', write_back)
+            wait_for_refreshes()
+
+            stats = get_refresh_stats()
+            print(f"  Stats: {stats}")
+            assert first == 3 and again == 0
+            assert stats['deduplicated'] - before['deduplicated'] == 2
+            assert stats['refreshed'] - before['refreshed'] == 3
+            assert stats['pending'] == 0
+            assert sum(len(cids) for cids in gateway_calls) == 3
+
+            result = jobs.get_cached_appstatus_batch(['s1', 's2', 's3'])
+            assert result['hit_count'] == 3
+            assert result['hits']['s1'] == {'status': 'Refreshed'}
+            print("  ✓ PASS")
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    test_stale_entries_are_returned_separately()
+    test_refresh_queue_deduplicates_and_writes_back()
+    print("\nAll stale-while-revalidate tests passed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled upstream HTTP client (src/upstream_client.py)
+Runs against a local stub server - no TMS gateway required
+"""
+
+import http.server
+import json
+import os
+import socketserver
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.upstream_client import upstream_get, upstream_post, get_pool_stats, close_all_sessions
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive JSON stub that echoes the request method"""
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({'method': self.command, 'path': self.path,
+                           'cookie': self.headers.get('Cookie')}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if self.path.startswith('/login'):
+            self.send_header('Set-Cookie', 'upstream_session=user-a; Path=/')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server():
+    """Start the stub server on a free port and return its base URL"""
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def test_connections_are_reused():
+    """Sequential calls to one host should share a single keep-alive connection"""
+    print("=" * 60)
+    print("TEST: keep-alive connection reuse")
+    print("=" * 60)
+
+    close_all_sessions()
+    server, base_url = start_stub_server()
+    try:
+        for _ in range(5):
+            response = upstream_get(f'{base_url}/tms/v1/get/action?cid=ALL', timeout=5)
+            assert response.status_code == 200
+            assert response.json()['method'] == 'GET'
+
+        response = upstream_post(f'{base_url}/tms/v1/set/action', json={'action': 'x'}, timeout=5)
+        assert response.json()['method'] == 'POST'
+
+        host_stats = get_pool_stats()['hosts'][base_url]
+        print(f"  Stats: {host_stats}")
+        assert host_stats['requests'] == 6
+        assert host_stats['opened_connections'] == 1
+        assert host_stats['reused_connections'] == 5
+        assert host_stats['idle_connections'] == 1
+        assert host_stats['active_connections'] == 0
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+        close_all_sessions()
+
+
+def test_close_all_sessions():
+    """Closing sessions should clear the per-host pools"""
+    print("\n" + "=" * 60)
+    print("TEST: close_all_sessions()")
+    print("=" * 60)
+
+    server, base_url = start_stub_server()
+    try:
+        upstream_get(f'{base_url}/health', timeout=5)
+        assert base_url in get_pool_stats()['hosts']
+        assert close_all_sessions() >= 1
+        assert get_pool_stats()['hosts'] == {}
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+
+
+def test_cookies_are_not_shared():
+    """A cookie set on one caller's response must not be sent on the next call to the host"""
+    print("\n" + "=" * 60)
+    print("TEST: shared sessions keep no cookies")
+    print("=" * 60)
+
+    close_all_sessions()
+    server, base_url = start_stub_server()
+    try:
+        response = upstream_get(f'{base_url}/login', headers={'Authorization': 'Bearer user-a'}, timeout=5)
+        assert response.cookies.get('upstream_session') == 'user-a'
+        response = upstream_get(f'{base_url}/tms/v1/get/action', headers={'Authorization': 'Bearer user-b'},
+                                timeout=5)
+        assert response.json()['cookie'] is None
+        # Cookies passed explicitly for one request are still sent
+        response = upstream_get(f'{base_url}/tms/v1/get/action', cookies={'explicit': '1'}, timeout=5)
+        assert response.json()['cookie'] == 'explicit=1'
+        print("  ✓ PASS")
+    finally:
+        server.shutdown()
+        close_all_sessions()
+
+
+if __name__ == '__main__':
+    test_connections_are_reused()
+    test_close_all_sessions()
+    test_cookies_are_not_shared()
+    print("\nAll upstream client tests passed")